@@ -4,8 +4,14 @@ Uygulamanın giriş noktası.
 – Tek bir QApplication örneği yaratır :contentReference[oaicite:0]{index=0},
 – Controllers.MainWindow'u açar,
 – İsteğe bağlı koyu temayı yükler.
+
+Varsayılan olarak yerel `data/inventory.db` kullanılır (gömülü mod). Birden çok
+kasa için `--server http://HOST:PORT` veya `STOCK_SERVICE_URL` ortam değişkeni
+ile `inventory_service` servisine bağlanılabilir.
 """
 
+import argparse
+import os
 import sys
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication              # QApplication ana olay döngüsünü yönetir :contentReference[oaicite:1]{index=1}
@@ -13,7 +19,12 @@ from controllers import MainWindow
 from models import DatabaseManager
 
 def main() -> None:
-    app = QApplication(sys.argv)                      # PyQt‑6'da exec_() yerine exec() kullanılır :contentReference[oaicite:2]{index=2}
+    parser = argparse.ArgumentParser(description="Stok Yönetim Sistemi")
+    parser.add_argument("--server", default=os.environ.get("STOCK_SERVICE_URL"),
+                        help="Envanter servisi adresi (ör. http://127.0.0.1:8765)")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)        # PyQt‑6'da exec_() yerine exec() kullanılır :contentReference[oaicite:2]{index=2}
 
     # Koyu tema (varsa)
     style_file = Path("resources/style.qss")
@@ -21,7 +32,11 @@ def main() -> None:
         app.setStyleSheet(style_file.read_text())
 
     # Veritabanı bağlantısını kuralım ve kontrol edelim 
-    db = DatabaseManager()
+    if args.server:
+        from inventory_client import RemoteDatabaseManager
+        db = RemoteDatabaseManager(args.server)
+    else:
+        db = DatabaseManager()
     
     # Bağlantıyı test et
     try:
@@ -32,7 +47,7 @@ def main() -> None:
         QMessageBox.critical(None, "Veritabanı Hatası", f"Veritabanına bağlanırken hata: {str(e)}")
         sys.exit(1)
 
-    win = MainWindow()                                # Ana pencere: sekmeli yapı :contentReference[oaicite:3]{index=3}
+    win = MainWindow(db)                              # Ana pencere: sekmeli yapı :contentReference[oaicite:3]{index=3}
     win.resize(900, 600)
     win.show()                                        # Pencereyi gösterir; olay döngüsü tetiklenir
 
@@ -3,9 +3,13 @@ barcode_handler.py
 Barkod okuyucudan gelen girdileri yönetmeye yarayan sınıf.
 """
 
-from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
+import time
+
+from PyQt6.QtCore import QCoreApplication, QEvent, QObject, Qt, QTimer, pyqtSignal
 from PyQt6.QtWidgets import QLineEdit
 
+from tracing import tracer
+
 
 class BarcodeHandler(QObject):
     """
@@ -26,6 +30,7 @@ class BarcodeHandler(QObject):
         super().__init__()
         self.buffer = ""  # Giriş arabelleği
         self.last_key_time = 0  # Son tuş basımının zamanı
+        self.last_key_ns = 0  # Son tuşun perf_counter_ns değeri (gecikme izleme için)
         self.input_timeout = input_timeout
         self.timer = QTimer()
         self.timer.setSingleShot(True)
@@ -35,11 +40,14 @@ class BarcodeHandler(QObject):
     def eventFilter(self, obj, event):
         """QLineEdit bileşenine bağlanan olay filtresi"""
         if isinstance(obj, QLineEdit) and event.type() == event.Type.KeyPress:
-            current_time = event.timestamp()
+            key_start_ns = time.perf_counter_ns()
+            # Sentetik olaylarda (test, uzak masaüstü) zaman damgası 0 gelebilir
+            current_time = event.timestamp() or int(time.monotonic() * 1000)
             
             # Enter tuşu basıldığında işlem yap
             if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
                 if self.buffer:
+                    self.last_key_ns = time.perf_counter_ns()  # Son tuş: Enter
                     self.process_buffer()
                     self.enter_consumed = True  # Enter tuşunu tüket
                     return True  # Olayı tüket
@@ -62,6 +70,8 @@ class BarcodeHandler(QObject):
                 self.buffer = event.text()
                 
             self.last_key_time = current_time
+            self.last_key_ns = time.perf_counter_ns()
+            tracer.record("barcode.event_filter", key_start_ns, self.last_key_ns)
             
         elif isinstance(obj, QLineEdit) and event.type() == event.Type.KeyRelease:
             # Enter tuşu bırakıldığında ve tüketildiyse, bu olayı da tüket
@@ -76,6 +86,16 @@ class BarcodeHandler(QObject):
         if self.buffer:
             barcode = self.buffer.strip()
             if len(barcode) >= 3:  # Minimum barkod uzunluğunu 3'e düşürdük, bazı ürün kodları kısa olabilir
-                self.barcode_detected.emit(barcode)
+                # Sinyal doğrudan bağlantı ile eşzamanlı işlenir; Qt ise çizimi
+                # olay döngüsünün sonraki turuna erteler. İzleme açıkken bekleyen
+                # yerleşim ve çizim olayları span içinde işlenir, böylece kök span
+                # son tuş vuruşundan sepet satırının ekrana çizilmesine kadar sürer
+                with tracer.span("scan_to_screen", start_ns=self.last_key_ns or None):
+                    with tracer.span("barcode.process_buffer"):
+                        self.barcode_detected.emit(barcode)
+                    if tracer.enabled:
+                        with tracer.span("barcode.repaint"):
+                            QCoreApplication.sendPostedEvents(None, QEvent.Type.LayoutRequest)
+                            QCoreApplication.sendPostedEvents(None, QEvent.Type.UpdateRequest)
             self.buffer = ""
             self.last_key_time = 0
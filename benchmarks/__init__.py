@@ -0,0 +1,5 @@
+"""
+benchmarks
+Başsız (headless) ölçüm betikleri. Her modül `python -m benchmarks.<ad>`
+ile çalıştırılır ve asıl `data/inventory.db` yerine geçici bir veritabanı kullanır.
+"""
@@ -0,0 +1,84 @@
+"""
+benchmarks/catalog_memory.py
+Paylaşılan ürün kataloğunun bellek kullanımını ölçer.
+
+Geçici veritabanı ürünlerle doldurulur; `tracemalloc` ile ölçülenler:
+  – katalog   : `ProductCatalog.load()` (id + barkod indeksleri dahil)
+  – satırlar  : sekmelerin eskiden ayrı ayrı tuttuğu `list_products()` ve
+                `search_products_for_price_history()` satır listeleri
+Sonuçlar toplam ve 100 bin ürün başına MB olarak yazılır; ayrıca barkod
+araması için katalog ile veritabanı sorgusu karşılaştırılır.
+
+Kullanım:
+    python -m benchmarks.catalog_memory --products 100000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import seed_database   # noqa: E402
+from catalog import ProductCatalog             # noqa: E402
+from models import DatabaseManager             # noqa: E402
+
+
+def measure(fn):
+    """fn()'in ayırıp elde tuttuğu bellek (bayt) ve dönüş değeri"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def run(n_products: int, lookups: int, seed: int) -> None:
+    tmp = tempfile.TemporaryDirectory()
+    db = DatabaseManager(Path(tmp.name) / "bench.db")
+    barcodes = seed_database(db, n_products, initial_stock=1)
+    per_100k = 100_000 / n_products
+
+    def report(label, size):
+        print(f"  {label:<28}{size / 2**20:>9.1f} MB   (100 bin ürün başına"
+              f" {size * per_100k / 2**20:.1f} MB, ürün başına {size / n_products:.0f} B)")
+
+    print(f"{n_products} ürün")
+    catalog = ProductCatalog(db)
+    size, _ = measure(catalog.load)
+    report("katalog (__slots__)", size)
+    size, _ = measure(db.list_products)
+    report("list_products satırları", size)
+    size, _ = measure(lambda: db.search_products_for_price_history(""))
+    report("fiyat takibi satırları", size)
+
+    rng = random.Random(seed)
+    codes = [rng.choice(barcodes) for _ in range(lookups)]
+    for label, lookup in (("katalog", catalog.by_barcode),
+                          ("veritabanı", db.find_product_by_barcode)):
+        start = time.perf_counter()
+        for code in codes:
+            lookup(code)
+        elapsed = (time.perf_counter() - start) / lookups * 1e6
+        print(f"  barkod araması ({label}): {elapsed:.2f} µs")
+
+    db.close()
+    tmp.cleanup()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Katalog bellek ölçümü")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    run(args.products, args.lookups, args.seed)
+
+
+if __name__ == "__main__":
+    main()
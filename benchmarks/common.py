@@ -0,0 +1,30 @@
+"""
+benchmarks/common.py
+Ölçüm betiklerinin ortak yardımcıları: test verisi üretimi.
+"""
+
+from typing import List
+
+from models import DatabaseManager
+
+
+def seed_database(db: DatabaseManager, n_products: int,
+                  initial_stock: int = 1_000_000) -> List[str]:
+    """Test ürünlerini ve başlangıç stoklarını ekler, barkod listesini döndürür."""
+    barcodes = []
+    cur = db.conn.cursor()
+    for i in range(n_products):
+        code = f"869{i:010d}"
+        cur.execute(
+            "INSERT INTO Product(name, barcode, location, unit_price, initial_price)"
+            " VALUES (?,?,?,?,?)",
+            (f"Ürün {i}", code, "Raf", 10.0 + i % 50, 10.0 + i % 50),
+        )
+        cur.execute(
+            "INSERT INTO StockMovement(product_id, change, reason, purchase_price)"
+            " VALUES (?,?,?,?)",
+            (cur.lastrowid, initial_stock, "PURCHASE", 8.0),
+        )
+        barcodes.append(code)
+    db.conn.commit()
+    return barcodes
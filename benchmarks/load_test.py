@@ -0,0 +1,175 @@
+"""
+benchmarks/load_test.py
+Aynı `inventory.db` üzerinde çalışan birden çok kasayı (till) taklit eden yük testi.
+
+Her kasa ayrı bir süreçtir ve kendi `DatabaseManager` bağlantısıyla gerçekçi
+bir işlem karışımı yürütür:
+  – satış   : barkod ara → stok kontrol → record_sale (fiş + SALE hareketi,
+              süreç başına benzersiz op_key)
+  – stok girişi : barkod ara → change_stock(+n, "PURCHASE", fiyat)
+  – arama   : search_products_for_price_history
+`database is locked` hataları sayılır ve geri çekilmeyle (backoff) tekrar denenir.
+Kasa sayısı arttıkça verim, kuyruk gecikmesi ve kilit tekrarları raporlanır.
+
+Kullanım:
+    python -m benchmarks.load_test --workers 1,2,4,8 --duration 5
+"""
+
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import seed_database   # noqa: E402
+from models import DatabaseManager                         # noqa: E402
+from tracing import percentile                             # noqa: E402
+
+# İşlem karışımı: (ad, ağırlık)
+DEFAULT_MIX = (("sale", 80), ("stock_in", 10), ("search", 10))
+
+
+_sale_keys = itertools.count(1)
+
+
+def _sale(db: DatabaseManager, rng: random.Random, barcodes) -> None:
+    """Kasanın gerçek yazması: fiş + satırları + SALE hareketi tek işlemde"""
+    product = db.find_product_by_barcode(rng.choice(barcodes))
+    if product and db.get_stock_level(product["id"]) > 0:
+        db.record_sale(
+            [{"product_id": product["id"], "name": product["name"], "qty": 1,
+              "unit_price": product["unit_price"] or 0.0}],
+            op_key=f"load-{os.getpid()}-{next(_sale_keys)}",
+        )
+
+
+def _stock_in(db: DatabaseManager, rng: random.Random, barcodes) -> None:
+    product = db.find_product_by_barcode(rng.choice(barcodes))
+    if product:
+        db.change_stock(product["id"], rng.randint(1, 24), "PURCHASE",
+                        round(rng.uniform(5, 50), 2))
+
+
+def _search(db: DatabaseManager, rng: random.Random, barcodes) -> None:
+    db.search_products_for_price_history(rng.choice(barcodes)[-4:])
+
+
+OPERATIONS = {"sale": _sale, "stock_in": _stock_in, "search": _search}
+
+
+def _worker(db_path, barcodes, duration, busy_timeout_ms, max_retries,
+            seed, start_event, results) -> None:
+    """Tek bir kasa süreci: süre dolana kadar işlem karışımını çalıştırır."""
+    db = DatabaseManager(Path(db_path))
+    db.conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    rng = random.Random(seed)
+    names = [name for name, _ in DEFAULT_MIX]
+    weights = [w for _, w in DEFAULT_MIX]
+
+    latencies = []
+    ops = retries = failures = 0
+    start_event.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        op = OPERATIONS[rng.choices(names, weights)[0]]
+        started = time.perf_counter()
+        for attempt in range(max_retries + 1):
+            try:
+                op(db, rng, barcodes)
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                db.conn.rollback()
+                if attempt == max_retries:
+                    failures += 1
+                    break
+                retries += 1
+                time.sleep(min(0.05, 0.001 * 2 ** attempt) * rng.random())
+        latencies.append((time.perf_counter() - started) * 1000)
+        ops += 1
+
+    db.close()
+    results.put({"ops": ops, "retries": retries, "failures": failures,
+                 "latencies": latencies})
+
+
+def run_level(db_path, barcodes, n_workers, duration, busy_timeout_ms, max_retries):
+    """N kasa ile bir tur çalıştırır ve toplu sonuçları döndürür."""
+    start_event = mp.Event()
+    results = mp.Queue()
+    procs = [
+        mp.Process(target=_worker,
+                   args=(str(db_path), barcodes, duration, busy_timeout_ms,
+                         max_retries, 1000 + i, start_event, results))
+        for i in range(n_workers)
+    ]
+    for p in procs:
+        p.start()
+    start_event.set()
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    latencies = [ms for r in collected for ms in r["latencies"]]
+    ops = sum(r["ops"] for r in collected)
+    return {
+        "workers": n_workers,
+        "ops": ops,
+        "throughput": ops / duration,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies, default=0.0),
+        "retries": sum(r["retries"] for r in collected),
+        "failures": sum(r["failures"] for r in collected),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Çoklu kasa yük testi")
+    parser.add_argument("--workers", default="1,2,4,8",
+                        help="Virgülle ayrılmış kasa sayıları")
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="Her tur için saniye")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--busy-timeout", type=int, default=50,
+                        help="Bağlantı başına busy_timeout (ms); küçük değer kilitleri görünür kılar")
+    parser.add_argument("--max-retries", type=int, default=20)
+    parser.add_argument("--db", help="Var olan bir veritabanı kopyası (varsayılan: geçici DB)")
+    args = parser.parse_args(argv)
+
+    tmp = None
+    if args.db:
+        db_path = Path(args.db)
+        db = DatabaseManager(db_path)
+        barcodes = [r["barcode"] for r in db.list_products() if r["barcode"]]
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = Path(tmp.name) / "load.db"
+        db = DatabaseManager(db_path)
+        barcodes = seed_database(db, args.products)
+    db.close()
+
+    print(f"{'kasa':>5}{'işlem':>9}{'işlem/sn':>11}{'p50':>9}{'p95':>9}"
+          f"{'p99':>9}{'max':>9}{'tekrar':>9}{'hata':>7}")
+    for n in (int(x) for x in args.workers.split(",")):
+        r = run_level(db_path, barcodes, n, args.duration,
+                      args.busy_timeout, args.max_retries)
+        print(f"{r['workers']:>5}{r['ops']:>9}{r['throughput']:>11.1f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+              f"{r['max_ms']:>9.2f}{r['retries']:>9}{r['failures']:>7}")
+
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+benchmarks/price_analytics.py
+Katalog genelindeki alış fiyatı analizini ürün başına döngüyle karşılaştırır.
+
+Döngü, fiyat sekmesinin yaptığı gibi her ürün için `get_product_price_history`
+sorgusunu çalıştırıp değişimi Python'da hesaplar (yalnızca artış yüzdesi).
+Vektörel yol (`price_analytics.price_metrics`) tek sorgu ve dizi işlemleriyle
+artış, oynaklık ve marj kaybını birlikte hesaplar.
+
+Kullanım:
+    python -m benchmarks.price_analytics --products 20000 --purchases 20
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import price_analytics                        # noqa: E402
+from benchmarks.common import seed_database   # noqa: E402
+from models import DatabaseManager            # noqa: E402
+
+
+def seed_purchases(db: DatabaseManager, n_products: int, per_product: int, seed: int) -> None:
+    """Her ürüne son bir yıla yayılmış, rastgele yürüyen alış fiyatları ekler"""
+    rng = random.Random(seed)
+    now = int(time.time())
+    rows = []
+    for product_id in range(1, n_products + 1):
+        price = 8.0
+        for ts in sorted(now - rng.randrange(365 * 86400) for _ in range(per_product)):
+            price = round(price * rng.uniform(0.95, 1.08), 2)
+            rows.append((product_id, 10, "PURCHASE", price, ts))
+    db.conn.executemany(
+        "INSERT INTO StockMovement(product_id, change, reason, purchase_price, ts)"
+        " VALUES (?,?,?,?,?)", rows)
+    db.conn.commit()
+
+
+def per_product(db: DatabaseManager, start_ts: int) -> dict:
+    """Ürün başına sorgu ve Python döngüsüyle dönemdeki artış yüzdesi"""
+    changes = {}
+    for product in db.list_products():
+        history = db.get_product_price_history(product["id"])   # yeniden eskiye
+        in_period = [row for row in history if row["ts"] >= start_ts]
+        if not in_period:
+            continue
+        before = [row for row in history if row["ts"] < start_ts]
+        base = (before[0] if before else in_period[-1])["purchase_price"]
+        changes[product["id"]] = (in_period[0]["purchase_price"] / base - 1) * 100
+    return changes
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Alış fiyatı analizi ölçümü")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--purchases", type=int, default=20, help="ürün başına alış")
+    parser.add_argument("--days", type=int, default=30, help="dönem uzunluğu")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.TemporaryDirectory()
+    db = DatabaseManager(Path(tmp.name) / "bench.db", profile="reporting")
+    seed_database(db, args.products)
+    seed_purchases(db, args.products, args.purchases, args.seed)
+
+    end = date.today().isoformat()
+    start = (date.today() - timedelta(days=args.days)).isoformat()
+
+    t0 = time.perf_counter()
+    loop = per_product(db, price_analytics._day_ts(start))
+    t1 = time.perf_counter()
+    metrics = price_analytics.price_metrics(db, start, end)
+    t2 = time.perf_counter()
+
+    print(f"{args.products} ürün, {args.products * args.purchases} alış, son {args.days} gün")
+    print(f"  ürün başına döngü : {(t1 - t0) * 1000:8.1f} ms ({len(loop)} ürün, yalnız artış)")
+    print(f"  vektörel          : {(t2 - t1) * 1000:8.1f} ms ({len(metrics)} ürün, tüm ölçüler)")
+    db.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
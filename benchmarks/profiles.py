@@ -0,0 +1,132 @@
+"""
+benchmarks/profiles.py
+Bağlantı profillerini (`models.PROFILES`) üç iş yükünde karşılaştırır.
+
+Bir şablon veritabanı (ürünler, stok hareketleri ve geçmiş satış fişleri)
+bir kez kurulur; her profil şablonun ayrı bir kopyasında çalışır:
+  – till        : tek tek satış (fiş + satır başına stok hareketi, her biri
+                  ayrı işlem) — satış başına ortalama süre
+  – reporting   : soğuk bağlantıyla dönem sorguları (sepet çiftleri, aylık
+                  ciro, geçmiş tarihli stok) — toplam süre, tekrarların en iyisi
+  – bulk-import : CSV benzeri satırlardan katalog içe aktarma — toplam süre
+Her satırda en hızlı profil * ile işaretlenir. `default` her satırda
+geride kalmalıdır. Tek tek satışta bulk-import daha hızlıdır, çünkü diske
+yazmayı beklemez; kasada bu güvencenin bedeli olarak till kullanılır.
+
+Kullanım:
+    python -m benchmarks.profiles --products 20000 --receipts 50000
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import seed_database   # noqa: E402
+from models import PROFILES, DatabaseManager  # noqa: E402
+
+
+def build_template(path: Path, n_products: int, n_receipts: int, seed: int) -> None:
+    """Ürünler ve son 180 güne yayılmış satış fişleriyle şablon veritabanı"""
+    db = DatabaseManager(path, profile="default")
+    seed_database(db, n_products, initial_stock=10_000)
+    rng = random.Random(seed)
+    today = date.today()
+    cur = db.conn.cursor()
+    for receipt in range(n_receipts):
+        day = (today - timedelta(days=rng.randrange(180))).isoformat()
+        cur.execute("INSERT INTO Sale(day, item_count, total) VALUES (?, 0, 0)", (day,))
+        sale_id = cur.lastrowid
+        for product_id in rng.sample(range(1, n_products + 1), 3):
+            cur.execute(
+                "INSERT INTO SaleLine(sale_id, product_id, name, qty, unit_price,"
+                " line_total, day) VALUES (?,?,?,?,?,?,?)",
+                (sale_id, product_id, f"Ürün {product_id}", 1, 12.5, 12.5, day),
+            )
+            cur.execute(
+                "INSERT INTO StockMovement(product_id, change, reason, ts)"
+                " VALUES (?, -1, 'SALE', CAST(strftime('%s', ?) AS INTEGER))",
+                (product_id, day),
+            )
+    db.conn.commit()
+    db.close()
+
+
+def till(db: DatabaseManager, n_sales: int, n_products: int, seed: int) -> float:
+    """Satış başına ortalama süre (sn)"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(n_sales):
+        lines = [{"product_id": pid, "name": f"Ürün {pid}", "qty": 1, "unit_price": 12.5}
+                 for pid in rng.sample(range(1, n_products + 1), 3)]
+        db.record_sale(lines)       # fiş ve SALE hareketleri tek işlemde
+    return (time.perf_counter() - start) / n_sales
+
+
+def reporting(db: DatabaseManager) -> float:
+    """Soğuk bağlantıyla dönem sorgularının toplam süresi (sn)"""
+    today = date.today()
+    start_day = (today - timedelta(days=180)).isoformat()
+    db.refresh_connection()
+    start = time.perf_counter()
+    db.basket_pairs(start_day, today.isoformat())
+    db.revenue_by_period(start_day, today.isoformat(), "month")
+    db.stock_as_of(int(time.time()) - 90 * 86400)
+    db.low_stock_products()
+    return time.perf_counter() - start
+
+
+def bulk_import(db: DatabaseManager, n_rows: int) -> float:
+    rows = [{"name": f"Yeni {i}", "barcode": f"999{i:010d}", "location": "Depo",
+             "unit_price": "9.90", "quantity": "24"} for i in range(n_rows)]
+    start = time.perf_counter()
+    db.import_products(rows)
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Bağlantı profili karşılaştırması")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--receipts", type=int, default=50_000)
+    parser.add_argument("--sales", type=int, default=300, help="till iş yükündeki satış sayısı")
+    parser.add_argument("--import-rows", type=int, default=50_000)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--repeat", type=int, default=3, help="reporting tekrarı (en iyisi alınır)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.TemporaryDirectory()
+    template = Path(tmp.name) / "template.db"
+    build_template(template, args.products, args.receipts, args.seed)
+
+    results = {}
+    for profile in args.profiles:
+        path = Path(tmp.name) / f"{profile}.db"
+        shutil.copy(template, path)
+        db = DatabaseManager(path, profile=profile)
+        results[profile] = {
+            "till": till(db, args.sales, args.products, args.seed) * 1000,
+            "reporting": min(reporting(db) for _ in range(args.repeat)) * 1000,
+            "bulk-import": bulk_import(db, args.import_rows) * 1000,
+        }
+        db.close()
+
+    print(f"{args.products} ürün, {args.receipts} fiş (süreler ms; till: satış başına)")
+    print(f"{'iş yükü':<14}" + "".join(f"{p:>14}" for p in args.profiles))
+    for workload in ("till", "reporting", "bulk-import"):
+        best = min(results[p][workload] for p in args.profiles)
+        cells = "".join(
+            f"{results[p][workload]:>13.1f}{'*' if results[p][workload] == best else ' '}"
+            for p in args.profiles)
+        print(f"{workload:<14}{cells}")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+benchmarks/scan_latency.py
+Tarama → ekran gecikmesini başsız ölçer.
+
+Geçici bir veritabanı ürünlerle doldurulur, `SalesTab` offscreen Qt
+platformunda açılır ve her barkod tuş tuş (+ Enter) gönderilir. Böylece
+BarcodeHandler.eventFilter → process_buffer → SalesTab.handle_barcode → scan
+→ DB → refresh yolunun tamamı ölçülür.
+
+Kullanım:
+    python -m benchmarks.scan_latency --products 5000 --scans 500 --trace-out scan_trace.json
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Depo kökünü içe aktarma yoluna ekle (python benchmarks/scan_latency.py için)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import Qt                    # noqa: E402
+from PyQt6.QtTest import QTest                 # noqa: E402
+from PyQt6.QtWidgets import QApplication       # noqa: E402
+
+from benchmarks.common import seed_database   # noqa: E402
+from models import DatabaseManager             # noqa: E402
+from tracing import tracer                     # noqa: E402
+
+
+def run(n_products: int, n_scans: int, basket: int, seed: int,
+        use_journal: bool = False) -> None:
+    from controllers import SalesTab
+    from sales_journal import SalesJournal
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    tmp = tempfile.TemporaryDirectory()
+    db = DatabaseManager(Path(tmp.name) / "bench.db")
+    barcodes = seed_database(db, n_products)
+
+    journal = None
+    if use_journal:
+        journal = SalesJournal(Path(tmp.name) / "journal.db")
+        journal.start(db.clone)
+    tab = SalesTab(db, journal)
+    tab.show()
+    app.processEvents()
+
+    rng = random.Random(seed)
+    tracer.reset()
+    tracer.enable()
+    for i in range(n_scans):
+        code = rng.choice(barcodes)
+        tab.barcode_edit.setFocus()
+        QTest.keyClicks(tab.barcode_edit, code)
+        QTest.keyClick(tab.barcode_edit, Qt.Key.Key_Return)
+        app.processEvents()
+        # Sepeti belirli aralıklarla boşalt (gerçek fiş boyutlarına benzesin)
+        if basket and (i + 1) % basket == 0:
+            tab.clear_cart()
+    tracer.disable()
+
+    print(f"{n_products} ürün, {n_scans} tarama, sepet boyutu {basket or 'sınırsız'}\n")
+    print(tracer.format_summary())
+    print()
+    print(tracer.format_histogram("scan_to_screen"))
+
+    tab.close()
+    if journal is not None:
+        journal.close()
+    db.close()
+    tmp.cleanup()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Tarama → ekran gecikme ölçümü")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=300)
+    parser.add_argument("--basket", type=int, default=25,
+                        help="Kaç taramada bir sepet boşaltılsın (0 = hiç)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--journal", action="store_true",
+                        help="Satışları yerel günlük üzerinden yaz (write-behind)")
+    parser.add_argument("--trace-out", help="İzleri bu JSON dosyasına yaz")
+    args = parser.parse_args(argv)
+
+    run(args.products, args.scans, args.basket, args.seed, args.journal)
+    if args.trace_out:
+        tracer.export(args.trace_out)
+        print(f"\nİz dosyası: {args.trace_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+benchmarks/stock_take.py
+Stok sayımı oturumunun ölçeklenmesini ölçer.
+
+`StockTakeTab` offscreen Qt platformunda açılır ve okutmalar barkod sinyaliyle
+gönderilir. İlk ve son okutma dilimlerinin gecikmeleri karşılaştırılır (oturum
+büyüdükçe yavaşlama olmamalı), ardından fark önizlemesi ve tek işlemli
+onaylama süresi ölçülür.
+
+Kullanım:
+    python -m benchmarks.stock_take --products 20000 --scans 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Depo kökünü içe aktarma yoluna ekle (python benchmarks/stock_take.py için)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtWidgets import QApplication       # noqa: E402
+
+from benchmarks.common import seed_database   # noqa: E402
+from models import DatabaseManager             # noqa: E402
+from tracing import percentile                 # noqa: E402
+
+
+def run(n_products: int, n_scans: int, seed: int) -> None:
+    from controllers import StockTakeTab
+    from stock_take import StockTakeSession
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    tmp = tempfile.TemporaryDirectory()
+    db = DatabaseManager(Path(tmp.name) / "bench.db")
+    barcodes = seed_database(db, n_products, initial_stock=3)
+
+    session = StockTakeSession(Path(tmp.name) / "stock_take.log")
+    tab = StockTakeTab(db, lambda: None, session)
+    tab.show()
+    app.processEvents()
+
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(n_scans):
+        code = rng.choice(barcodes)
+        start = time.perf_counter()
+        tab.barcode_handler.barcode_detected.emit(code)
+        app.processEvents()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    window = max(1, min(1000, n_scans // 10))
+    print(f"{n_scans} okutma, {len(session.counts)} farklı barkod, {n_products} ürün")
+    for label, part in (("ilk", latencies[:window]), ("son", latencies[-window:])):
+        print(f"  {label} {window:>5} okutma: p50 {percentile(part, 50):.3f} ms"
+              f"  p99 {percentile(part, 99):.3f} ms")
+
+    start = time.perf_counter()
+    diffs = db.preview_stock_count(session.counts)
+    print(f"  önizleme: {len(diffs)} fark, {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    written = db.apply_stock_count(session.counts, session.session_id)
+    print(f"  onaylama: {written} hareket, {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    session.finish()
+    db.close()
+    tmp.cleanup()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stok sayımı ölçümü")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--scans", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    run(args.products, args.scans, args.seed)
+
+
+if __name__ == "__main__":
+    main()
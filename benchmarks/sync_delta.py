@@ -0,0 +1,70 @@
+"""
+benchmarks/sync_delta.py
+Mağazalar arası eşitlemenin süresini veritabanı büyüklüğüne göre ölçer.
+
+Her ürün sayısı için iki geçici veritabanı kurulur; A doldurulur ve B'ye ilk
+(tam) eşitleme yapılır. Ardından A'da sabit sayıda değişiklik (fiyat
+güncellemesi ve stok hareketi) yapılıp yeniden eşitlenir. Artımlı eşitleme
+süresi veritabanı büyüdükçe sabit kalmalıdır.
+
+Kullanım:
+    python -m benchmarks.sync_delta --products 10000 100000 --changes 200
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import replication                            # noqa: E402
+from benchmarks.common import seed_database   # noqa: E402
+from models import DatabaseManager            # noqa: E402
+
+
+def run(n_products: int, n_changes: int, seed: int) -> None:
+    tmp = tempfile.TemporaryDirectory()
+    a = DatabaseManager(Path(tmp.name) / "a.db")
+    b = DatabaseManager(Path(tmp.name) / "b.db")
+    seed_database(a, n_products, initial_stock=100)
+
+    start = time.perf_counter()
+    pulled = replication.pull(b, a)
+    full = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    ids = [row[0] for row in a.conn.execute("SELECT id FROM Product")]
+    for i in range(n_changes):
+        product_id = rng.choice(ids)
+        if i % 2:
+            a.update_unit_price(product_id, round(rng.uniform(5, 60), 2))
+        else:
+            a.change_stock(product_id, -rng.randint(1, 3), "SALE")
+
+    start = time.perf_counter()
+    delta = replication.pull(b, a)
+    incremental = time.perf_counter() - start
+
+    print(f"{n_products:>8} ürün | ilk eşitleme {pulled['applied']:>7} değişiklik"
+          f" {full:7.2f} sn | artımlı {delta['applied']:>5} değişiklik"
+          f" {incremental * 1000:8.1f} ms")
+    a.close()
+    b.close()
+    tmp.cleanup()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Eşitleme süresi ölçümü")
+    parser.add_argument("--products", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--changes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    for n in args.products:
+        run(n, args.changes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
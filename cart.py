@@ -0,0 +1,137 @@
+"""
+cart.py
+Satış sepeti modeli (Qt'den bağımsız).
+
+Satırlar ürün id'siyle anahtarlanır ve her satır tablodaki sıra numarasını
+bilir; böylece ekleme, adet değiştirme ve çıkarma sepet büyüklüğünden
+bağımsız olarak O(1) çalışır. Çıkarılan satırın yerine son satır taşınır
+(sıra değişir, ama hiçbir satır yeniden numaralanmaz). Toplam kuruş
+cinsinden tamsayı olarak artımlı tutulur.
+
+Her işlem değişen satırı döndürür; görünüm yalnızca o satırı ve toplamı
+günceller.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+def _cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+class CartLine:
+    """Sepetteki tek ürün satırı"""
+
+    __slots__ = ("product", "unit_price", "qty", "row")
+
+    def __init__(self, product, row: int):
+        self.product = product                 # katalog kaydı (ad için)
+        self.unit_price = product["unit_price"] or 0.0   # okutma anındaki fiyat
+        self.qty = 0
+        self.row = row
+
+    @property
+    def product_id(self) -> int:
+        return self.product["id"]
+
+    @property
+    def name(self) -> str:
+        return self.product["name"]
+
+    @property
+    def subtotal_cents(self) -> int:
+        return self.qty * _cents(self.unit_price)
+
+    @property
+    def subtotal(self) -> float:
+        return self.subtotal_cents / 100
+
+
+class Cart:
+    """Ürün id'siyle anahtarlanmış, satır indeksli sepet"""
+
+    def __init__(self):
+        self._lines: Dict[int, CartLine] = {}
+        self._rows: List[CartLine] = []
+        self.total_cents = 0
+        self.item_count = 0
+
+    # ---------- Okuma ---------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __bool__(self) -> bool:
+        return bool(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def line(self, product_id: int) -> Optional[CartLine]:
+        return self._lines.get(product_id)
+
+    def line_at(self, row: int) -> Optional[CartLine]:
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    @property
+    def total(self) -> float:
+        return self.total_cents / 100
+
+    def receipt_lines(self) -> List[dict]:
+        """`record_sale` için fiş satırları (okutma anındaki ad ve fiyatla)"""
+        return [{"product_id": line.product_id, "name": line.name,
+                 "qty": line.qty, "unit_price": line.unit_price}
+                for line in self._rows]
+
+    # ---------- Değiştirme ----------------------------------------------
+    def add(self, product, qty: int = 1) -> CartLine:
+        """Ürünü sepete ekler (satır yoksa en sona açılır)"""
+        line = self._lines.get(product["id"])
+        if line is None:
+            line = CartLine(product, len(self._rows))
+            self._lines[line.product_id] = line
+            self._rows.append(line)
+        self._set(line, line.qty + qty)
+        return line
+
+    def set_qty(self, product_id: int, qty: int) -> Tuple[CartLine, Optional[CartLine]]:
+        """
+        Satırın adedini değiştirir; adet 0 veya altına düşerse satır çıkarılır.
+
+        Returns:
+            (satır, taşınan satır): satır çıkarıldıysa yerine taşınan son satır
+            (yoksa None) ikinci elemandır
+        """
+        line = self._lines[product_id]
+        if qty > 0:
+            self._set(line, qty)
+            return line, None
+        return line, self.remove(product_id)
+
+    def remove(self, product_id: int) -> Optional[CartLine]:
+        """
+        Satırı sepetten çıkarır; son satır boşalan sıraya taşınır.
+
+        Returns:
+            Yeni sırası `removed.row` olan taşınmış satır (yoksa None)
+        """
+        line = self._lines.pop(product_id)
+        self._set(line, 0)
+        last = self._rows.pop()
+        if last is line:
+            return None
+        self._rows[line.row] = last
+        last.row = line.row
+        return last
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self._rows.clear()
+        self.total_cents = 0
+        self.item_count = 0
+
+    def _set(self, line: CartLine, qty: int) -> None:
+        self.total_cents -= line.subtotal_cents
+        self.item_count -= line.qty
+        line.qty = qty
+        self.total_cents += line.subtotal_cents
+        self.item_count += qty
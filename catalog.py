@@ -0,0 +1,193 @@
+"""
+catalog.py
+Süreç genelinde paylaşılan, bellekte tutulan ürün kataloğu.
+
+Ürünler ilk kullanımda tek sorguyla yüklenir ve `__slots__` kullanan küçük
+kayıtlar olarak id ve barkod sözlüklerinde tutulur. Sekmeler ürün bilgisini
+her seferinde veritabanından ayrı satır listeleri olarak çekmek yerine bu
+kayıtları paylaşır. `DatabaseManager` ürünü değiştiren her yazmadan sonra
+`product_changed` / `invalidate` çağırır; kayıtlar yerinde güncellendiği için
+elde tutulan referanslar (ör. sepet satırları) da güncel kalır.
+
+Başka bağlantılarda (diğer kasa, CLI içe aktarma, mağazalar arası eşitleme)
+yapılan ürün değişiklikleri `DataVersion` tablosundaki ürün sayacıyla
+yakalanır: okumalar sayacı en fazla `check_interval` saniyede bir kontrol eder,
+sayaç değiştiyse katalog yeniden yüklenir. Barkod bulunamazsa sayaç hemen
+kontrol edilir; başka kasada az önce eklenen ürün de bulunur.
+
+Katalog bir kez yüklendikten sonra veritabanına ulaşılamazsa (kilit, ağ
+kopması) sayaç kontrolü atlanır ve bellekteki kayıtlar kullanılır; kasa
+bilinen ürünleri okutmaya devam eder. Hiç yüklenmemiş katalogda hata
+çağırana iletilir.
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class ProductRecord:
+    """Tek ürün; sqlite3.Row gibi `product["name"]` ile de okunabilir."""
+
+    __slots__ = ("id", "name", "barcode", "location",
+                 "unit_price", "initial_price", "reorder_point")
+
+    def __init__(self, row):
+        self.update(row)
+
+    def update(self, row) -> None:
+        self.id = row["id"]
+        self.name = row["name"]
+        self.barcode = row["barcode"]
+        # Konum değerleri az sayıda ve çok tekrarlı: tek kopya tutulur
+        self.location = sys.intern(row["location"]) if row["location"] else row["location"]
+        self.unit_price = row["unit_price"] or 0.0
+        self.initial_price = row["initial_price"] or 0.0
+        if self.initial_price == self.unit_price:
+            self.initial_price = self.unit_price   # Eşitse aynı float nesnesi
+        self.reorder_point = row["reorder_point"] or 0
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise IndexError(f"Sütun yok: {key}") from None
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"ProductRecord(id={self.id!r}, name={self.name!r}, barcode={self.barcode!r})"
+
+
+class ProductCatalog:
+    """id ve barkod ile indekslenmiş ürün kayıtları (tembel yüklenir)."""
+
+    def __init__(self, db, check_interval: float = 1.0):
+        """
+        Args:
+            db: `list_products`, `get_product_by_id` ve `product_version`
+                sunan DAO (DatabaseManager veya uzak istemci)
+            check_interval: Ürün sayacının en sık kontrol aralığı (sn); yerel
+                veritabanında 0 (tek satırlık sorgu), servis üzerinden daha uzun
+        """
+        self.db = db
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._by_id: Optional[Dict[int, ProductRecord]] = None
+        self._by_barcode: Dict[str, ProductRecord] = {}
+        self._version: Optional[int] = None   # Yüklenen kataloğun ürün sayacı
+        self._checked = 0.0                   # Son sayaç kontrolü (monotonic)
+
+    # ---------- Yükleme -------------------------------------------------
+    def load(self) -> None:
+        """Tüm kataloğu veritabanından yeniden yükler"""
+        # Sayaç ürünlerden önce okunur: arada yapılan değişiklik sonraki kontrolde yakalanır
+        version = self.db.product_version()
+        by_id, by_barcode = {}, {}
+        for row in self.db.list_products():
+            record = ProductRecord(row)
+            by_id[record.id] = record
+            if record.barcode:
+                by_barcode[record.barcode] = record
+        with self._lock:
+            self._by_id, self._by_barcode = by_id, by_barcode
+            self._version, self._checked = version, time.monotonic()
+
+    def invalidate(self) -> None:
+        """Kataloğu geçersiz kılar; bir sonraki okumada yeniden yüklenir"""
+        with self._lock:
+            self._by_id = None
+            self._by_barcode = {}
+            self._version = None
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Ürün sayacı yüklemeden beri değiştiyse (başka bir bağlantı yazdıysa)
+        kataloğu yeniden yükler. `force` False ise sayaç en fazla
+        `check_interval` saniyede bir okunur.
+
+        Returns:
+            bool: Katalog yeniden yüklendiyse True
+        """
+        if not self.loaded:
+            return False
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        try:
+            if self.db.product_version() == self._version:
+                return False
+            self.load()
+        except (sqlite3.OperationalError, OSError):
+            return False   # Veritabanına ulaşılamıyor: bellekteki katalog kullanılır
+        return True
+
+    @property
+    def loaded(self) -> bool:
+        return self._by_id is not None
+
+    def _products(self) -> Dict[int, ProductRecord]:
+        self.refresh()
+        by_id = self._by_id
+        if by_id is None:
+            self.load()
+            by_id = self._by_id
+        return by_id
+
+    def product_changed(self, product_id: int) -> None:
+        """Tek ürünü veritabanından tazeler (eklendi, güncellendi veya silindi)"""
+        if not self.loaded:
+            return
+        row = self.db.get_product_by_id(product_id)
+        version = self.db.product_version()
+        with self._lock:
+            if self._by_id is None:
+                return
+            # Sayaç yalnızca bu yazma kadar arttıysa katalog hâlâ eksiksiz;
+            # daha fazla arttıysa başka bir bağlantı da yazmıştır (sonraki okumada yüklenir)
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+            record = self._by_id.get(product_id)
+            if record is not None and record.barcode:
+                self._by_barcode.pop(record.barcode, None)
+            if row is None:
+                self._by_id.pop(product_id, None)
+                return
+            if record is None:
+                record = self._by_id[product_id] = ProductRecord(row)
+            else:
+                record.update(row)
+            if record.barcode:
+                self._by_barcode[record.barcode] = record
+
+    # ---------- Okuma ---------------------------------------------------
+    def get(self, product_id: int) -> Optional[ProductRecord]:
+        return self._products().get(product_id)
+
+    def by_barcode(self, code: str) -> Optional[ProductRecord]:
+        self._products()
+        record = self._by_barcode.get(code)
+        if record is None and self.refresh(force=True):
+            record = self._by_barcode.get(code)   # başka kasada yeni eklenmiş olabilir
+        return record
+
+    def all(self) -> List[ProductRecord]:
+        """Tüm ürünler (id sırasıyla)"""
+        return list(self._products().values())
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[ProductRecord]:
+        """Ad veya barkod içinde geçen metne göre arar (ada göre sıralı)"""
+        needle = query.casefold()
+        matches = sorted(
+            (r for r in self._products().values()
+             if needle in r.name.casefold() or (r.barcode and needle in r.barcode.casefold())),
+            key=lambda r: r.name,
+        )
+        return matches if limit is None else matches[:limit]
+
+    def __len__(self) -> int:
+        return len(self._products())
@@ -0,0 +1,590 @@
+"""
+cli.py
+Raporlar, içe aktarma ve bakım için başsız (headless) komut satırı girişi.
+
+Qt yolundan ayrıdır ve PyQt6'yı hiç içe aktarmaz; tüm komutlar
+`models.DatabaseManager` API'sini kullanır. pandas yalnızca dosya yazan
+komutlarda yüklenir, böylece diğer komutlar milisaniyeler içinde başlar.
+
+Örnekler:
+    python cli.py export-daily --out satis.xlsx
+    python cli.py report --from 2026-09-01 --to 2026-09-30 --out eylul.csv
+    python cli.py import-catalog urunler.csv --update
+    python cli.py backup yedek.db
+    python cli.py archive --before 2025-01-01 --archive-db arsiv.db
+    python cli.py check
+    python cli.py low-stock --out siparis.csv
+    python cli.py forecast --lead-time 5 --out oneriler.xlsx
+    python cli.py top-sellers --days 90 --by qty --limit 10
+    python cli.py set-reorder 8690000000001 12
+    python cli.py valuation --from 2026-09-01 --to 2026-09-30
+    python cli.py valuation --verify
+    python cli.py locations Depo
+    python cli.py transfer 8690000000001 10 Depo Mağaza
+    python cli.py receipt 1024
+    python cli.py revenue --from 2026-01-01 --by month
+    python cli.py basket --from 2026-09-01
+    python cli.py price-at 8690000000001 --at "2026-03-01 12:00"
+    python cli.py price-analytics --from 2026-09-01 --by erosion
+    python cli.py snapshot --date 2026-09-30 --out eylul_sonu.xlsx
+    python cli.py sync http://127.0.0.1:8766
+    python cli.py sync-export --peer 5f1c... --out kadikoy.jsonl
+    python cli.py sync-import kadikoy.jsonl
+    python cli.py maintain --task analyze vacuum
+    python cli.py maintain --full
+"""
+
+import argparse
+import csv
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import maintenance
+import replication
+from models import DB_PATH, PROFILES, DatabaseManager
+
+# Komutların bağlantı profili (verilmeyenler "reporting" kullanır)
+COMMAND_PROFILES = {
+    "import-catalog": "bulk-import",
+    "sync": "bulk-import",
+    "sync-import": "bulk-import",
+}
+
+
+# ---------- Komutlar ----------------------------------------------------
+def cmd_export_daily(db: DatabaseManager, args) -> int:
+    from reports import export_daily_sales
+
+    filename = export_daily_sales(db, args.out)
+    if not filename:
+        print("Bugün için satış kaydı bulunmuyor.")
+        return 0
+    print(f"Rapor kaydedildi: {filename}")
+    return 0
+
+
+def cmd_report(db: DatabaseManager, args) -> int:
+    if args.out:
+        from reports import export_sales_report
+
+        filename = export_sales_report(db, args.start, args.end, args.out)
+        print(f"Rapor kaydedildi: {filename}" if filename
+              else "Bu dönem için satış kaydı bulunmuyor.")
+        return 0
+
+    rows = db.sales_report(args.start, args.end)
+    if not rows:
+        print("Bu dönem için satış kaydı bulunmuyor.")
+        return 0
+    print(f"{'Ürün':<40}{'Adet':>10}{'Gelir':>14}")
+    for row in rows:
+        print(f"{row['name']:<40}{row['sold_qty']:>10}{row['revenue']:>14.2f}")
+    return 0
+
+
+def cmd_import_catalog(db: DatabaseManager, args) -> int:
+    with open(args.file, newline="", encoding=args.encoding) as f:
+        inserted, updated = db.import_products(csv.DictReader(f), args.update)
+    print(f"{inserted} ürün eklendi, {updated} ürün güncellendi.")
+    return 0
+
+
+def cmd_backup(db: DatabaseManager, args) -> int:
+    dest = db.backup(Path(args.dest))
+    print(f"Yedek alındı: {dest}")
+    return 0
+
+
+def cmd_archive(db: DatabaseManager, args) -> int:
+    count = db.archive_movements(args.before, Path(args.archive_db))
+    print(f"{count} hareket {args.archive_db} dosyasına arşivlendi.")
+    return 0
+
+
+def cmd_check(db: DatabaseManager, args) -> int:
+    problems = db.integrity_report()
+    if not problems:
+        print("Veritabanı tutarlı.")
+        return 0
+    for problem in problems:
+        print(f"- {problem}")
+    return 1
+
+
+def cmd_low_stock(db: DatabaseManager, args) -> int:
+    if args.out:
+        from reports import export_low_stock
+
+        filename = export_low_stock(db, args.out)
+        print(f"Liste kaydedildi: {filename}" if filename
+              else "Kritik seviyenin altında ürün yok.")
+        return 0
+
+    rows = db.low_stock_products()
+    if not rows:
+        print("Kritik seviyenin altında ürün yok.")
+        return 0
+    print(f"{'Ürün':<40}{'Barkod':<16}{'Stok':>8}{'Kritik':>8}{'Eksik':>8}")
+    for row in rows:
+        print(f"{row['name']:<40}{row['barcode'] or '':<16}{row['qty']:>8}"
+              f"{row['reorder_point']:>8}{row['shortage']:>8}")
+    return 0
+
+
+def cmd_forecast(db: DatabaseManager, args) -> int:
+    params = {"window": args.window, "lead_time": args.lead_time,
+              "review_days": args.review}
+    if args.out:
+        from reports import export_purchase_suggestions
+
+        filename = export_purchase_suggestions(db, args.out, args.all, **params)
+        print(f"Liste kaydedildi: {filename}" if filename
+              else "Sipariş önerilecek ürün yok.")
+        return 0
+
+    from forecasting import purchase_suggestions
+
+    rows = purchase_suggestions(db, args.all, **params)
+    if not rows:
+        print("Sipariş önerilecek ürün yok.")
+        return 0
+    print(f"{'Ürün':<32}{'Stok':>7}{'7 gün':>8}{'Üstel':>8}{'Yeter':>8}"
+          f"{'Sip. nok.':>10}{'Öneri':>8}")
+    for (_, name, _, stock, sma_7, _, ewma, cover, reorder_level, _,
+         suggested) in rows:
+        cover = f"{cover:>8.1f}" if cover is not None else f"{'-':>8}"
+        print(f"{name[:31]:<32}{stock:>7}{sma_7:>8.2f}{ewma:>8.2f}{cover}"
+              f"{reorder_level:>10.1f}{suggested:>8}")
+    return 0
+
+
+def cmd_top_sellers(db: DatabaseManager, args) -> int:
+    rows = db.top_sellers(args.days, args.by, args.limit)
+    if not rows:
+        print(f"Son {args.days} günde satış yok.")
+        return 0
+    print(f"{'#':>4}  {'Ürün':<32}{'Adet':>8}{'Ciro':>12}{'Pay %':>8}  ABC")
+    for row in rows:
+        share = f"{row['share'] * 100:>8.1f}" if row["share"] is not None else f"{'-':>8}"
+        print(f"{row['rank']:>4}  {row['name'][:31]:<32}{row['qty']:>8}"
+              f"{row['revenue']:>12.2f}{share}  {row['abc']}")
+    summary = ", ".join(f"{row['abc']}: {row['products']} ürün"
+                        for row in db.abc_summary(args.days))
+    print(f"\nABC ({args.days} gün): {summary}")
+    return 0
+
+
+def cmd_set_reorder(db: DatabaseManager, args) -> int:
+    product = db.find_product_by_barcode(args.barcode)
+    if not product:
+        print(f"Ürün bulunamadı: {args.barcode}")
+        return 1
+    db.set_reorder_point(product["id"], args.level)
+    print(f"{product['name']} için kritik seviye {args.level} olarak ayarlandı.")
+    return 0
+
+
+def cmd_valuation(db: DatabaseManager, args) -> int:
+    if args.rebuild:
+        count = db.rebuild_valuation()
+        print(f"Değerleme yeniden kuruldu ({count} hareket işlendi).")
+    if args.verify:
+        problems = db.verify_valuation()
+        if problems:
+            for problem in problems:
+                print(f"- {problem}")
+            return 1
+        print("Değerleme hareket geçmişiyle tutarlı.")
+        return 0
+
+    if args.products:
+        print(f"{'Ürün':<40}{'Adet':>8}{'Ort. Maliyet':>14}{'FIFO Değer':>14}")
+        for row in db.stock_valuation():
+            print(f"{row['name']:<40}{row['qty']:>8}{row['avg_cost']:>14.2f}"
+                  f"{row['fifo_value']:>14.2f}")
+    value = db.stock_value()
+    print(f"Stok değeri — FIFO: {value['fifo']:.2f}  Ortalama maliyet: {value['average']:.2f}")
+
+    rows = db.cogs_report(args.start, args.end)
+    fifo = sum(row["cogs_fifo"] for row in rows)
+    avg = sum(row["cogs_avg"] for row in rows)
+    print(f"SMM {args.start} – {args.end} — FIFO: {fifo:.2f}  Ortalama maliyet: {avg:.2f}")
+    return 0
+
+
+def cmd_locations(db: DatabaseManager, args) -> int:
+    if not args.location:
+        print(f"{'Konum':<24}{'Ürün':>8}{'Adet':>10}")
+        for row in db.list_locations():
+            print(f"{row['location']:<24}{row['product_count']:>8}{row['qty']:>10}")
+        return 0
+    rows = db.location_stock(args.location)
+    if not rows:
+        print(f"{args.location} konumunda stok yok.")
+        return 0
+    print(f"{'Ürün':<40}{'Barkod':<16}{'Adet':>8}")
+    for row in rows:
+        print(f"{row['name']:<40}{row['barcode'] or '':<16}{row['qty']:>8}")
+    return 0
+
+
+def cmd_transfer(db: DatabaseManager, args) -> int:
+    product = db.find_product_by_barcode(args.barcode)
+    if not product:
+        print(f"Ürün bulunamadı: {args.barcode}")
+        return 1
+    try:
+        db.transfer_stock(product["id"], args.qty, args.source, args.target)
+    except ValueError as e:
+        print(f"Transfer yapılamadı: {e}")
+        return 1
+    print(f"{args.qty} adet {product['name']}: {args.source} → {args.target}")
+    return 0
+
+
+def cmd_receipt(db: DatabaseManager, args) -> int:
+    sale = db.get_sale(args.sale_id)
+    if not sale:
+        print(f"{args.sale_id} numaralı fiş yok.")
+        return 1
+    print(f"Fiş {sale['id']}  {sale['created_at']}")
+    for line in db.get_sale_lines(args.sale_id):
+        print(f"  {line['name']:<36}{line['qty']:>5} x {line['unit_price']:>9.2f}"
+              f"{line['line_total']:>12.2f}")
+    print(f"  {'Toplam':<36}{sale['item_count']:>5}{sale['total']:>24.2f}")
+    return 0
+
+
+def cmd_revenue(db: DatabaseManager, args) -> int:
+    rows = db.revenue_by_period(args.start, args.end, args.by)
+    if not rows:
+        print("Bu dönem için satış kaydı bulunmuyor.")
+        return 0
+    print(f"{'Dönem':<12}{'Fiş':>8}{'Adet':>10}{'Ciro':>14}")
+    for row in rows:
+        print(f"{row['period']:<12}{row['receipts']:>8}{row['items']:>10}{row['revenue']:>14.2f}")
+    return 0
+
+
+def cmd_basket(db: DatabaseManager, args) -> int:
+    rows = db.basket_pairs(args.start, args.end, args.limit)
+    if not rows:
+        print("Bu dönemde birden çok ürün içeren fiş yok.")
+        return 0
+    for row in rows:
+        print(f"{row['receipts']:>6}  {row['name_a']} + {row['name_b']}")
+    return 0
+
+
+def cmd_price_at(db: DatabaseManager, args) -> int:
+    product = db.find_product_by_barcode(args.barcode)
+    if not product:
+        print(f"Ürün bulunamadı: {args.barcode}")
+        return 1
+    at = datetime.fromisoformat(args.at) if args.at else datetime.now()
+    price = db.price_at(product["id"], int(at.timestamp()))
+    if price is None:
+        print(f"{product['name']} için fiyat kaydı yok.")
+        return 1
+    print(f"{product['name']} — {at:%Y-%m-%d %H:%M}: {price:.2f} TL")
+    if args.history:
+        for row in db.get_price_changes(product["id"]):
+            since = datetime.fromtimestamp(row["effective_from"])
+            print(f"  {since:%Y-%m-%d %H:%M}  {row['price']:>10.2f}")
+    return 0
+
+
+def cmd_price_analytics(db: DatabaseManager, args) -> int:
+    if args.out:
+        from reports import export_price_analytics
+
+        filename = export_price_analytics(db, args.start, args.end, args.out, args.by)
+        print(f"Rapor kaydedildi: {filename}" if filename
+              else "Bu dönemde alış kaydı bulunmuyor.")
+        return 0
+
+    from price_analytics import price_analytics_rows
+
+    rows = price_analytics_rows(db, args.start, args.end, args.by, args.limit)
+    if not rows:
+        print("Bu dönemde alış kaydı bulunmuyor.")
+        return 0
+
+    def fmt(value, width):
+        return f"{value:>{width}.2f}" if value is not None else f"{'-':>{width}}"
+
+    print(f"{'Ürün':<32}{'Alış':>6}{'Önceki':>10}{'Son':>10}{'Değişim %':>11}"
+          f"{'Oynaklık %':>12}{'Marj %':>9}{'Kayıp':>8}")
+    for (_, name, _, purchases, base, last, change, volatility, _, margin,
+         erosion) in rows:
+        print(f"{name[:31]:<32}{purchases:>6}{fmt(base, 10)}{fmt(last, 10)}"
+              f"{fmt(change, 11)}{fmt(volatility, 12)}{fmt(margin, 9)}{fmt(erosion, 8)}")
+    return 0
+
+
+def cmd_snapshot(db: DatabaseManager, args) -> int:
+    # Gün sonu stoğu = ertesi günün ilk anındaki stok
+    day = date.fromisoformat(args.date)
+    ts = int(datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp())
+    if args.out:
+        from reports import export_stock_snapshot
+
+        print(f"Stok dökümü kaydedildi: {export_stock_snapshot(db, ts, args.out)}")
+        return 0
+    rows = db.stock_as_of(ts)
+    print(f"{day} gün sonu stoğu")
+    print(f"{'Ürün':<40}{'Barkod':<16}{'Stok':>8}")
+    for row in rows:
+        print(f"{row['name']:<40}{row['barcode'] or '':<16}{row['qty']:>8}")
+    return 0
+
+
+def open_peer(target: str):
+    """Eşitlenecek karşı taraf: servis adresi (http://...) veya veritabanı dosyası"""
+    if target.startswith(("http://", "https://")):
+        from inventory_client import RemoteDatabaseManager
+
+        return RemoteDatabaseManager(target)
+    path = Path(target)
+    if not path.exists():
+        raise SystemExit(f"Veritabanı bulunamadı: {target}")
+    return DatabaseManager(path, profile="bulk-import")
+
+
+def cmd_sync(db: DatabaseManager, args) -> int:
+    peer = open_peer(args.peer)
+    try:
+        pulled, pushed = replication.sync(db, peer, args.batch_size)
+    finally:
+        peer.close()
+    print(f"Alınan: {pulled['applied']} değişiklik ({pulled['skipped']} atlandı)")
+    print(f"Gönderilen: {pushed['applied']} değişiklik ({pushed['skipped']} atlandı)")
+    return 0
+
+
+def cmd_sync_export(db: DatabaseManager, args) -> int:
+    written = replication.export_file(db, args.out, args.peer, args.since, args.batch_size)
+    print(f"{written} değişiklik yazıldı: {args.out}")
+    return 0
+
+
+def cmd_sync_import(db: DatabaseManager, args) -> int:
+    try:
+        result = replication.import_file(db, args.file)
+    except ValueError as e:
+        print(f"İçe aktarılamadı: {e}")
+        return 1
+    print(f"{result['applied']} değişiklik uygulandı ({result['skipped']} atlandı)")
+    return 0
+
+
+def cmd_sync_status(db: DatabaseManager, args) -> int:
+    print(f"Mağaza kimliği: {db.store_id()}")
+    peers = db.sync_peers()
+    if not peers:
+        print("Henüz eşitleme yapılmadı.")
+        return 0
+    print(f"{'Mağaza':<34}{'Alınan':>10}{'Gönderilen':>12}{'Bekleyen':>10}  Son eşitleme")
+    for row in peers:
+        synced = (datetime.fromtimestamp(row["synced_at"]).strftime("%Y-%m-%d %H:%M")
+                  if row["synced_at"] else "-")
+        print(f"{row['peer_id']:<34}{row['received_seq']:>10}{row['sent_seq']:>12}"
+              f"{row['pending']:>10}  {synced}")
+    return 0
+
+
+def cmd_maintain(db: DatabaseManager, args) -> int:
+    if args.log:
+        rows = db.maintenance_log(args.log)
+        if not rows:
+            print("Henüz bakım yapılmadı.")
+            return 0
+        print(f"{'Zaman':<18}{'Görev':<11}{'Durum':<9}{'Süre ms':>10}{'Önce KB':>10}"
+              f"{'Sonra KB':>10}  Ayrıntı")
+        for row in rows:
+            started = datetime.fromtimestamp(row["started_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{started:<18}{row['task']:<11}{row['status']:<9}{row['duration_ms']:>10.1f}"
+                  f"{row['size_before'] // 1024:>10}{row['size_after'] // 1024:>10}"
+                  f"  {row['detail'] or ''}")
+        return 0
+
+    results = db.run_maintenance(args.task, full=args.full)
+    for result in results:
+        print(f"{result['task']:<11}{result['status']:<9}{result['duration_ms']:>10.1f} ms"
+              f"  {result['size_before'] // 1024} KB → {result['size_after'] // 1024} KB"
+              f"  {result['detail']}")
+    return 1 if any(result["status"] == "failed" for result in results) else 0
+
+
+# ---------- Argümanlar --------------------------------------------------
+def add_period_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--from", dest="start", default=date.today().replace(day=1).isoformat(),
+                        help="Başlangıç (YYYY-MM-DD, varsayılan: ayın ilk günü)")
+    parser.add_argument("--to", dest="end", default=date.today().isoformat(),
+                        help="Bitiş (YYYY-MM-DD, varsayılan: bugün)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Stok yönetimi komut satırı")
+    parser.add_argument("--db", default=str(DB_PATH), help="Veritabanı dosyası")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        help="Bağlantı profili (varsayılan: komuta göre)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export-daily", help="Günlük satışları Excel'e aktar")
+    p.add_argument("--out", help="Hedef .xlsx dosyası")
+    p.set_defaults(func=cmd_export_daily)
+
+    p = sub.add_parser("report", help="Dönem satış raporu")
+    p.add_argument("--from", dest="start", default=date.today().replace(day=1).isoformat(),
+                   help="Başlangıç (YYYY-MM-DD, varsayılan: ayın ilk günü)")
+    p.add_argument("--to", dest="end", default=date.today().isoformat(),
+                   help="Bitiş (YYYY-MM-DD, varsayılan: bugün)")
+    p.add_argument("--out", help="Hedef .xlsx/.csv dosyası (verilmezse ekrana yazar)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("import-catalog",
+                       help="CSV'den ürün içe aktar (name,barcode,location,unit_price[,quantity]);"
+                            " quantity her içe aktarımda stok girişi olarak eklenir")
+    p.add_argument("file")
+    p.add_argument("--update", action="store_true",
+                   help="Kayıtlı barkodların ad/konum/fiyatını güncelle")
+    p.add_argument("--encoding", default="utf-8-sig")
+    p.set_defaults(func=cmd_import_catalog)
+
+    p = sub.add_parser("backup", help="Çevrimiçi yedek al")
+    p.add_argument("dest")
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("archive", help="Eski satış hareketlerini arşivle")
+    p.add_argument("--before", required=True, help="Bu tarihten eski hareketler (YYYY-MM-DD)")
+    p.add_argument("--archive-db", required=True, help="Arşiv veritabanı dosyası")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("check", help="Bütünlük kontrolleri")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("low-stock", help="Kritik seviyenin altındaki ürünler (satın alma listesi)")
+    p.add_argument("--out", help="Hedef .xlsx/.csv dosyası (verilmezse ekrana yazar)")
+    p.set_defaults(func=cmd_low_stock)
+
+    p = sub.add_parser("forecast", help="Satış hızı ve sipariş önerisi (tüm katalog)")
+    p.add_argument("--lead-time", type=int, default=7, help="Siparişten teslime gün")
+    p.add_argument("--review", type=int, default=7, help="İki sipariş arası gün")
+    p.add_argument("--window", type=int, default=28, help="Hız hesabındaki gün sayısı")
+    p.add_argument("--all", action="store_true", help="Sipariş gerekmeyenleri de listele")
+    p.add_argument("--out", help="Hedef .xlsx/.csv dosyası (verilmezse ekrana yazar)")
+    p.set_defaults(func=cmd_forecast)
+
+    p = sub.add_parser("top-sellers", help="Son 7/30/90 günün en çok satanları ve ABC sınıfı")
+    p.add_argument("--days", type=int, choices=(7, 30, 90), default=30)
+    p.add_argument("--by", choices=("revenue", "qty"), default="revenue",
+                   help="Sıralama ölçütü: ciro veya adet")
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(func=cmd_top_sellers)
+
+    p = sub.add_parser("set-reorder", help="Ürünün kritik stok seviyesini ayarla")
+    p.add_argument("barcode")
+    p.add_argument("level", type=int)
+    p.set_defaults(func=cmd_set_reorder)
+
+    p = sub.add_parser("valuation", help="Stok değeri ve satılan malın maliyeti (FIFO / ortalama)")
+    p.add_argument("--from", dest="start", default=date.today().replace(day=1).isoformat(),
+                   help="SMM dönemi başlangıcı (YYYY-MM-DD, varsayılan: ayın ilk günü)")
+    p.add_argument("--to", dest="end", default=date.today().isoformat(),
+                   help="SMM dönemi bitişi (YYYY-MM-DD, varsayılan: bugün)")
+    p.add_argument("--products", action="store_true", help="Ürün bazında değerleri de yaz")
+    p.add_argument("--rebuild", action="store_true", help="Değerlemeyi baştan hesapla")
+    p.add_argument("--verify", action="store_true",
+                   help="Kayıtlı değerlemeyi hareket geçmişiyle karşılaştır")
+    p.set_defaults(func=cmd_valuation)
+
+    p = sub.add_parser("locations", help="Konumlar veya bir konumdaki ürünler")
+    p.add_argument("location", nargs="?", help="Konum adı (verilmezse konum listesi)")
+    p.set_defaults(func=cmd_locations)
+
+    p = sub.add_parser("transfer", help="Stoğu iki konum arasında taşı")
+    p.add_argument("barcode")
+    p.add_argument("qty", type=int)
+    p.add_argument("source", help="Kaynak konum")
+    p.add_argument("target", help="Hedef konum")
+    p.set_defaults(func=cmd_transfer)
+
+    p = sub.add_parser("receipt", help="Fiş satırlarını göster")
+    p.add_argument("sale_id", type=int)
+    p.set_defaults(func=cmd_receipt)
+
+    p = sub.add_parser("revenue", help="Günlük veya aylık ciro")
+    add_period_arguments(p)
+    p.add_argument("--by", choices=("day", "month"), default="day")
+    p.set_defaults(func=cmd_revenue)
+
+    p = sub.add_parser("basket", help="En sık birlikte satılan ürün çiftleri")
+    add_period_arguments(p)
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(func=cmd_basket)
+
+    p = sub.add_parser("price-at", help="Ürünün belirli bir andaki birim fiyatı")
+    p.add_argument("barcode")
+    p.add_argument("--at", help="Yerel tarih/saat (YYYY-MM-DD[ HH:MM], varsayılan: şimdi)")
+    p.add_argument("--history", action="store_true", help="Tüm fiyat değişikliklerini de yaz")
+    p.set_defaults(func=cmd_price_at)
+
+    p = sub.add_parser("price-analytics",
+                       help="Alış fiyatı artışı, oynaklık ve marj kaybı (tüm katalog)")
+    add_period_arguments(p)
+    p.add_argument("--by", choices=["increase", "volatility", "erosion"], default="increase",
+                   help="Sıralama: fiyat artışı, oynaklık veya marj kaybı")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--out", help="Tüm ürünleri dosyaya yaz (.xlsx veya .csv)")
+    p.set_defaults(func=cmd_price_analytics)
+
+    p = sub.add_parser("snapshot", help="Belirli bir gün sonundaki stok dökümü")
+    p.add_argument("--date", default=date.today().isoformat(),
+                   help="Gün (YYYY-MM-DD, varsayılan: bugün)")
+    p.add_argument("--out", help="Hedef .xlsx/.csv dosyası (verilmezse ekrana yazar)")
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser("sync", help="Diğer mağazayla iki yönlü eşitle")
+    p.add_argument("peer", help="Servis adresi (http://127.0.0.1:8765) veya veritabanı dosyası")
+    p.add_argument("--batch-size", type=int, default=replication.BATCH_SIZE)
+    p.set_defaults(func=cmd_sync)
+
+    p = sub.add_parser("sync-export", help="Değişiklikleri dosyaya yaz (dosyayla eşitleme)")
+    p.add_argument("--out", required=True, help="Hedef .jsonl dosyası")
+    p.add_argument("--peer", help="Hedef mağaza kimliği (ona gönderilmemiş değişiklikler)")
+    p.add_argument("--since", type=int, help="Bu sıra numarasından sonrası (varsayılan: imleç)")
+    p.add_argument("--batch-size", type=int, default=replication.BATCH_SIZE)
+    p.set_defaults(func=cmd_sync_export)
+
+    p = sub.add_parser("sync-import", help="Diğer mağazanın değişiklik dosyasını uygula")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_sync_import)
+
+    p = sub.add_parser("sync-status", help="Mağaza kimliği ve eşitleme imleçleri")
+    p.set_defaults(func=cmd_sync_status)
+
+    p = sub.add_parser("maintain", help="Veritabanı bakımı (ANALYZE, vacuum, bütünlük)")
+    p.add_argument("--task", nargs="+", choices=maintenance.TASKS,
+                   help="Çalıştırılacak görevler (varsayılan: hepsi)")
+    p.add_argument("--full", action="store_true",
+                   help="Tam VACUUM ve tam kontrol; yazmaları bekletir, mesai dışında çalıştırın")
+    p.add_argument("--log", type=int, metavar="N", help="Son N bakım kaydını göster")
+    p.set_defaults(func=cmd_maintain)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    profile = args.profile or COMMAND_PROFILES.get(args.command, "reporting")
+    db = DatabaseManager(Path(args.db), profile=profile)
+    try:
+        return args.func(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,15 +7,22 @@ from PyQt6.QtWidgets import (
     QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QFormLayout, QTableWidget, QTableWidgetItem, QMessageBox,
     QDoubleSpinBox, QSpinBox, QComboBox, QMainWindow, QFileDialog,
-    QCheckBox, QGroupBox, QHeaderView
+    QCheckBox, QGroupBox, QHeaderView, QDateEdit
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, QDate
+from maintenance import MaintenanceScheduler
 from models import DatabaseManager
-from reports import export_daily_sales
-from sqlite3 import IntegrityError
+from reports import export_daily_sales, export_sales_report, export_price_analytics
+from report_jobs import ReportJobRunner
+from price_analytics import price_analytics_rows
+from price_chart import PriceChart
+from sqlite3 import IntegrityError, OperationalError
 from barcode_handler import BarcodeHandler
-# Fix the datetime import to properly access strptime
-from datetime import datetime
+from cart import Cart
+from sales_journal import SalesJournal
+from stock_take import StockTakeSession
+from tracing import tracer
+from datetime import date, datetime
 
 # -------- Ürünler sekmesi -------------------------------------------
 class ProductTab(QWidget):
@@ -30,12 +37,20 @@ class ProductTab(QWidget):
         )
         layout.addWidget(self.table)
 
+        self._version = None  # Tablonun çizildiği veri sürümü
         self.refresh()
 
     def refresh(self):
+        """Veri sürümü değiştiyse tabloyu yeniden çiz"""
+        version = self.db.data_version()
+        if version == self._version:
+            return
+        self._version = version
+        self.db.catalog.refresh(force=True)   # başka bağlantının ürün yazmaları
+        stock_levels = self.db.stock_levels()
         self.table.setRowCount(0)
-        for row in self.db.list_products():
-            stock = self.db.get_stock_level(row["id"])
+        for row in self.db.catalog.all():
+            stock = stock_levels.get(row["id"], 0)
             values = [row["id"], row["name"], row["barcode"],
                       row["location"], row["initial_price"], row["unit_price"], stock]
             r = self.table.rowCount()
@@ -100,17 +115,7 @@ class SearchProductTab(QWidget):
             return
             
         # Veritabanı sorgusunu gerçekleştir
-        cur = self.db.conn.cursor()
-        cur.execute(
-            """
-            SELECT id, name, barcode, location 
-            FROM Product 
-            WHERE name LIKE ? OR barcode LIKE ?
-            ORDER BY name
-            """, 
-            (f'%{query}%', f'%{query}%')
-        )
-        products = cur.fetchall()
+        products = self.db.catalog.search(query)
         
         # Sonuçları tabloya doldur
         self.results_table.setRowCount(0)
@@ -154,12 +159,15 @@ class AddProductTab(QWidget):
         self.quantity_edit = QSpinBox()
         self.quantity_edit.setRange(0, 9999)
         self.quantity_edit.setValue(0)
+        self.reorder_edit = QSpinBox()
+        self.reorder_edit.setRange(0, 9999)
 
         form.addRow("Ürün Adı", self.name_edit)
         form.addRow("Barkod", self.barcode_edit)
         form.addRow("Konum", self.location_edit)
         form.addRow("Birim Fiyat", self.price_edit)
         form.addRow("Miktar", self.quantity_edit)
+        form.addRow("Kritik Seviye", self.reorder_edit)
 
         add_btn = QPushButton("Ürün Ekle")
         add_btn.clicked.connect(self.add_product)
@@ -181,9 +189,10 @@ class AddProductTab(QWidget):
         location = self.location_edit.text().strip()
         price = self.price_edit.value()
         quantity = self.quantity_edit.value()
+        reorder_point = self.reorder_edit.value()
 
         try:
-            product_id = self.db.add_product(name, barcode, location, price)
+            product_id = self.db.add_product(name, barcode, location, price, reorder_point)
 
             # İlk stok eklemesi
             if (quantity > 0):
@@ -196,6 +205,7 @@ class AddProductTab(QWidget):
             self.location_edit.clear()
             self.price_edit.setValue(0.0)
             self.quantity_edit.setValue(0)
+            self.reorder_edit.setValue(0)
         except IntegrityError:
             QMessageBox.information(
                 self, "Ürün Var",
@@ -205,10 +215,18 @@ class AddProductTab(QWidget):
 
 # -------- Satış sekmesi ----------------------------------------------
 class SalesTab(QWidget):
-    def __init__(self, db: DatabaseManager):
+    def __init__(self, db: DatabaseManager, journal=None):
+        """
+        Args:
+            db: Veri katmanı
+            journal: İsteğe bağlı `SalesJournal`; verilirse satış hareketleri önce
+                yerel günlüğe yazılır ve arka planda ana veritabanına aktarılır.
+        """
         super().__init__()
         self.db = db
-        self.cart = {}
+        self.journal = journal
+        self.cart = Cart()
+        self.known_stock = {}     # ürün id → son bilinen kullanılabilir stok
         self.processing_barcode = False  # İşlem yapılıp yapılmadığını kontrol eden bayrak
 
         v = QVBoxLayout(self)
@@ -219,6 +237,7 @@ class SalesTab(QWidget):
         self.barcode_edit = QLineEdit()
         # returnPressed sinyalini kaldırıyoruz, sadece barkod handler kullanacağız
         # self.barcode_edit.returnPressed.connect(self.scan)
+        self.barcode_edit.setPlaceholderText("Toptan satış için: 12*barkod")
         h.addWidget(self.barcode_edit)
 
         # Barkod okuyucu entegrasyonu
@@ -226,6 +245,13 @@ class SalesTab(QWidget):
         self.barcode_edit.installEventFilter(self.barcode_handler)
         self.barcode_handler.barcode_detected.connect(self.handle_barcode)
 
+        # Sonraki okutmanın adedi (bir kez okut, 12 yaz)
+        h.addWidget(QLabel("Adet:"))
+        self.qty_spin = QSpinBox()
+        self.qty_spin.setRange(1, 99999)
+        self.qty_spin.setValue(1)
+        h.addWidget(self.qty_spin)
+
         # Add button for users who prefer clicking
         add_btn = QPushButton("Ekle")
         add_btn.clicked.connect(self.scan)
@@ -259,6 +285,15 @@ class SalesTab(QWidget):
         self.total_lbl.setAlignment(Qt.AlignmentFlag.AlignRight)
         v.addWidget(self.total_lbl)
 
+        # Günlükte bekleyen (henüz ana veritabanına yazılmamış) kayıt durumu
+        self.journal_lbl = QLabel("")
+        self.journal_lbl.setStyleSheet("color: gray;")
+        v.addWidget(self.journal_lbl)
+        if self.journal is not None:
+            self.journal_timer = QTimer(self)
+            self.journal_timer.timeout.connect(self.update_journal_status)
+            self.journal_timer.start(2000)
+
         # Satışı Tamamla butonu
         complete_btn = QPushButton("Satışı Tamamla")
         complete_btn.clicked.connect(self.complete_sale)
@@ -271,8 +306,9 @@ class SalesTab(QWidget):
 
         self.processing_barcode = True  # İşlem başladı
         try:
-            self.barcode_edit.setText(barcode)
-            self.scan()
+            with tracer.span("sales.handle_barcode"):
+                self.barcode_edit.setText(barcode)
+                self.scan()
         finally:
             self.processing_barcode = False  # İşlem bitti
             self.barcode_edit.setFocus()  # İmleci tekrar barkod alanına getir
@@ -287,14 +323,41 @@ class SalesTab(QWidget):
         if not code:
             return
 
-        product = self.db.find_product_by_barcode(code)
+        # "12*barkod" biçimi: adet barkodla birlikte yazılır
+        qty = self.qty_spin.value()
+        count, sep, rest = code.partition("*")
+        if sep and count.strip().isdigit() and rest.strip():
+            qty, code = int(count), rest.strip()
+        self.qty_spin.setValue(1)
+        if qty <= 0:
+            return
+
+        with tracer.span("sales.scan"):
+            self._scan_code(code, qty)
+
+    def _scan_code(self, code, qty=1):
+        """Okutulan barkodu sepete ekler (katalog + stok kontrolü + tek satır güncelleme)"""
+        offline = False
+        with tracer.span("sales.catalog.lookup"):
+            try:
+                # Katalog bellekte: yüklendikten sonra veritabanına ulaşılamasa
+                # da bellekteki kayıtlar kullanılır (bkz. ProductCatalog.refresh)
+                product = self.db.catalog.by_barcode(code)
+            except OperationalError:
+                if self.journal is None:
+                    raise
+                product = None  # Katalog hiç yüklenemedi
+                offline = True
         if not product:
             QMessageBox.warning(self, "Barkod Yok",
                                 "Bu barkod sisteme kayıtlı değil.")
             return
 
-        pid, name, price = product["id"], product["name"], product["unit_price"]
-        mevcut_stok = self.db.get_stock_level(pid)
+        pid, name = product.id, product.name
+        with tracer.span("sales.db.stock_level"):
+            # Sepetteki adetler satış tamamlanana kadar veritabanına yazılmaz
+            line = self.cart.line(pid)
+            mevcut_stok = self.current_stock(pid, offline) - (line.qty if line else 0)
         if mevcut_stok <= 0:
             QMessageBox.warning(
                 self, "Stok Yetersiz",
@@ -302,72 +365,119 @@ class SalesTab(QWidget):
                 "Önce stok girişi yapmalısınız."
             )
             return
+        if mevcut_stok < qty:
+            QMessageBox.warning(
+                self, "Stok Yetersiz",
+                f"'{name}' için yalnızca {mevcut_stok} adet stok var."
+            )
+            return
 
-        # Stok var → satış kaydet
-        self.db.change_stock(pid, -1, "SALE")
-        self.cart.setdefault(pid, {"name": name, "price": price, "qty": 0})
-        self.cart[pid]["qty"] += 1
-        self.refresh()
+        # Stok var → sepete ekle (hareket `complete_sale` ile fişle birlikte yazılır)
+        line = self.cart.add(product, qty)
+        with tracer.span("sales.refresh"):
+            self.show_line(line)
+            self.update_total()
+
+    def current_stock(self, product_id, offline=False):
+        """
+        Satış için kullanılabilir stok: veritabanındaki seviye + günlükte
+        bekleyen hareketler. Çevrimdışıyken son bilinen seviye kullanılır.
+        """
+        if self.journal is None:
+            return self.db.get_stock_level(product_id)
+        if not offline:
+            try:
+                level = (self.db.get_stock_level(product_id)
+                         + self.journal.pending_delta(product_id))
+                self.known_stock[product_id] = level
+                return level
+            except OperationalError:
+                pass
+        # Seviye hiç okunamadıysa satışı engelleme; fark aktarımda düzelir
+        return self.known_stock.get(product_id, 1)
+
+    def update_journal_status(self):
+        """Günlükte bekleyen kayıt sayısını ve son aktarım hatasını göster"""
+        pending = self.journal.pending_count()
+        if not pending:
+            self.journal_lbl.setText("")
+        elif self.journal.last_error:
+            self.journal_lbl.setText(
+                f"Çevrimdışı: {pending} kayıt bekliyor ({self.journal.last_error})")
+        else:
+            self.journal_lbl.setText(f"Aktarılıyor: {pending} kayıt bekliyor")
 
     def remove_selected_item(self):
-        """Seçilen ürünü sepetten çıkar ve stok durumunu güncelle"""
-        selected_row = self.table.currentRow()
-        if selected_row < 0:
+        """Seçilen satırdan bir adet çıkar (sepet henüz stoğa yazılmadı)"""
+        line = self.cart.line_at(self.table.currentRow())
+        if line is None:
             QMessageBox.information(self, "Seçim Yok", "Lütfen sepetten çıkarılacak bir ürün seçin.")
             return
-            
-        # Seçilen ürünün adını al
-        product_name = self.table.item(selected_row, 0).text()
-        
-        # Ürün ID'sini bul
-        product_id = None
-        for pid, item in self.cart.items():
-            if item["name"] == product_name:
-                product_id = pid
-                break
-                
-        if product_id is None:
-            QMessageBox.warning(self, "Hata", "Seçilen ürün bulunamadı.")
-            return
-            
-        # Sepetteki miktarı azalt
-        self.cart[product_id]["qty"] -= 1
-        
-        # Eğer miktar 0'a düştüyse, ürünü tamamen sepetten çıkar
-        if self.cart[product_id]["qty"] <= 0:
-            del self.cart[product_id]
-            
-        # Stok durumunu düzelt (satışı iptal et)
-        self.db.change_stock(product_id, 1, "ADJUST")
-        
-        # Tabloyu güncelle
-        self.refresh()
-        
-        QMessageBox.information(self, "Başarılı", f"'{product_name}' ürünü sepetten çıkarıldı.")
+
+        # Sepetteki miktarı azalt; 0'a düşerse satır çıkarılır, yerine son satır gelir
+        row = line.row
+        line, moved = self.cart.set_qty(line.product_id, line.qty - 1)
+        if line.qty > 0:
+            self.show_line(line)
+        else:
+            if moved is not None:
+                self.show_line(moved)
+            self.table.removeRow(len(self.cart) if moved is not None else row)
+        self.update_total()
+
+        QMessageBox.information(self, "Başarılı", f"'{line.name}' ürünü sepetten çıkarıldı.")
+
+    def show_line(self, line):
+        """Yalnızca değişen sepet satırını tabloya yazar"""
+        if line.row >= self.table.rowCount():
+            self.table.insertRow(line.row)
+        values = [line.name, line.qty, f"{line.unit_price:.2f}", f"{line.subtotal:.2f}"]
+        for c, val in enumerate(values):
+            item = self.table.item(line.row, c)
+            if item is None:
+                self.table.setItem(line.row, c, QTableWidgetItem(str(val)))
+            else:
+                item.setText(str(val))
+
+    def update_total(self):
+        self.total_lbl.setText(f"Toplam: {self.cart.total:.2f}")
 
     def refresh(self):
+        """Sepet tablosunu baştan çizer"""
         self.table.setRowCount(0)
-        total = 0.0
-        for item in self.cart.values():
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-            subtotal = item["qty"] * item["price"]
-            for c, val in enumerate(
-                [item["name"], item["qty"],
-                 f"{item['price']:.2f}", f"{subtotal:.2f}"]
-            ):
-                self.table.setItem(r, c, QTableWidgetItem(str(val)))
-            total += subtotal
-        self.total_lbl.setText(f"Toplam: {total:.2f}")
+        for line in self.cart:
+            self.show_line(line)
+        self.update_total()
+
+    def clear_cart(self):
+        self.cart.clear()
+        self.table.setRowCount(0)
+        self.update_total()
 
     def complete_sale(self):
         if not self.cart:
             QMessageBox.warning(self, "Boş Sepet", "Sepette ürün bulunmuyor.")
             return
 
-        self.cart.clear()
-        self.refresh()
-        QMessageBox.information(self, "Satış Tamamlandı", "Satış başarıyla tamamlandı.")
+        # Fiş satırları okutma anındaki ad ve fiyatı taşır; stok hareketleri
+        # fişle aynı işlemde yazılır
+        lines = self.cart.receipt_lines()
+        if self.journal is not None:
+            self.journal.record_sale(lines)
+            for line in lines:
+                if line["product_id"] in self.known_stock:
+                    self.known_stock[line["product_id"]] -= line["qty"]
+            message = "Satış başarıyla tamamlandı."
+        else:
+            try:
+                sale_id = self.db.record_sale(lines)
+            except OperationalError as e:
+                QMessageBox.critical(self, "Hata", f"Fiş kaydedilemedi, tekrar deneyin: {e}")
+                return
+            message = f"Satış başarıyla tamamlandı.\nFiş No: {sale_id}"
+
+        self.clear_cart()
+        QMessageBox.information(self, "Satış Tamamlandı", message)
 
 # -------- Stok Girişi sekmesi -----------------------------
 class StockInTab(QWidget):
@@ -422,7 +532,7 @@ class StockInTab(QWidget):
         self.barcode_edit.setText(barcode)
 
         # Otomatik ürün bilgilerini getir
-        product = self.db.find_product_by_barcode(barcode)
+        product = self.db.catalog.by_barcode(barcode)
         if product:
             # Ürün bulunduğunda bilgileri göster
             self.current_product = product
@@ -448,7 +558,7 @@ class StockInTab(QWidget):
     def add_stock(self):
         if not self.current_product:
             code = self.barcode_edit.text().strip()
-            row = self.db.find_product_by_barcode(code)
+            row = self.db.catalog.by_barcode(code)
             if not row:
                 QMessageBox.warning(self, "Bulunamadı", "Barkod kayıtlı değil.")
                 return
@@ -588,21 +698,12 @@ class DeleteProductTab(QWidget):
             return
         
         # Önce barkod ile birebir eşleşme ara (tam eşleşme)
-        product = self.db.find_product_by_barcode(query)
+        product = self.db.catalog.by_barcode(query)
         
         if not product:
             # Barkod eşleşmesi bulunamadıysa, ad ile ara (içinde geçen)
-            cur = self.db.conn.cursor()
-            cur.execute(
-                """
-                SELECT id, name, barcode, location
-                FROM Product 
-                WHERE name LIKE ? OR barcode LIKE ?
-                LIMIT 1  -- Sadece ilk eşleşmeyi al
-                """, 
-                (f'%{query}%', f'%{query}%')
-            )
-            product = cur.fetchone()
+            matches = self.db.catalog.search(query, limit=1)  # Sadece ilk eşleşmeyi al
+            product = matches[0] if matches else None
         
         if not product:
             self.product_info.setText(f"'{query}' ile eşleşen ürün bulunamadı.")
@@ -658,9 +759,21 @@ class DeleteProductTab(QWidget):
 
 # -------- Rapor Sekmesi -----------------------------------------
 class ReportTab(QWidget):
-    def __init__(self, db: DatabaseManager):
+    def __init__(self, db: DatabaseManager, jobs=None):
+        """
+        Args:
+            db: Veri katmanı
+            jobs: İsteğe bağlı `ReportJobRunner`; verilirse sorgular ve dosya
+                yazımı arka plandaki süreç havuzunda çalışır.
+        """
         super().__init__()
         self.db = db
+        self.jobs = jobs
+        self.pending_refresh = None  # Çalışan "daily_rows" işinin numarası
+        self.pending_prices = None   # Çalışan "price_rows" işinin numarası
+        self.pending_top = None      # Çalışan "top_sellers" işinin numarası
+        self._shown_version = None   # Tablodaki günlük raporun (gün, veri sürümü)
+        self.export_paths = {}       # iş numarası → hedef dosya
 
         layout = QVBoxLayout(self)
 
@@ -675,13 +788,128 @@ class ReportTab(QWidget):
         export_btn.clicked.connect(self.export_to_excel)
         layout.addWidget(export_btn)
 
-        # Tabloyu doldur
+        # Dönem raporu
+        period_layout = QHBoxLayout()
+        today = QDate.currentDate()
+        self.start_edit = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.end_edit = QDateEdit(today)
+        for edit in (self.start_edit, self.end_edit):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("dd.MM.yyyy")
+        period_layout.addWidget(QLabel("Dönem:"))
+        period_layout.addWidget(self.start_edit)
+        period_layout.addWidget(self.end_edit)
+        period_btn = QPushButton("Dönem Raporunu Aktar")
+        period_btn.clicked.connect(self.export_period)
+        period_layout.addWidget(period_btn)
+        layout.addLayout(period_layout)
+
+        # Fiş sorgulama
+        receipt_layout = QHBoxLayout()
+        receipt_layout.addWidget(QLabel("Fiş No:"))
+        self.receipt_spin = QSpinBox()
+        self.receipt_spin.setRange(1, 2_000_000_000)
+        receipt_layout.addWidget(self.receipt_spin)
+        receipt_btn = QPushButton("Fişi Göster")
+        receipt_btn.clicked.connect(self.show_receipt)
+        receipt_layout.addWidget(receipt_btn)
+        receipt_layout.addStretch()
+        layout.addLayout(receipt_layout)
+
+        # Alış fiyatı analizi (dönem yukarıdaki tarihlerden alınır)
+        layout.addWidget(QLabel("Alış Fiyatı Analizi"))
+        price_layout = QHBoxLayout()
+        self.price_sort = QComboBox()
+        for text, key in (("En büyük fiyat artışı", "increase"),
+                          ("En oynak fiyatlar", "volatility"),
+                          ("En çok marj kaybı", "erosion")):
+            self.price_sort.addItem(text, key)
+        price_layout.addWidget(self.price_sort)
+        price_show_btn = QPushButton("Analizi Göster")
+        price_show_btn.clicked.connect(self.show_price_analytics)
+        price_layout.addWidget(price_show_btn)
+        price_export_btn = QPushButton("Analizi Aktar")
+        price_export_btn.clicked.connect(self.export_price_analytics)
+        price_layout.addWidget(price_export_btn)
+        price_layout.addStretch()
+        layout.addLayout(price_layout)
+        self.price_table = QTableWidget(0, 8)
+        self.price_table.setHorizontalHeaderLabels(
+            ["Ürün", "Alış", "Önceki Alış", "Son Alış", "Değişim %", "Oynaklık %",
+             "Marj %", "Marj Kaybı"])
+        self.price_table.horizontalHeader().setSectionResizeMode(
+            0, QHeaderView.ResizeMode.Stretch)
+        self.price_table.setMaximumHeight(220)
+        layout.addWidget(self.price_table)
+
+        # En çok satanlar (hazır sıralamadan; ilk k satır okunur)
+        layout.addWidget(QLabel("En Çok Satanlar"))
+        top_layout = QHBoxLayout()
+        self.top_days = QComboBox()
+        for days in (7, 30, 90):
+            self.top_days.addItem(f"Son {days} gün", days)
+        self.top_days.setCurrentIndex(1)
+        top_layout.addWidget(self.top_days)
+        self.top_by = QComboBox()
+        self.top_by.addItem("Ciroya göre", "revenue")
+        self.top_by.addItem("Adede göre", "qty")
+        top_layout.addWidget(self.top_by)
+        self.top_limit = QSpinBox()
+        self.top_limit.setRange(5, 500)
+        self.top_limit.setValue(20)
+        top_layout.addWidget(self.top_limit)
+        top_btn = QPushButton("Sıralamayı Göster")
+        top_btn.clicked.connect(self.show_top_sellers)
+        top_layout.addWidget(top_btn)
+        top_layout.addStretch()
+        layout.addLayout(top_layout)
+        self.abc_label = QLabel()
+        layout.addWidget(self.abc_label)
+        self.top_table = QTableWidget(0, 6)
+        self.top_table.setHorizontalHeaderLabels(
+            ["Sıra", "Ürün", "Adet", "Ciro", "Küm. Pay %", "ABC"])
+        self.top_table.horizontalHeader().setSectionResizeMode(
+            1, QHeaderView.ResizeMode.Stretch)
+        self.top_table.setMaximumHeight(220)
+        layout.addWidget(self.top_table)
+
+        # Arka plan işleri
+        if self.jobs is not None:
+            layout.addWidget(QLabel("Rapor İşleri"))
+            self.jobs_table = QTableWidget(0, 3)
+            self.jobs_table.setHorizontalHeaderLabels(["İş", "Durum", "İlerleme"])
+            self.jobs_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+            self.jobs_table.horizontalHeader().setSectionResizeMode(
+                1, QHeaderView.ResizeMode.Stretch)
+            self.jobs_table.setMaximumHeight(140)
+            layout.addWidget(self.jobs_table)
+            cancel_btn = QPushButton("Seçili İşi İptal Et")
+            cancel_btn.clicked.connect(self.cancel_selected_job)
+            layout.addWidget(cancel_btn)
+            self.job_rows = {}  # iş numarası → tablo satırı
+
+            self.poll_timer = QTimer(self)
+            self.poll_timer.timeout.connect(self.poll_jobs)
+
+        # Tabloyu doldur (iş yürütücüsü varsa ilk açılış da arka planda)
         self.refresh_report()
 
     def refresh_report(self):
         """Tabloyu günlük satış verileriyle doldur"""
+        if self.jobs is None:
+            # Gün ve veri sürümü aynıysa tablo zaten güncel
+            version = (date.today(), self.db.data_version())
+            if version != self._shown_version:
+                self._shown_version = version
+                self.show_rows(self.db.daily_sales_report())
+            return
+        if self.pending_refresh is not None:
+            return  # Önceki yenileme hâlâ çalışıyor
+        self.pending_refresh = self.submit_job("daily_rows", "Günlük rapor")
+
+    def show_rows(self, sales):
+        self.table.clearSpans()
         self.table.setRowCount(0)
-        sales = self.db.daily_sales_report()
 
         if not sales:
             self.table.setRowCount(1)
@@ -699,31 +927,216 @@ class ReportTab(QWidget):
                     item = QTableWidgetItem(f"{value:.2f} TL")
                 self.table.setItem(r, c, item)
 
-    def export_to_excel(self):
-        """Günlük satış raporunu Excel dosyasına aktar"""
+    def show_receipt(self):
+        """Fiş numarasına göre fiş satırlarını göster"""
+        sale_id = self.receipt_spin.value()
+        sale = self.db.get_sale(sale_id)
+        if not sale:
+            QMessageBox.warning(self, "Bulunamadı", f"{sale_id} numaralı fiş yok.")
+            return
+        lines = [f"{line['name']}  {line['qty']} x {line['unit_price']:.2f}"
+                 f" = {line['line_total']:.2f} TL"
+                 for line in self.db.get_sale_lines(sale_id)]
+        QMessageBox.information(
+            self, f"Fiş {sale_id}",
+            f"Tarih: {sale['created_at']}\n\n" + "\n".join(lines)
+            + f"\n\nToplam: {sale['total']:.2f} TL"
+        )
+
+    def ask_export_path(self, title):
         path, _ = QFileDialog.getSaveFileName(
-            self, "Excel'e Kaydet", "", "Excel Dosyaları (*.xlsx)"
+            self, title, "", "Excel Dosyaları (*.xlsx)"
         )
+        if path and not path.endswith(".xlsx"):
+            path += ".xlsx"
+        return path
 
+    def export_to_excel(self):
+        """Günlük satış raporunu Excel dosyasına aktar"""
+        path = self.ask_export_path("Excel'e Kaydet")
         if not path:
             return  # Kullanıcı iptal etti
 
-        if not path.endswith(".xlsx"):
-            path += ".xlsx"
+        if self.jobs is not None:
+            job_id = self.submit_job("daily_export", "Günlük Excel", path=path)
+            self.export_paths[job_id] = path
+            return
 
         filename = export_daily_sales(self.db, path)
+        self.export_finished(filename)
+
+    def export_period(self):
+        """Seçilen dönemin satış raporunu Excel dosyasına aktar"""
+        start, end = self.period()
+        path = self.ask_export_path("Dönem Raporunu Kaydet")
+        if not path:
+            return
+
+        if self.jobs is not None:
+            job_id = self.submit_job("period_export", f"Dönem {start} – {end}",
+                                     start=start, end=end, path=path)
+            self.export_paths[job_id] = path
+            return
+
+        filename = export_sales_report(self.db, start, end, path)
+        self.export_finished(filename, "Bu dönem için satış kaydı bulunmuyor.")
+
+    def period(self):
+        return (self.start_edit.date().toString("yyyy-MM-dd"),
+                self.end_edit.date().toString("yyyy-MM-dd"))
+
+    def show_price_analytics(self):
+        """Seçilen dönemin alış fiyatı analizini (ilk 50 ürün) tabloya getir"""
+        start, end = self.period()
+        by = self.price_sort.currentData()
+        if self.jobs is not None:
+            if self.pending_prices is None:
+                self.pending_prices = self.submit_job(
+                    "price_rows", f"Fiyat analizi {start} – {end}",
+                    start=start, end=end, by=by, limit=50)
+            return
+        self.show_price_rows(price_analytics_rows(self.db, start, end, by, 50))
+
+    def show_price_rows(self, rows):
+        self.price_table.clearSpans()
+        self.price_table.setRowCount(0)
+        if not rows:
+            self.price_table.setRowCount(1)
+            self.price_table.setSpan(0, 0, 1, 8)
+            self.price_table.setItem(0, 0, QTableWidgetItem("Bu dönemde alış kaydı bulunmuyor."))
+            self.price_table.item(0, 0).setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            return
+        self.price_table.setRowCount(len(rows))
+        for r, (_, name, _, purchases, base, last, change, volatility, _, margin,
+                erosion) in enumerate(rows):
+            values = [name, str(purchases)] + [
+                "-" if v is None else f"{v:.2f}"
+                for v in (base, last, change, volatility, margin, erosion)]
+            for c, value in enumerate(values):
+                self.price_table.setItem(r, c, QTableWidgetItem(value))
+
+    def export_price_analytics(self):
+        """Seçilen dönemin alış fiyatı analizini (tüm ürünler) dosyaya aktar"""
+        start, end = self.period()
+        by = self.price_sort.currentData()
+        path = self.ask_export_path("Fiyat Analizini Kaydet")
+        if not path:
+            return
+
+        if self.jobs is not None:
+            job_id = self.submit_job("price_export", f"Fiyat analizi {start} – {end}",
+                                     start=start, end=end, path=path, by=by)
+            self.export_paths[job_id] = path
+            return
+
+        filename = export_price_analytics(self.db, start, end, path, by)
+        self.export_finished(filename, "Bu dönemde alış kaydı bulunmuyor.")
+
+    def show_top_sellers(self):
+        """Seçilen penceredeki en çok satanları ve ABC dağılımını göster"""
+        days = self.top_days.currentData()
+        by, limit = self.top_by.currentData(), self.top_limit.value()
+        if self.jobs is not None:
+            # Sıralama işçi süreçte okunur; bakımın "stock" görevi onu güncel tutar
+            if self.pending_top is None:
+                self.pending_top = self.submit_job(
+                    "top_sellers", f"En çok satanlar ({days} gün)",
+                    days=days, by=by, limit=limit)
+            return
+        # Servis modu: sıralamayı servis günceller
+        self.show_top_rows(days, self.db.top_sellers(days, by, limit),
+                           self.db.abc_summary(days))
+
+    def show_top_rows(self, days, rows, summary):
+        self.abc_label.setText("  ".join(
+            f"{row['abc']}: {row['products']} ürün, {row['revenue']:.2f} TL"
+            for row in summary))
+
+        self.top_table.clearSpans()
+        self.top_table.setRowCount(0)
+        if not rows:
+            self.top_table.setRowCount(1)
+            self.top_table.setSpan(0, 0, 1, 6)
+            self.top_table.setItem(0, 0, QTableWidgetItem(f"Son {days} günde satış bulunmuyor."))
+            self.top_table.item(0, 0).setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            return
+        self.top_table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            share = "-" if row["share"] is None else f"{row['share'] * 100:.1f}"
+            values = [str(row["rank"]), row["name"], str(row["qty"]),
+                      f"{row['revenue']:.2f} TL", share, row["abc"]]
+            for c, value in enumerate(values):
+                self.top_table.setItem(r, c, QTableWidgetItem(value))
+
+    def export_finished(self, filename, empty_message="Bugün için satış kaydı bulunmuyor."):
         if filename:
             QMessageBox.information(
                 self, "Başarılı", f"Rapor başarıyla kaydedildi:\n{filename}"
             )
         else:
-            QMessageBox.warning(
-                self, "Veri Yok", "Bugün için satış kaydı bulunmuyor."
-            )
+            QMessageBox.warning(self, "Veri Yok", empty_message)
+
+    # ---------- Arka plan işleri ----------------------------------------
+    def submit_job(self, kind, title, **params):
+        job_id = self.jobs.submit(kind, **params)
+        r = self.jobs_table.rowCount()
+        self.jobs_table.insertRow(r)
+        self.jobs_table.setItem(r, 0, QTableWidgetItem(f"#{job_id} {title}"))
+        self.jobs_table.setItem(r, 1, QTableWidgetItem("Sırada"))
+        self.jobs_table.setItem(r, 2, QTableWidgetItem("0%"))
+        self.job_rows[job_id] = r
+        if not self.poll_timer.isActive():
+            self.poll_timer.start(200)
+        return job_id
+
+    def cancel_selected_job(self):
+        r = self.jobs_table.currentRow()
+        for job_id, row in self.job_rows.items():
+            if row == r:
+                self.jobs.cancel(job_id)
+                return
+
+    def poll_jobs(self):
+        """İşçi süreçlerden gelen ilerleme ve sonuçları arayüze yansıt"""
+        for event in self.jobs.poll():
+            r = self.job_rows.get(event.job_id)
+            if r is not None:
+                status = {"progress": event.message, "done": "Tamamlandı",
+                          "failed": f"Hata: {event.message}",
+                          "cancelled": "İptal edildi"}[event.state]
+                self.jobs_table.setItem(r, 1, QTableWidgetItem(status))
+                self.jobs_table.setItem(r, 2, QTableWidgetItem(f"{event.percent}%"))
+
+            if event.job_id == self.pending_refresh and event.state != "progress":
+                self.pending_refresh = None
+                if event.state == "done":
+                    self.show_rows(event.result)
+            elif event.job_id == self.pending_prices and event.state != "progress":
+                self.pending_prices = None
+                if event.state == "done":
+                    self.show_price_rows(event.result)
+            elif event.job_id == self.pending_top and event.state != "progress":
+                self.pending_top = None
+                if event.state == "done":
+                    self.show_top_rows(*event.result)
+            elif event.job_id in self.export_paths and event.state != "progress":
+                self.export_paths.pop(event.job_id)
+                if event.state == "done":
+                    empty = {"period_export": "Bu dönem için satış kaydı bulunmuyor.",
+                             "price_export": "Bu dönemde alış kaydı bulunmuyor.",
+                             }.get(event.kind, "Bugün için satış kaydı bulunmuyor.")
+                    self.export_finished(event.result, empty)
+                elif event.state == "failed":
+                    QMessageBox.critical(self, "Hata", f"Rapor oluşturulamadı: {event.message}")
+
+        if not self.jobs.active_jobs():
+            self.poll_timer.stop()
 
 
 # -------- Fiyat Takibi sekmesi -------------------------------------
 class PriceHistoryTab(QWidget):
+    HISTORY_PAGE = 200  # Tabloya bir seferde yüklenen alış sayısı
+
     def __init__(self, db: DatabaseManager):
         super().__init__()
         self.db = db
@@ -760,11 +1173,24 @@ class PriceHistoryTab(QWidget):
         self.product_info = QLabel("Lütfen bir ürün seçin")
         layout.addWidget(self.product_info)
 
-        # Fiyat geçmişi tablosu
+        # Fiyat geçmişi grafiği (uzun geçmişlerde seyreltilmiş noktalar)
         layout.addWidget(QLabel("Fiyat Geçmişi:"))
+        self.chart = PriceChart()
+        layout.addWidget(self.chart, 1)
+
+        # Ham alış listesi: istenince, sayfa sayfa yüklenir
+        self.table_btn = QPushButton("Tabloyu Göster")
+        self.table_btn.setCheckable(True)
+        self.table_btn.toggled.connect(self.toggle_table)
+        layout.addWidget(self.table_btn)
+
         self.table = QTableWidget(0, 3)
         self.table.setHorizontalHeaderLabels(["Tarih", "Alış Fiyatı", "Değişim"])
-        layout.addWidget(self.table)
+        self.table.setVisible(False)
+        self.table.verticalScrollBar().valueChanged.connect(self.table_scrolled)
+        layout.addWidget(self.table, 1)
+        self.loaded_rows = 0
+        self.history_exhausted = True
 
         # Tablo ayarları
         header = self.table.horizontalHeader()
@@ -784,7 +1210,7 @@ class PriceHistoryTab(QWidget):
             QMessageBox.information(self, "Bilgi", "Lütfen bir arama terimi girin.")
             return
 
-        products = self.db.search_products_for_price_history(query)
+        products = self.db.catalog.search(query)
 
         self.product_combo.clear()
         if not products:
@@ -812,7 +1238,7 @@ class PriceHistoryTab(QWidget):
         self.current_product_id = product_id
 
         # Ürün bilgisini getir
-        product = self.db.get_product_by_id(product_id)
+        product = self.db.catalog.get(product_id)
         if not product:
             return
 
@@ -827,28 +1253,58 @@ class PriceHistoryTab(QWidget):
         self.show_price_history()
 
     def show_price_history(self):
-        """Seçilen ürünün fiyat geçmişini tabloda göster"""
+        """Seçilen ürünün fiyat geçmişini grafikte göster; tablo açıksa ilk sayfayı yükle"""
+        self.table.clearSpans()
         self.table.setRowCount(0)
+        self.loaded_rows = 0
+        self.history_exhausted = True
 
         if not self.current_product_id:
+            self.chart.clear()
+            return
+
+        product = self.db.catalog.get(self.current_product_id)
+        points = self.db.price_history_points(self.current_product_id)
+        self.chart.set_series(points, product['unit_price'] if product else None)
+
+        self.history_exhausted = False
+        if self.table_btn.isChecked():
+            self.load_more_history()
+
+    def toggle_table(self, checked):
+        """Ham alış tablosunu göster / gizle (ilk açılışta ilk sayfa yüklenir)"""
+        self.table.setVisible(checked)
+        self.table_btn.setText("Tabloyu Gizle" if checked else "Tabloyu Göster")
+        if checked and self.loaded_rows == 0 and not self.history_exhausted:
+            self.load_more_history()
+
+    def table_scrolled(self, value):
+        """Tablo sonuna kaydırılınca sonraki sayfayı yükle"""
+        if value >= self.table.verticalScrollBar().maximum() and not self.history_exhausted:
+            self.load_more_history()
+
+    def load_more_history(self):
+        """Fiyat geçmişinin sonraki sayfasını (yeniden eskiye) tabloya ekle"""
+        if not self.current_product_id or self.history_exhausted:
             return
 
-        price_history = self.db.get_product_price_history(self.current_product_id)
+        # Son satırın değişimini hesaplamak için bir satır fazla okunur
+        page = self.db.get_product_price_history(
+            self.current_product_id, self.HISTORY_PAGE + 1, self.loaded_rows)
+        self.history_exhausted = len(page) <= self.HISTORY_PAGE
 
-        if not price_history:
+        if not page and self.loaded_rows == 0:
             self.table.setRowCount(1)
             self.table.setItem(0, 0, QTableWidgetItem("Bu ürün için fiyat geçmişi bulunamadı."))
             self.table.setSpan(0, 0, 1, 3)
             return
 
-        # Fiyat değişimlerini hesapla ve sırala
-        previous_price = price_history[-1]['purchase_price'] if len(price_history) > 0 else None
-
-        for row_idx, item in enumerate(price_history):
+        for idx, item in enumerate(page[:self.HISTORY_PAGE]):
+            row_idx = self.table.rowCount()
             self.table.insertRow(row_idx)
 
             # Tarih formatla
-            date_str = datetime.strptime(item['timestamp'], "%Y-%m-%d %H:%M:%S").strftime("%d.%m.%Y %H:%M")
+            date_str = datetime.fromtimestamp(item['ts']).strftime("%d.%m.%Y %H:%M")
             self.table.setItem(row_idx, 0, QTableWidgetItem(date_str))
 
             # Fiyat
@@ -856,9 +1312,9 @@ class PriceHistoryTab(QWidget):
             price_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
             self.table.setItem(row_idx, 1, price_item)
 
-            # Değişim
-            if row_idx < len(price_history) - 1:
-                next_price = price_history[row_idx + 1]['purchase_price']
+            # Değişim (bir önceki alışa göre)
+            if idx < len(page) - 1:
+                next_price = page[idx + 1]['purchase_price']
                 if next_price > 0:
                     price_diff = item['purchase_price'] - next_price
                     percent_change = (price_diff / next_price) * 100
@@ -875,20 +1331,498 @@ class PriceHistoryTab(QWidget):
 
                     change_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
                     self.table.setItem(row_idx, 2, change_item)
-
-            # İlk satırsa değişim bilgisi olmaz
-            if row_idx == len(price_history) - 1:
+            else:
+                # En eski alış: değişim bilgisi olmaz
                 self.table.setItem(row_idx, 2, QTableWidgetItem("İlk alım"))
 
+        self.loaded_rows += min(len(page), self.HISTORY_PAGE)
+
+
+# -------- Kritik Stok sekmesi ---------------------------------------
+class LowStockTab(QWidget):
+    """Stoğu kritik seviyesinde veya altında olan ürünler (satın alma listesi)"""
+
+    REFRESH_MS = 5000
+
+    def __init__(self, db: DatabaseManager):
+        super().__init__()
+        self.db = db
+        self.rows = []
+
+        layout = QVBoxLayout(self)
+        self.summary_lbl = QLabel()
+        layout.addWidget(self.summary_lbl)
+
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(
+            ["Ürün", "Barkod", "Konum", "Stok", "Kritik Seviye", "Eksik"]
+        )
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.itemSelectionChanged.connect(self.row_selected)
+        layout.addWidget(self.table)
+
+        # Seçili ürünün kritik seviyesini değiştir
+        level_layout = QHBoxLayout()
+        level_layout.addWidget(QLabel("Kritik Seviye:"))
+        self.level_spin = QSpinBox()
+        self.level_spin.setRange(0, 9999)
+        level_layout.addWidget(self.level_spin)
+        set_btn = QPushButton("Seçili Ürüne Uygula")
+        set_btn.clicked.connect(self.set_level)
+        level_layout.addWidget(set_btn)
+        level_layout.addStretch()
+        export_btn = QPushButton("Listeyi Dışa Aktar")
+        export_btn.clicked.connect(self.export_list)
+        level_layout.addWidget(export_btn)
+        layout.addLayout(level_layout)
+
+        # Satış hızına göre sipariş önerisi (istenince hesaplanır, tüm katalog)
+        forecast_box = QGroupBox("Satış Hızına Göre Sipariş Önerisi")
+        forecast_layout = QVBoxLayout(forecast_box)
+        params_layout = QHBoxLayout()
+        params_layout.addWidget(QLabel("Tedarik süresi (gün):"))
+        self.lead_spin = QSpinBox()
+        self.lead_spin.setRange(1, 120)
+        self.lead_spin.setValue(7)
+        params_layout.addWidget(self.lead_spin)
+        params_layout.addWidget(QLabel("Sipariş aralığı (gün):"))
+        self.review_spin = QSpinBox()
+        self.review_spin.setRange(1, 120)
+        self.review_spin.setValue(7)
+        params_layout.addWidget(self.review_spin)
+        forecast_btn = QPushButton("Öneri Hesapla")
+        forecast_btn.clicked.connect(self.show_suggestions)
+        params_layout.addWidget(forecast_btn)
+        params_layout.addStretch()
+        suggest_export_btn = QPushButton("Öneriyi Dışa Aktar")
+        suggest_export_btn.clicked.connect(self.export_suggestions)
+        params_layout.addWidget(suggest_export_btn)
+        forecast_layout.addLayout(params_layout)
+        self.suggest_table = QTableWidget(0, 7)
+        self.suggest_table.setHorizontalHeaderLabels(
+            ["Ürün", "Stok", "7 Gün Ort.", "Üstel Ort.", "Yeter (gün)",
+             "Sipariş Noktası", "Önerilen"])
+        self.suggest_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.suggest_table.horizontalHeader().setSectionResizeMode(
+            0, QHeaderView.ResizeMode.Stretch)
+        forecast_layout.addWidget(self.suggest_table)
+        layout.addWidget(forecast_box)
+
+        # Sekme açıkken liste canlı tutulur
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start(self.REFRESH_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        """Kritik ürün kümesini yeniden oku (yalnızca kısmi indeks okunur)"""
+        try:
+            self.rows = self.db.low_stock_products()
+        except OperationalError:
+            return  # Veritabanı meşgul: bir sonraki turda tekrar dene
+
+        self.table.setRowCount(len(self.rows))
+        for r, row in enumerate(self.rows):
+            values = [row["name"], row["barcode"], row["location"],
+                      row["qty"], row["reorder_point"], row["shortage"]]
+            for c, val in enumerate(values):
+                item = QTableWidgetItem("" if val is None else str(val))
+                if c == 3 and row["qty"] <= 0:
+                    item.setForeground(Qt.GlobalColor.red)
+                self.table.setItem(r, c, item)
+        self.summary_lbl.setText(f"Kritik seviyede {len(self.rows)} ürün var")
+
+    def row_selected(self):
+        r = self.table.currentRow()
+        if 0 <= r < len(self.rows):
+            self.level_spin.setValue(self.rows[r]["reorder_point"])
+
+    def set_level(self):
+        r = self.table.currentRow()
+        if not 0 <= r < len(self.rows):
+            QMessageBox.warning(self, "Hata", "Lütfen listeden bir ürün seçin")
+            return
+        self.db.set_reorder_point(self.rows[r]["id"], self.level_spin.value())
+        self.refresh()
+
+    def export_list(self):
+        from reports import export_low_stock
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Listeyi Kaydet", "", "Excel Dosyaları (*.xlsx);;CSV Dosyaları (*.csv)"
+        )
+        if not path:
+            return
+        if not path.endswith((".xlsx", ".csv")):
+            path += ".xlsx"
+        filename = export_low_stock(self.db, path)
+        if filename:
+            QMessageBox.information(self, "Başarılı", f"Liste kaydedildi:\n{filename}")
+        else:
+            QMessageBox.information(self, "Liste Boş", "Kritik seviyenin altında ürün yok.")
+
+    def forecast_params(self):
+        return {"lead_time": self.lead_spin.value(), "review_days": self.review_spin.value()}
+
+    def show_suggestions(self):
+        """Satış hızından sipariş önerisini hesapla (en kısa sürede tükenecek önce)"""
+        from forecasting import purchase_suggestions
+
+        rows = purchase_suggestions(self.db, **self.forecast_params())
+        self.suggest_table.setRowCount(len(rows))
+        for r, (_, name, _, stock, sma_7, _, ewma, cover, reorder_level, _,
+                suggested) in enumerate(rows):
+            values = [name, str(stock), f"{sma_7:.2f}", f"{ewma:.2f}",
+                      "-" if cover is None else f"{cover:.1f}",
+                      f"{reorder_level:.1f}", str(suggested)]
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if c == 4 and cover is not None and cover < self.lead_spin.value():
+                    item.setForeground(Qt.GlobalColor.red)  # teslimattan önce tükenir
+                self.suggest_table.setItem(r, c, item)
+
+    def export_suggestions(self):
+        from reports import export_purchase_suggestions
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Öneriyi Kaydet", "", "Excel Dosyaları (*.xlsx);;CSV Dosyaları (*.csv)"
+        )
+        if not path:
+            return
+        if not path.endswith((".xlsx", ".csv")):
+            path += ".xlsx"
+        filename = export_purchase_suggestions(self.db, path, **self.forecast_params())
+        if filename:
+            QMessageBox.information(self, "Başarılı", f"Öneri kaydedildi:\n{filename}")
+        else:
+            QMessageBox.information(self, "Liste Boş", "Sipariş önerilecek ürün yok.")
+
+
+# -------- Stok Sayımı sekmesi ---------------------------------------
+class StockTakeTab(QWidget):
+    """
+    Sayım modu: okutmalar bellekte ve sayım günlüğünde toplanır, farklar
+    onaylanınca tek bir işlemde ADJUST hareketi olarak yazılır.
+    """
+
+    def __init__(self, db: DatabaseManager, refresh_products, session=None):
+        super().__init__()
+        self.db = db
+        self.refresh_products = refresh_products
+        self.session = session if session is not None else StockTakeSession()
+        # Satır anahtarı okutulan barkoddur; tam sayımda okutulmamış ürünler
+        # (barkodsuz olanlar dahil) ürün id'siyle anahtarlanır
+        self.names = {}  # anahtar → ürün adı (kayıtsızsa None)
+        self.rows = {}   # anahtar → tablo satırı
+
+        v = QVBoxLayout(self)
+
+        h = QHBoxLayout()
+        h.addWidget(QLabel("Barkod okutun:"))
+        self.barcode_edit = QLineEdit()
+        self.barcode_handler = BarcodeHandler()
+        self.barcode_edit.installEventFilter(self.barcode_handler)
+        self.barcode_handler.barcode_detected.connect(self.handle_barcode)
+        h.addWidget(self.barcode_edit)
+        h.addWidget(QLabel("Adet:"))
+        self.qty_spin = QSpinBox()
+        self.qty_spin.setRange(-9999, 9999)
+        self.qty_spin.setValue(1)
+        h.addWidget(self.qty_spin)
+        add_btn = QPushButton("Say")
+        add_btn.clicked.connect(self.count_entered)
+        h.addWidget(add_btn)
+        v.addLayout(h)
+
+        self.status_lbl = QLabel()
+        v.addWidget(self.status_lbl)
+
+        # Sayılan ürünler; satırlar yalnızca değişen hücre güncellenerek yazılır
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Barkod", "Ürün", "Sayılan", "Mevcut", "Fark"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        v.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.full_check = QCheckBox("Tam sayım (okutulmayan ürünler 0 kabul edilir)")
+        buttons.addWidget(self.full_check)
+        buttons.addStretch()
+        preview_btn = QPushButton("Farkları Göster")
+        preview_btn.clicked.connect(self.preview)
+        buttons.addWidget(preview_btn)
+        apply_btn = QPushButton("Sayımı Onayla")
+        apply_btn.setStyleSheet("background-color: #4caf50; color: white;")
+        apply_btn.clicked.connect(self.apply_count)
+        buttons.addWidget(apply_btn)
+        discard_btn = QPushButton("Sayımı İptal Et")
+        discard_btn.clicked.connect(self.discard)
+        buttons.addWidget(discard_btn)
+        v.addLayout(buttons)
+
+        # Yarım kalmış oturum varsa günlükten yüklenmiştir
+        for barcode, qty in self.session.counts.items():
+            self.show_count(barcode, qty)
+        self.update_status()
+
+    def handle_barcode(self, barcode):
+        self.barcode_edit.clear()
+        self.count(barcode, self.qty_spin.value())
+        self.qty_spin.setValue(1)
+        self.barcode_edit.setFocus()
+
+    def count_entered(self):
+        code = self.barcode_edit.text().strip()
+        self.barcode_edit.clear()
+        if code:
+            self.count(code, self.qty_spin.value())
+            self.qty_spin.setValue(1)
+
+    def count(self, barcode, qty):
+        if not qty:
+            return
+        if barcode not in self.names:
+            product = self.db.catalog.by_barcode(barcode)
+            self.names[barcode] = product["name"] if product else None
+        total = self.session.record(barcode, qty)
+        self.show_count(barcode, total)
+        self.update_status()
+
+    def show_count(self, barcode, total, label=None):
+        """`barcode` satır anahtarıdır; `label` verilirse Barkod sütununa o yazılır"""
+        r = self.rows.get(barcode)
+        if r is None:
+            r = self.rows[barcode] = self.table.rowCount()
+            self.table.insertRow(r)
+            self.table.setItem(r, 0, QTableWidgetItem(barcode if label is None else label))
+            if barcode not in self.names:
+                product = self.db.catalog.by_barcode(barcode)
+                self.names[barcode] = product["name"] if product else None
+            name = self.names[barcode]
+            item = QTableWidgetItem(name if name is not None else "Kayıtsız barkod")
+            if name is None:
+                item.setForeground(Qt.GlobalColor.red)
+            self.table.setItem(r, 1, item)
+        self.table.setItem(r, 2, QTableWidgetItem(str(total)))
+        self.table.scrollToItem(self.table.item(r, 0))
+
+    def update_status(self):
+        if self.session.active:
+            self.status_lbl.setText(
+                f"Sayım {self.session.started_at}: {self.session.scans} okutma,"
+                f" {len(self.session.counts)} farklı barkod")
+        else:
+            self.status_lbl.setText("Sayım başlatmak için barkod okutun")
+
+    def preview(self):
+        """Sayımı mevcut stokla tek sorguda karşılaştır, farkları tabloya yaz"""
+        rows = self.db.preview_stock_count(self.session.counts, self.full_check.isChecked())
+        for barcode, r in self.rows.items():
+            self.table.setItem(r, 3, QTableWidgetItem(""))
+            self.table.setItem(r, 4, QTableWidgetItem("0"))
+        for row in rows:
+            key = row["barcode"] if row["barcode"] in self.session.counts else row["product_id"]
+            if key not in self.rows:
+                # Tam sayımda okutulmamış ürün
+                self.names[key] = row["name"]
+                self.show_count(key, 0, row["barcode"] or "")
+            r = self.rows[key]
+            if row["product_id"] is None:
+                continue
+            self.table.setItem(r, 3, QTableWidgetItem(str(row["on_hand"])))
+            diff_item = QTableWidgetItem(f"{row['diff']:+d}")
+            diff_item.setForeground(Qt.GlobalColor.red if row["diff"] < 0
+                                    else Qt.GlobalColor.darkGreen)
+            self.table.setItem(r, 4, diff_item)
+        return rows
+
+    def apply_count(self):
+        if not self.session.active:
+            QMessageBox.information(self, "Sayım Yok", "Henüz ürün okutulmadı.")
+            return
+        rows = self.preview()
+        unknown = sum(1 for row in rows if row["product_id"] is None)
+        diffs = len(rows) - unknown
+        message = f"{diffs} üründe fark var. Farklar stok düzeltmesi olarak yazılsın mı?"
+        if unknown:
+            message += f"\n({unknown} kayıtsız barkod atlanacak)"
+        answer = QMessageBox.question(
+            self, "Sayımı Onayla", message,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            written = self.db.apply_stock_count(
+                self.session.counts, self.session.session_id, self.full_check.isChecked())
+        except OperationalError as e:
+            QMessageBox.critical(self, "Hata", f"Sayım yazılamadı, tekrar deneyin: {e}")
+            return
+        self.reset()
+        self.refresh_products()
+        QMessageBox.information(self, "Sayım Tamamlandı", f"{written} düzeltme hareketi yazıldı.")
+
+    def discard(self):
+        if not self.session.active:
+            return
+        answer = QMessageBox.question(
+            self, "Sayımı İptal Et", "Okutulan tüm sayımlar silinecek. Emin misiniz?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if answer == QMessageBox.StandardButton.Yes:
+            self.reset()
+
+    def reset(self):
+        self.session.finish()
+        self.rows.clear()
+        self.table.setRowCount(0)
+        self.update_status()
+
+
+# -------- Konumlar sekmesi -----------------------------------------
+class LocationTab(QWidget):
+    """Konum (mağaza, depo, raf) bazında stok ve konumlar arası transfer"""
+
+    def __init__(self, db: DatabaseManager, refresh_products):
+        super().__init__()
+        self.db = db
+        self.refresh_products = refresh_products
+        self.current_product = None
+
+        v = QVBoxLayout(self)
+
+        h = QHBoxLayout()
+        h.addWidget(QLabel("Konum:"))
+        self.location_combo = QComboBox()
+        self.location_combo.currentIndexChanged.connect(self.show_location)
+        h.addWidget(self.location_combo, 1)
+        v.addLayout(h)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Ürün", "Barkod", "Adet"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        v.addWidget(self.table)
+
+        # Transfer formu
+        group = QGroupBox("Transfer")
+        form = QFormLayout(group)
+        self.barcode_edit = QLineEdit()
+        self.barcode_handler = BarcodeHandler()
+        self.barcode_edit.installEventFilter(self.barcode_handler)
+        self.barcode_handler.barcode_detected.connect(self.handle_barcode)
+        self.barcode_edit.editingFinished.connect(
+            lambda: self.handle_barcode(self.barcode_edit.text().strip()))
+        self.product_lbl = QLabel("Ürün bilgisi: ")
+        self.qty_spin = QSpinBox()
+        self.qty_spin.setRange(1, 999999)
+        self.from_combo = QComboBox()
+        self.from_combo.setEditable(True)
+        self.to_combo = QComboBox()
+        self.to_combo.setEditable(True)
+        transfer_btn = QPushButton("Transfer Et")
+        transfer_btn.clicked.connect(self.transfer)
+        form.addRow("Barkod", self.barcode_edit)
+        form.addRow(self.product_lbl)
+        form.addRow("Miktar", self.qty_spin)
+        form.addRow("Kaynak", self.from_combo)
+        form.addRow("Hedef", self.to_combo)
+        form.addRow(transfer_btn)
+        v.addWidget(group)
+
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        """Konum listesini ve seçili konumun stoğunu yenile"""
+        selected = self.location_combo.currentText()
+        locations = [row["location"] for row in self.db.list_locations()]
+        self.location_combo.blockSignals(True)
+        self.location_combo.clear()
+        self.location_combo.addItems(locations)
+        if selected in locations:
+            self.location_combo.setCurrentText(selected)
+        self.location_combo.blockSignals(False)
+        for combo in (self.from_combo, self.to_combo):
+            text = combo.currentText()
+            combo.clear()
+            combo.addItems(locations)
+            combo.setCurrentText(text)
+        self.show_location()
+
+    def show_location(self, *_):
+        location = self.location_combo.currentText()
+        rows = self.db.location_stock(location) if location else []
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, val in enumerate([row["name"], row["barcode"], row["qty"]]):
+                self.table.setItem(r, c, QTableWidgetItem("" if val is None else str(val)))
+
+    def handle_barcode(self, barcode):
+        if not barcode or (self.current_product and self.current_product["barcode"] == barcode):
+            return
+        self.barcode_edit.setText(barcode)
+        product = self.db.catalog.by_barcode(barcode)
+        self.current_product = product
+        if not product:
+            self.product_lbl.setText("Ürün bulunamadı!")
+            return
+        spread = ", ".join(f"{row['location']}: {row['qty']}"
+                           for row in self.db.product_locations(product["id"]))
+        self.product_lbl.setText(f"Ürün: {product['name']} ({spread or 'stok yok'})")
+        self.qty_spin.setFocus()
+        self.qty_spin.selectAll()
+
+    def transfer(self):
+        if not self.current_product:
+            QMessageBox.warning(self, "Hata", "Önce ürün barkodunu okutun")
+            return
+        qty = self.qty_spin.value()
+        source, target = self.from_combo.currentText(), self.to_combo.currentText()
+        try:
+            self.db.transfer_stock(self.current_product["id"], qty, source, target)
+        except ValueError as e:
+            QMessageBox.warning(self, "Transfer Yapılamadı", str(e))
+            return
+        except OperationalError as e:
+            QMessageBox.critical(self, "Hata", f"Veritabanı meşgul, tekrar deneyin: {e}")
+            return
+        QMessageBox.information(
+            self, "Tamam", f"{qty} adet {self.current_product['name']}: {source} → {target}")
+        self.current_product = None
+        self.barcode_edit.clear()
+        self.product_lbl.setText("Ürün bilgisi: ")
+        self.qty_spin.setValue(1)
+        self.refresh()
+        self.refresh_products()
+
 
 # -------- Ana Pencere ----------------------------------------
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, db=None, journal=None):
+        """
+        Args:
+            db: Veri katmanı. Verilmezse yerel `DatabaseManager` açılır; servis
+                modunda `inventory_client.RemoteDatabaseManager` verilir.
+            journal: Satış günlüğü. Verilmezse `data/sales_journal.db` kullanılır.
+        """
         super().__init__()
         self.setWindowTitle("Stok Yönetim Sistemi")
 
-        # Veri katmanı - tek bir bağlantı için
-        self.db = DatabaseManager()
+        # Veri katmanı - tek bir bağlantı için (gömülü veya servis istemcisi)
+        self.db = db if db is not None else DatabaseManager()
 
         # Merkez widget olarak tab widget oluştur
         self.tabs = QTabWidget()
@@ -906,8 +1840,12 @@ class MainWindow(QMainWindow):
         self.add_tab = AddProductTab(self.db, self.product_tab.refresh)
         self.tabs.addTab(self.add_tab, "Ürün Ekle")
 
+        # Satış günlüğü: satışlar önce yerel günlüğe yazılır, arka planda aktarılır
+        self.journal = journal if journal is not None else SalesJournal()
+        self.journal.start(self.db.clone)
+
         # Satış sekmesi
-        self.sales_tab = SalesTab(self.db)
+        self.sales_tab = SalesTab(self.db, self.journal)
         self.tabs.addTab(self.sales_tab, "Satış")
 
         # Stok Girişi sekmesi
@@ -922,22 +1860,50 @@ class MainWindow(QMainWindow):
         self.price_history_tab = PriceHistoryTab(self.db)
         self.tabs.addTab(self.price_history_tab, "Fiyat Takibi")
 
-        # Rapor sekmesi
-        self.report_tab = ReportTab(self.db)
+        # Rapor sekmesi: yerel veritabanında raporlar süreç havuzunda çalışır
+        self.report_jobs = None
+        self.maintenance = None
+        if isinstance(self.db, DatabaseManager):
+            self.report_jobs = ReportJobRunner(self.db.db_path)
+            # Yerel veritabanının bakımı; servis modunda bakımı servis yapar
+            db_path = self.db.db_path
+            self.maintenance = MaintenanceScheduler(
+                lambda: DatabaseManager(db_path, profile="reporting"))
+            self.maintenance.start()
+        self.report_tab = ReportTab(self.db, self.report_jobs)
         self.tabs.addTab(self.report_tab, "Raporlar")
 
+        # Konumlar sekmesi
+        self.location_tab = LocationTab(self.db, self.product_tab.refresh)
+        self.tabs.addTab(self.location_tab, "Konumlar")
+
+        # Stok Sayımı sekmesi
+        self.stock_take_tab = StockTakeTab(self.db, self.product_tab.refresh)
+        self.tabs.addTab(self.stock_take_tab, "Stok Sayımı")
+
+        # Kritik Stok sekmesi
+        self.low_stock_tab = LowStockTab(self.db)
+        self.tabs.addTab(self.low_stock_tab, "Kritik Stok")
+
         # Sekme değişikliklerini takip et
         self.tabs.currentChanged.connect(self.tab_changed)
 
     def tab_changed(self, index):
         """Sekme değiştiğinde gerekli yenilemeleri yap"""
-        if index == 0:  # Ürünler sekmesi
+        widget = self.tabs.widget(index)
+        if widget is self.product_tab:
             self.product_tab.refresh()
-        elif index == 7:  # Rapor sekmesi (index 7 oldu çünkü yeni sekme eklendi)
+        elif widget is self.report_tab:
             self.report_tab.refresh_report()
 
     def closeEvent(self, event):
-        """Pencere kapatıldığında veritabanı bağlantısını kapat"""
+        """Pencere kapatıldığında günlüğü ve veritabanı bağlantısını kapat"""
+        self.journal.close()
+        self.stock_take_tab.session.close()
+        if self.report_jobs is not None:
+            self.report_jobs.shutdown()
+        if self.maintenance is not None:
+            self.maintenance.stop()
         self.db.close()
         event.accept()
 
@@ -0,0 +1,55 @@
+"""
+downsample.py
+Zaman serilerini ekranda çizilebilecek nokta sayısına indirir (NumPy).
+
+`lttb`: Largest-Triangle-Three-Buckets (Steinarsson, 2013). İlk ve son nokta
+korunur; aradaki noktalar eşit kovalara bölünür ve her kovadan, önceki seçilen
+nokta ile sonraki kovanın ortalamasıyla en büyük üçgeni kuran nokta seçilir.
+Böylece tepe ve dipler, düz bir örneklemeden çok daha iyi korunur.
+
+Qt içe aktarmaz; `price_chart.PriceChart` çizmeden önce kullanır.
+"""
+
+import numpy as np
+
+
+def lttb(x, y, threshold: int):
+    """
+    (x, y) serisini en fazla `threshold` noktaya indirir.
+
+    Args:
+        x: Artan sırada x değerleri (ör. epoch saniyesi)
+        y: x ile aynı uzunlukta değerler
+        threshold: Hedef nokta sayısı (3'ten küçükse ve seri daha uzunsa
+            yalnızca ilk ve son nokta döner)
+
+    Returns:
+        (x, y) NumPy dizileri; seri zaten kısaysa kopyası
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or n <= 2:
+        return x.copy(), y.copy()
+    if threshold < 3:
+        return x[[0, -1]], y[[0, -1]]
+
+    # İlk ve son nokta dışındakiler threshold - 2 kovaya bölünür
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Sonraki kovanın ortalaması (son kovada son nokta)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        if next_end <= next_start:
+            next_end = next_start + 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Üçgen alanının iki katı; kovadaki tüm adaylar için tek vektör işlemi
+        area = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev])
+                      - (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        prev = start + int(area.argmax())
+        selected[i + 1] = prev
+    return x[selected], y[selected]
@@ -0,0 +1,284 @@
+"""
+forecasting.py
+Satış hızı ve sipariş önerisi: günlük satış özeti (`DailySales`) üzerinden
+hareketli ortalama, üstel düzeltme, stokta kalma süresi ve önerilen sipariş
+miktarı.
+
+Günlük özet stok hareketlerinden artımlı kurulur: `SalesRollup.sync()`
+yalnızca son işlenen hareketten (`SalesRollupState.last_movement_id`) sonraki
+hareketleri tek bir INSERT … SELECT ile (gün, ürün) başına toplayıp ekler.
+Satılan adet SALE hareketlerinden gelir; sepetten çıkarma (sayım dışı artı
+yönlü ADJUST) satışı geri alır. Ciro, hareket anındaki birim fiyattır
+(PriceChange günlüğü, `price_at`).
+
+Tahmin tüm katalog için tek geçişte hesaplanır: son `window` günün satışları
+ürün × gün matrisine yüklenir; ortalamalar, üstel ağırlıklı ortalama ve
+standart sapma matris işlemleridir. Sipariş kuralı (s, S):
+
+    güvenlik stoğu  = z · σ_gün · √tedarik_süresi
+    sipariş noktası = hız · tedarik_süresi + güvenlik stoğu
+    hedef stok      = hız · (tedarik_süresi + sipariş_aralığı) + güvenlik stoğu
+    öneri           = stok ≤ sipariş noktası ise ⌈hedef − stok⌉, değilse 0
+
+Elle girilen kritik seviye (reorder_point) sipariş noktasının ve hedefin alt
+sınırıdır. Qt içe aktarmaz; `db` yerel `DatabaseManager` veya servis istemcisi
+olabilir.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, List, Optional
+
+from valuation import COUNT_KEY_PREFIX, begin_write
+
+# NumPy / pandas yalnızca tahmin hesaplanırken yüklenir: models bu modülü
+# (günlük özet için) her açılışta içe aktarır, CLI'nin açılışı yavaşlamasın
+if TYPE_CHECKING:
+    import pandas as pd
+
+WINDOW = 28         # Hız hesabındaki gün sayısı
+SPAN = 14           # Üstel düzeltmenin yarı ömre yakın açıklığı (gün)
+LEAD_TIME = 7       # Siparişten teslime gün
+REVIEW_DAYS = 7     # İki sipariş arası gün
+SERVICE_Z = 1.65    # ~%95 hizmet düzeyi
+CHUNK = 50_000      # Tek işlemde özetlenen en fazla hareket (id aralığı)
+
+COLUMNS = ["product_id", "name", "barcode", "stock", "sma_7", "sma_window", "ewma",
+           "days_of_cover", "reorder_level", "order_up_to", "suggested_qty"]
+
+# Dışa aktarımdaki sütun başlıkları
+EXPORT_COLUMNS = {
+    "name": "Ürün",
+    "barcode": "Barkod",
+    "stock": "Stok",
+    "sma_7": "7 Gün Ort.",
+    "sma_window": "Dönem Ort.",
+    "ewma": "Üstel Ort.",
+    "days_of_cover": "Yeter (gün)",
+    "reorder_level": "Sipariş Noktası",
+    "order_up_to": "Hedef Stok",
+    "suggested_qty": "Önerilen Sipariş",
+}
+
+
+def ensure_schema(cur: sqlite3.Cursor) -> None:
+    """Günlük satış özeti tablolarını oluşturur (`DatabaseManager._ensure_schema` çağırır)"""
+    cur.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS DailySales (
+            day        TEXT    NOT NULL,
+            product_id INTEGER NOT NULL,
+            qty        INTEGER NOT NULL DEFAULT 0,
+            revenue    REAL    NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, product_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_dailysales_product ON DailySales(product_id, day);
+
+        CREATE TABLE IF NOT EXISTS SalesRollupState (
+            id               INTEGER PRIMARY KEY CHECK (id = 1),
+            last_movement_id INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO SalesRollupState(id, last_movement_id) VALUES (1, 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_product_delete_dailysales
+        AFTER DELETE ON Product BEGIN
+            DELETE FROM DailySales WHERE product_id = OLD.id;
+        END;
+        """
+    )
+
+
+class SalesRollup:
+    """Stok hareketlerini artımlı olarak `DailySales` özetine işler."""
+
+    def __init__(self, db, chunk_size: int = CHUNK):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.db.conn
+
+    def watermark(self) -> int:
+        row = self.conn.execute(
+            "SELECT last_movement_id FROM SalesRollupState WHERE id = 1"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def set_watermark(self, movement_id: int) -> None:
+        """Son işlenen hareketi ayarlar (işlem kapatılmaz, çağıran commit eder)"""
+        self.conn.execute(
+            "UPDATE SalesRollupState SET last_movement_id = ? WHERE id = 1",
+            (movement_id,),
+        )
+
+    def sync(self, upto: Optional[int] = None, commit: bool = True) -> int:
+        """
+        Son işlenen hareketten sonraki satışları günlük özete ekler.
+
+        Args:
+            upto: En fazla bu hareket numarasına kadar işle
+            commit: False ise işlem açık bırakılır (çağıranın işleminin parçası)
+
+        Returns:
+            int: Eklenen veya güncellenen (gün, ürün) satırı sayısı
+        """
+        if upto is None:
+            upto = self.conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM StockMovement").fetchone()[0]
+        price = self.db._PRICE_AT_SQL.format(pid="sm.product_id", ts="sm.ts")
+        processed = 0
+        try:
+            while True:
+                # Filigran yazma kilidi altında okunur (bkz. valuation.begin_write)
+                begin_write(self.conn)
+                last_id = self.watermark()
+                if last_id >= upto:
+                    if commit:
+                        self.conn.commit()
+                    break
+                chunk_end = min(last_id + self.chunk_size, upto)
+                # WHERE true: INSERT … SELECT … ON CONFLICT ayrıştırma belirsizliği için
+                cur = self.conn.execute(
+                    f"""
+                    INSERT INTO DailySales(day, product_id, qty, revenue)
+                    SELECT day, product_id, SUM(qty), SUM(qty * COALESCE(price, 0))
+                    FROM (
+                        SELECT DATE(sm.ts, 'unixepoch', 'localtime') AS day,
+                               sm.product_id, -sm.change AS qty, {price} AS price
+                        FROM StockMovement sm
+                        WHERE sm.id > ? AND sm.id <= ?
+                          AND (sm.reason = 'SALE'
+                               OR (sm.reason = 'ADJUST' AND sm.change > 0
+                                   AND COALESCE(sm.op_key, '') NOT LIKE ?))
+                    ) WHERE true
+                    GROUP BY day, product_id
+                    ON CONFLICT(day, product_id) DO UPDATE SET
+                        qty     = qty     + excluded.qty,
+                        revenue = revenue + excluded.revenue
+                    """,
+                    (last_id, chunk_end, COUNT_KEY_PREFIX + "%"),
+                )
+                processed += max(cur.rowcount, 0)
+                self.set_watermark(chunk_end)
+                if commit:
+                    self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return processed
+
+    def rebuild(self) -> int:
+        """Özeti boşaltıp tüm hareketlerden yeniden kurar (arşivlenmiş satışlar kaybolur)"""
+        try:
+            self.conn.execute("DELETE FROM DailySales")
+            self.set_watermark(0)
+            return self.sync(commit=True)
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    def since(self, day: str) -> List[sqlite3.Row]:
+        """`day` ve sonrasındaki (gün, ürün) satırları: product_id, day, qty, revenue"""
+        return self.conn.execute(
+            "SELECT product_id, day, qty, revenue FROM DailySales WHERE day >= ?",
+            (day,),
+        ).fetchall()
+
+
+# ---------- Tahmin ------------------------------------------------------
+def sales_matrix(db, window: int = WINDOW, as_of: Optional[date] = None):
+    """
+    Son `window` tam günün satış adetleri: (ürün id dizisi, ürün × gün matrisi,
+    ürün satırları). Son sütun `as_of`'tan (varsayılan bugün) önceki gündür;
+    yarım kalan gün hızı düşük göstermesin diye dahil edilmez.
+    """
+    import numpy as np
+
+    as_of = as_of or date.today()
+    first = as_of - timedelta(days=window)
+    products = db.list_products()
+    ids = np.array(sorted(row["id"] for row in products), dtype=np.int64)
+    matrix = np.zeros((len(ids), window))
+
+    rows = [tuple(r)[:3] for r in db.daily_sales_since(first.isoformat())]
+    if rows and len(ids):
+        pid, day, qty = zip(*rows)
+        pid = np.array(pid, dtype=np.int64)
+        offset = (np.array(day, dtype="datetime64[D]")
+                  - np.datetime64(first.isoformat(), "D")).astype(np.int64)
+        pos = np.searchsorted(ids, pid)
+        keep = (offset < window) & (pos < len(ids))
+        keep[keep] &= ids[pos[keep]] == pid[keep]
+        np.add.at(matrix, (pos[keep], offset[keep]), np.array(qty, dtype=float)[keep])
+    return ids, matrix, products
+
+
+def forecast(db, window: int = WINDOW, span: int = SPAN, lead_time: int = LEAD_TIME,
+             review_days: int = REVIEW_DAYS, service_z: float = SERVICE_Z,
+             as_of: Optional[date] = None) -> "pd.DataFrame":
+    """
+    Tüm katalog için satış hızı, stokta kalma süresi ve sipariş önerisi
+    (sütunlar `COLUMNS`; hiç satmayan ürünün kalma süresi NaN).
+    """
+    import numpy as np
+    import pandas as pd
+
+    ids, matrix, products = sales_matrix(db, window, as_of)
+    if not len(ids):
+        return pd.DataFrame(columns=COLUMNS)
+
+    # Günlük hız: basit ortalamalar ve yeni günlere ağırlık veren üstel ortalama
+    alpha = 2 / (span + 1)
+    weights = alpha * (1 - alpha) ** np.arange(window - 1, -1, -1)
+    weights /= weights.sum()
+    sma_7 = matrix[:, -min(7, window):].mean(axis=1)
+    sma_window = matrix.mean(axis=1)
+    ewma = matrix @ weights
+    sigma = matrix.std(axis=1)
+
+    levels = db.stock_levels()
+    stock = np.array([levels.get(int(pid), 0) for pid in ids], dtype=float)
+    info = {row["id"]: row for row in products}
+    manual = np.array([info[int(pid)]["reorder_point"] or 0 for pid in ids], dtype=float)
+
+    safety = service_z * sigma * np.sqrt(lead_time)
+    reorder_level = np.maximum(ewma * lead_time + safety, manual)
+    order_up_to = np.maximum(ewma * (lead_time + review_days) + safety, manual)
+    needed = (stock <= reorder_level) & (order_up_to > stock)
+    suggested = np.where(needed, np.ceil(order_up_to - stock), 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(ewma > 0, np.maximum(stock, 0) / ewma, np.nan)
+
+    return pd.DataFrame({
+        "product_id": ids,
+        "name": [info[int(pid)]["name"] for pid in ids],
+        "barcode": [info[int(pid)]["barcode"] for pid in ids],
+        "stock": stock.astype(np.int64),
+        "sma_7": sma_7,
+        "sma_window": sma_window,
+        "ewma": ewma,
+        "days_of_cover": cover,
+        "reorder_level": reorder_level,
+        "order_up_to": order_up_to,
+        "suggested_qty": suggested.astype(np.int64),
+    })[COLUMNS]
+
+
+def suggestions(result: "pd.DataFrame") -> "pd.DataFrame":
+    """Sipariş önerilen ürünler, en kısa sürede tükenecek olan önce"""
+    wanted = result[result["suggested_qty"] > 0]
+    return wanted.sort_values(["days_of_cover", "suggested_qty"], ascending=[True, False],
+                              na_position="last", kind="stable")
+
+
+def purchase_suggestions(db, all_products: bool = False, **params) -> list:
+    """
+    Tablo ve CLI için düz satırlar (`COLUMNS` sırasıyla, NaN → None).
+    `all_products` False ise yalnızca sipariş önerilen ürünler.
+    """
+    result = forecast(db, **params)
+    if not all_products:
+        result = suggestions(result)
+    result = result.astype(object)
+    return [tuple(row) for row in result.where(result.notna(), None).to_numpy().tolist()]
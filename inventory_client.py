@@ -0,0 +1,337 @@
+"""
+inventory_client.py
+`inventory_service` için istemci tarafı adaptör.
+
+`RemoteDatabaseManager`, `DatabaseManager` ile aynı arayüzü sunar; böylece
+`MainWindow` gömülü veritabanı yerine servise karşı da çalışabilir.
+"""
+
+import http.client
+import json
+import os
+import sqlite3
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from catalog import ProductCatalog
+from replication import BATCH_SIZE
+
+
+class ServiceError(Exception):
+    """Servisin sqlite dışı bir hata döndürdüğü durumlar"""
+
+
+class RemoteRow(tuple):
+    """
+    sqlite3.Row benzeri salt okunur satır: hem indeks hem sütun adıyla
+    erişilebilir, üzerinde dolaşıldığında değerleri verir.
+    """
+
+    def __new__(cls, mapping: dict):
+        row = super().__new__(cls, mapping.values())
+        row._keys = tuple(mapping.keys())
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return tuple.__getitem__(self, self._keys.index(key))
+            except ValueError:
+                raise IndexError(f"Sütun yok: {key}") from None
+        return tuple.__getitem__(self, key)
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+
+def _from_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return RemoteRow(value)
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    return value
+
+
+class RemoteDatabaseManager:
+    """HTTP/JSON servisi üzerinden çalışan DAO (DatabaseManager ile aynı arayüz)."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0, token: Optional[str] = None):
+        """
+        Args:
+            token: Servis anahtarı; verilmezse `STOCK_SERVICE_TOKEN` ortam değişkeni
+        """
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.token = token or os.environ.get("STOCK_SERVICE_TOKEN")
+        self._http: Optional[http.client.HTTPConnection] = None
+        # Bu istemcinin ürün yazmalarıyla ve ürün sayacıyla güncel tutulur
+        # (diğer kasaların değişiklikleri en geç bir saniye içinde görünür)
+        self.catalog = ProductCatalog(self)
+
+    # ---------- Taşıma -------------------------------------------------
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._http is None:
+            self._http = http.client.HTTPConnection(self.host, self.port,
+                                                    timeout=self.timeout)
+        return self._http
+
+    def _send(self, verb: str, path: str, body: Optional[bytes]) -> Tuple[int, dict]:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        conn = self._connection()
+        try:
+            conn.request(verb, path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response.status, json.loads(response.read() or b"{}")
+        except (ConnectionError, http.client.HTTPException, OSError):
+            conn.close()
+            self._http = None
+            raise
+
+    def _request(self, verb: str, path: str, body: Optional[bytes] = None) -> Tuple[int, dict]:
+        try:
+            return self._send(verb, path, body)
+        except (ConnectionError, http.client.HTTPException):
+            # Kalıcı bağlantı sunucu tarafından kapatılmış olabilir: bir kez yeniden dene
+            return self._send(verb, path, body)
+
+    def _call(self, method: str, *args, **kwargs) -> Any:
+        return _from_json(self._call_raw(method, *args, **kwargs))
+
+    def _call_raw(self, method: str, *args, **kwargs) -> Any:
+        """Sonucu satır nesnelerine çevirmeden (düz JSON olarak) döndürür"""
+        payload = json.dumps({"args": args, "kwargs": kwargs}).encode("utf-8")
+        status, data = self._request("POST", f"/api/{method}", payload)
+        if status == 200:
+            return data.get("result")
+        error, message = data.get("error"), data.get("message", "")
+        # Denetleyiciler sqlite hatalarını yakaladığı için aynı türleri yeniden üret
+        if error == "IntegrityError":
+            raise sqlite3.IntegrityError(message)
+        if error == "OperationalError":
+            raise sqlite3.OperationalError(message)
+        if error == "ValueError":
+            raise ValueError(message)
+        raise ServiceError(f"{error}: {message}")
+
+    def ping(self) -> bool:
+        """Servis ayakta mı?"""
+        status, data = self._request("GET", "/health")
+        return status == 200 and data.get("status") == "ok"
+
+    # ---------- Veritabanı Yönetimi -----------------------------------
+    def refresh_connection(self):
+        """HTTP bağlantısını yeniler (gömülü sürümle uyum için)"""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        return True
+
+    def clone(self) -> "RemoteDatabaseManager":
+        """Aynı servise ayrı HTTP bağlantısıyla yeni bir istemci döndürür"""
+        return RemoteDatabaseManager(self.base_url, self.timeout, self.token)
+
+    # ---------- CRUD: Product ----------------------------------------
+    def add_product(self, name: str, barcode: str,
+                    location: str, unit_price: float,
+                    reorder_point: int = 0) -> int:
+        product_id = self._call("add_product", name, barcode, location, unit_price,
+                                reorder_point)
+        self.catalog.product_changed(product_id)
+        return product_id
+
+    def list_products(self) -> List[RemoteRow]:
+        return self._call("list_products")
+
+    def get_product_by_id(self, product_id: int) -> Optional[RemoteRow]:
+        return self._call("get_product_by_id", product_id)
+
+    def find_product_by_barcode(self, code: str) -> Optional[RemoteRow]:
+        return self._call("find_product_by_barcode", code)
+
+    def search_products(self, query: str,
+                        limit: Optional[int] = None) -> List[RemoteRow]:
+        return self._call("search_products", query, limit)
+
+    def delete_product(self, product_id: int) -> bool:
+        deleted = self._call("delete_product", product_id)
+        self.catalog.product_changed(product_id)
+        return deleted
+
+    # ---------- Stok işlemleri ---------------------------------------
+    def change_stock(self, product_id: int, qty: int,
+                     reason: str = "SALE", purchase_price: float = None,
+                     location: Optional[str] = None) -> None:
+        return self._call("change_stock", product_id, qty, reason, purchase_price, location)
+
+    def apply_movements(self, movements: List[dict]) -> int:
+        return self._call("apply_movements", movements)
+
+    def update_unit_price(self, product_id: int, new_price: float) -> bool:
+        updated = self._call("update_unit_price", product_id, new_price)
+        self.catalog.product_changed(product_id)
+        return updated
+
+    def get_stock_level(self, product_id: int) -> int:
+        return self._call("get_stock_level", product_id)
+
+    def stock_levels(self) -> dict:
+        # JSON nesne anahtarları metindir
+        row = self._call("stock_levels")
+        return {int(k): row[k] for k in row.keys()}
+
+    def data_version(self) -> Tuple[int, ...]:
+        return tuple(self._call("data_version"))
+
+    def product_version(self) -> int:
+        return self._call("product_version")
+
+    # ---------- Konum bazında stok -------------------------------------
+    def transfer_stock(self, product_id: int, qty: int,
+                       from_location: str, to_location: str) -> str:
+        return self._call("transfer_stock", product_id, qty, from_location, to_location)
+
+    def location_qty(self, product_id: int, location: str) -> int:
+        return self._call("location_qty", product_id, location)
+
+    def list_locations(self) -> List[RemoteRow]:
+        return self._call("list_locations")
+
+    def location_stock(self, location: str) -> List[RemoteRow]:
+        return self._call("location_stock", location)
+
+    def product_locations(self, product_id: int) -> List[RemoteRow]:
+        return self._call("product_locations", product_id)
+
+    # ---------- Stok sayımı -------------------------------------------
+    def preview_stock_count(self, counts: dict, full: bool = False) -> List[RemoteRow]:
+        return self._call("preview_stock_count", counts, full)
+
+    def apply_stock_count(self, counts: dict, session_id: str, full: bool = False) -> int:
+        return self._call("apply_stock_count", counts, session_id, full)
+
+    # ---------- Kritik stok --------------------------------------------
+    def set_reorder_point(self, product_id: int, level: int) -> bool:
+        updated = self._call("set_reorder_point", product_id, level)
+        self.catalog.product_changed(product_id)
+        return updated
+
+    def low_stock_products(self) -> List[RemoteRow]:
+        return self._call("low_stock_products")
+
+    # ---------- Stok değerleme ----------------------------------------
+    def stock_value(self) -> dict:
+        return self._call("stock_value")
+
+    def stock_valuation(self) -> List[RemoteRow]:
+        return self._call("stock_valuation")
+
+    def cogs_report(self, start: str, end: str) -> List[RemoteRow]:
+        return self._call("cogs_report", start, end)
+
+    # ---------- Satış fişleri -----------------------------------------
+    def record_sale(self, lines: List[dict], op_key: Optional[str] = None,
+                    created_at: Optional[str] = None, day: Optional[str] = None) -> int:
+        return self._call("record_sale", lines, op_key, created_at, day)
+
+    def get_sale(self, sale_id: int) -> Optional[RemoteRow]:
+        return self._call("get_sale", sale_id)
+
+    def get_sale_lines(self, sale_id: int) -> List[RemoteRow]:
+        return self._call("get_sale_lines", sale_id)
+
+    def recent_sales(self, limit: int = 50) -> List[RemoteRow]:
+        return self._call("recent_sales", limit)
+
+    def revenue_by_period(self, start: str, end: str, period: str = "day") -> List[RemoteRow]:
+        return self._call("revenue_by_period", start, end, period)
+
+    def basket_pairs(self, start: str, end: str, limit: int = 20) -> List[RemoteRow]:
+        return self._call("basket_pairs", start, end, limit)
+
+    # ---------- Raporlar ve fiyat takibi ------------------------------
+    def daily_sales_report(self) -> List[RemoteRow]:
+        return self._call("daily_sales_report")
+
+    def sales_report(self, start: str, end: str) -> List[RemoteRow]:
+        return self._call("sales_report", start, end)
+
+    def get_product_price_history(self, product_id: int, limit: Optional[int] = None,
+                                  offset: int = 0) -> List[RemoteRow]:
+        return self._call("get_product_price_history", product_id, limit, offset)
+
+    def price_history_points(self, product_id: int, buckets: int = 400) -> List[RemoteRow]:
+        return self._call("price_history_points", product_id, buckets)
+
+    def purchase_price_series(self, since: int, until: int) -> List[tuple]:
+        # Satırlar çok sayıda ve sabit sütunlu: anahtarlı satıra çevrilmez
+        return [tuple(row.values()) for row in
+                self._call_raw("purchase_price_series", since, until)]
+
+    def search_products_for_price_history(self, query: str) -> List[RemoteRow]:
+        return self._call("search_products_for_price_history", query)
+
+    def price_at(self, product_id: int, ts: int) -> Optional[float]:
+        return self._call("price_at", product_id, ts)
+
+    def prices_at(self, lookups) -> List[Optional[float]]:
+        return self._call("prices_at", [list(pair) for pair in lookups])
+
+    def get_price_changes(self, product_id: int) -> List[RemoteRow]:
+        return self._call("get_price_changes", product_id)
+
+    def stock_as_of(self, ts: int) -> List[RemoteRow]:
+        return self._call("stock_as_of", ts)
+
+    def product_stock_as_of(self, product_id: int, ts: int) -> int:
+        return self._call("product_stock_as_of", product_id, ts)
+
+    def daily_sales_since(self, day: str) -> List[tuple]:
+        # Satırlar çok sayıda ve sabit sütunlu: anahtarlı satıra çevrilmez
+        return [tuple(row.values()) for row in self._call_raw("daily_sales_since", day)]
+
+    def refresh_sales_ranking(self) -> int:
+        return self._call("refresh_sales_ranking")
+
+    def top_sellers(self, days: int = 30, by: str = "revenue",
+                    limit: int = 20) -> List[RemoteRow]:
+        return self._call("top_sellers", days, by, limit)
+
+    def abc_summary(self, days: int = 30) -> List[RemoteRow]:
+        return self._call("abc_summary", days)
+
+    # ---------- Mağazalar arası eşitleme --------------------------------
+    def store_id(self) -> str:
+        return self._call("store_id")
+
+    def sync_cursor(self, peer_id: str) -> int:
+        return self._call("sync_cursor", peer_id)
+
+    def sync_peers(self) -> List[RemoteRow]:
+        return self._call("sync_peers")
+
+    def export_changes(self, since: int, exclude_origin: Optional[str] = None,
+                       limit: int = BATCH_SIZE) -> dict:
+        # Parti iç içe sözlükler içerir: satır nesnesine çevrilmez
+        return self._call_raw("export_changes", since, exclude_origin, limit)
+
+    def apply_changes(self, batch: dict) -> dict:
+        result = self._call_raw("apply_changes", batch)
+        if result["applied"]:
+            self.catalog.invalidate()
+        return result
+
+    def mark_sent(self, peer_id: str, seq: int) -> None:
+        self._call("mark_sent", peer_id, seq)
+
+    # ---------- Bakım --------------------------------------------------
+    def maintenance_log(self, limit: int = 50) -> List[RemoteRow]:
+        return self._call("maintenance_log", limit)
+
+    # ---------- Kapat -------------------------------------------------
+    def close(self):
+        self.refresh_connection()
@@ -0,0 +1,370 @@
+"""
+inventory_service.py
+Birden çok kasanın tek bir yazıcı üzerinden `inventory.db` paylaşmasını
+sağlayan yerel HTTP/JSON servisi (asyncio, yalnızca standart kütüphane).
+
+– Okuma işlemleri küçük bir okuyucu iş parçacığı havuzunda,
+– yazma işlemleri TEK bir yazıcı iş parçacığında sırayla çalışır,
+– tüm iş parçacıkları aynı `DatabaseManager`'ı paylaşır; her biri onun
+  içinde kendi bağlantısını kullanır,
+– bakım zamanlayıcısı (maintenance.py) kendi bağlantısıyla, servis boştayken
+  veya mesai dışında çalışır.
+
+Uç noktalar:
+    GET  /health                → {"status": "ok"}
+    POST /api/<metot>           gövde: {"args": [...], "kwargs": {...}}
+                                 yanıt: {"result": ...} veya {"error": ..., "message": ...}
+
+Servis ürün silme ve eşitleme gibi yazma işlemlerini açtığından yalnızca
+yerel adreste (loopback) anahtarsız dinler. Başka bir adreste dinlemek için
+`--token` (veya `STOCK_SERVICE_TOKEN`) verilmelidir; istemciler anahtarı
+`Authorization: Bearer <anahtar>` başlığıyla gönderir.
+
+Çalıştırma:
+    python inventory_service.py --host 127.0.0.1 --port 8765
+    STOCK_SERVICE_TOKEN=... python inventory_service.py --host 0.0.0.0
+"""
+
+import argparse
+import asyncio
+import hmac
+import inspect
+import ipaddress
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from maintenance import MaintenanceScheduler
+from models import DB_PATH, DatabaseManager
+
+# Servis üzerinden açılan DatabaseManager metotları
+READ_METHODS = {
+    "list_products",
+    "get_product_by_id",
+    "find_product_by_barcode",
+    "search_products",
+    "get_stock_level",
+    "low_stock_products",
+    "location_qty",
+    "list_locations",
+    "location_stock",
+    "product_locations",
+    "preview_stock_count",
+    "daily_sales_report",
+    "sales_report",
+    "get_sale",
+    "get_sale_lines",
+    "recent_sales",
+    "revenue_by_period",
+    "basket_pairs",
+    "stock_levels",
+    "data_version",
+    "product_version",
+    "get_product_price_history",
+    "price_history_points",
+    "purchase_price_series",
+    "search_products_for_price_history",
+    "price_at",
+    "prices_at",
+    "get_price_changes",
+    "store_id",
+    "sync_cursor",
+    "sync_peers",
+    "export_changes",
+    "maintenance_log",
+}
+WRITE_METHODS = {
+    "add_product",
+    "delete_product",
+    "change_stock",
+    "apply_movements",
+    "transfer_stock",
+    "record_sale",
+    "update_unit_price",
+    "set_reorder_point",
+    "apply_stock_count",
+    # Değerleme sorguları önce yeni hareketleri işler (yazma)
+    "stock_value",
+    "stock_valuation",
+    "cogs_report",
+    # Geçmiş tarihli stok önce eksik kontrol noktalarını yazar
+    "stock_as_of",
+    "product_stock_as_of",
+    # Günlük satış özeti önce yeni hareketleri işler
+    "daily_sales_since",
+    # En çok satanlar önce sıralamayı bugüne getirir
+    "refresh_sales_ranking",
+    "top_sellers",
+    "abc_summary",
+    # Mağazalar arası eşitleme
+    "apply_changes",
+    "mark_sent",
+}
+
+# İstek gövdesi üst sınırı (en büyük eşitleme partisinin rahatça sığacağı kadar)
+MAX_BODY = 8 * 1024 * 1024
+
+# Hata türü → HTTP durum kodu
+ERROR_STATUS = {
+    "IntegrityError": 409,
+    "OperationalError": 503,
+    "BadRequest": 400,
+    "NotFound": 404,
+}
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class BadRequest(Exception):
+    """İstemcinin gönderdiği argümanlar metoda uymuyor"""
+
+
+def is_loopback(host: str) -> bool:
+    """Adres yalnızca bu makineden erişilebilir mi?"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def to_json(value: Any) -> Any:
+    """sqlite3.Row (ve keys() sunan diğer satırları) ve satır listelerini JSON'a uygun hale getirir."""
+    if isinstance(value, sqlite3.Row) or (hasattr(value, "keys") and not isinstance(value, dict)):
+        return {k: value[k] for k in value.keys()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    return value
+
+
+class InventoryService:
+    """DatabaseManager işlemlerini HTTP/JSON üzerinden sunan servis."""
+
+    def __init__(self, db_path: Path = DB_PATH, host: str = "127.0.0.1",
+                 port: int = 8765, readers: int = 2, token: Optional[str] = None):
+        """
+        Args:
+            token: İstemcilerin göndermesi gereken anahtar; loopback dışı bir
+                `host` için zorunludur
+
+        Raises:
+            ValueError: Anahtarsız olarak loopback dışı bir adreste dinlenmek istendi
+        """
+        if not token and not is_loopback(host):
+            raise ValueError(
+                f"{host} adresinde anahtarsız dinlenemez: --token veya "
+                "STOCK_SERVICE_TOKEN verin ya da 127.0.0.1 kullanın")
+        self.db_path = Path(db_path)
+        self.host = host
+        self.port = port
+        self.token = token
+        self.db = DatabaseManager(self.db_path)
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="inv-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="inv-write")  # tek yazıcı
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Bakım ayrı bir DatabaseManager kullanır: yazıcı kilidini tutmaz,
+        # kısa işlemleri SQLite düzeyinde kasa yazmalarıyla sıraya girer
+        self.maintenance = MaintenanceScheduler(
+            lambda: DatabaseManager(self.db_path, profile="reporting"))
+
+    # ---------- Veritabanı çağrıları ----------------------------------
+    def _invoke(self, method: str, args: list, kwargs: dict) -> Any:
+        return to_json(getattr(self.db, method)(*args, **kwargs))
+
+    async def call(self, method: str, args: list, kwargs: dict) -> Any:
+        if method in WRITE_METHODS:
+            executor = self._writer
+        elif method in READ_METHODS:
+            executor = self._readers
+        else:
+            raise LookupError(method)
+        # Yalnızca argüman uyuşmazlığı istemci hatasıdır; metodun içindeki
+        # TypeError bir sunucu hatasıdır
+        try:
+            inspect.signature(getattr(self.db, method)).bind(*args, **kwargs)
+        except TypeError as e:
+            raise BadRequest(str(e)) from None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._invoke, method, args, kwargs)
+
+    # ---------- HTTP --------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    verb, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "BadRequest",
+                                                      "message": "Geçersiz istek satırı"})
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = b""
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY:
+                    # Gövde okunmadığı için bağlantı kapatılır
+                    status = 413 if length > MAX_BODY else 400
+                    await self._respond(writer, status, {
+                        "error": "BadRequest",
+                        "message": f"Geçersiz gövde uzunluğu (en çok {MAX_BODY} bayt)"})
+                    break
+                if length:
+                    body = await reader.readexactly(length)
+
+                if not self._authorized(target, headers):
+                    status, payload = 401, {"error": "Unauthorized",
+                                            "message": "Geçersiz veya eksik anahtar"}
+                else:
+                    status, payload = await self._dispatch(verb, target, body)
+                await self._respond(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # İstemci ayrıldı veya servis kapanıyor
+        finally:
+            writer.close()
+
+    def _authorized(self, target: str, headers: dict) -> bool:
+        """Anahtar tanımlıysa /health dışındaki istekler onu taşımalı"""
+        if not self.token or target == "/health":
+            return True
+        scheme, _, given = headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(
+            given.strip().encode(), self.token.encode())
+
+    async def _dispatch(self, verb: str, target: str, body: bytes):
+        if verb == "GET" and target == "/health":
+            return 200, {"status": "ok"}
+        if verb != "POST" or not target.startswith("/api/"):
+            return 404, {"error": "NotFound", "message": target}
+
+        method = target[len("/api/"):]
+        try:
+            request = json.loads(body or b"{}")
+            args = list(request.get("args", []))
+            kwargs = dict(request.get("kwargs", {}))
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {"error": "BadRequest", "message": str(e)}
+
+        try:
+            return 200, {"result": await self.call(method, args, kwargs)}
+        except LookupError:
+            return 404, {"error": "NotFound", "message": f"Bilinmeyen işlem: {method}"}
+        except BadRequest as e:
+            return 400, {"error": "BadRequest", "message": str(e)}
+        except ValueError as e:
+            return 400, {"error": "ValueError", "message": str(e)}
+        except sqlite3.Error as e:
+            name = type(e).__name__
+            return ERROR_STATUS.get(name, 500), {"error": name, "message": str(e)}
+        except Exception as e:  # Sunucu hatası: bağlantıyı düşürmeden bildir
+            return 500, {"error": type(e).__name__, "message": str(e)}
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        writer.write(head + data)
+        await writer.drain()
+
+    # ---------- Yaşam döngüsü -----------------------------------------
+    async def start(self) -> int:
+        """Dinlemeye başlar ve bağlanılan portu döndürür (port=0 ise rastgele)."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.maintenance.start()
+        return self.port
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self) -> int:
+        """Servisi arka plan iş parçacığında başlatır (testler ve gömülü kullanım)."""
+        ready = threading.Event()
+
+        def runner():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=runner, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.port
+
+    async def _shutdown(self) -> None:
+        """Dinlemeyi bırakır ve açık bağlantı görevlerini iptal eder."""
+        self._server.close()
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        self.maintenance.stop()
+        if self._loop and self._server:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread:
+                self._thread.join(timeout=5)
+            self._loop.close()
+        self._readers.shutdown(wait=False)
+        self._writer.shutdown(wait=False)
+        self.db.close()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Envanter HTTP/JSON servisi")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=str(DB_PATH), help="Veritabanı dosyası")
+    parser.add_argument("--token", default=os.environ.get("STOCK_SERVICE_TOKEN"),
+                        help="İstemci anahtarı (127.0.0.1 dışında dinlemek için zorunlu)")
+    args = parser.parse_args(argv)
+
+    try:
+        service = InventoryService(Path(args.db), args.host, args.port, token=args.token)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Envanter servisi {args.host}:{args.port} adresinde dinliyor ({args.db})")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+maintenance.py
+Veritabanı bakımı ve boşta/mesai dışı çalışan bakım zamanlayıcısı.
+
+Görevler (her biri `MaintenanceLog` tablosuna süresi, dosya boyutu öncesi /
+sonrası ve sonucuyla yazılır):
+    optimize  : PRAGMA optimize (yalnızca gereken tabloları analiz eder)
+    analyze   : sınırlı örneklemle ANALYZE (planlayıcı istatistikleri)
+    stock     : eksik aylık stok kontrol noktaları, stok değerlemesi ve
+                günlük satış özeti
+    vacuum    : boş sayfaları küçük parçalar hâlinde dosyadan geri verir
+    wal       : WAL dosyasını ana dosyaya aktarır (PASSIVE, kimseyi beklemez)
+    integrity : PRAGMA quick_check (tam kontrolde `integrity_report`)
+
+Kasayı bekletmemek için zamanlayıcı kendi bağlantısıyla ayrı bir iş
+parçacığında çalışır; yalnızca veri sürümü bir süredir değişmiyorsa (boşta)
+veya mesai dışı saatlerde başlar. Yazan adımlar kısa işlemlerdir ve artımlı
+vacuum her parçadan sonra yeni bir yazma gelip gelmediğine bakar.
+
+Tam VACUUM dosyayı baştan yazar ve bu sürede tüm yazmaları bekletir; bu
+yüzden yalnızca elle çalıştırılır (`python cli.py maintain --full`). Artımlı
+vacuum'u eski bir veritabanında açan da odur.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+TASKS = ("optimize", "analyze", "stock", "vacuum", "wal", "integrity")
+
+# Görev → iki başarılı çalışma arasındaki en kısa süre (sn)
+INTERVALS = {
+    "optimize": 3600,
+    "analyze": 86400,
+    "stock": 86400,
+    "wal": 3600,
+    "vacuum": 86400,
+    "integrity": 7 * 86400,
+}
+
+ANALYSIS_LIMIT = 1000   # ANALYZE'ın indeks başına okuduğu en fazla satır
+VACUUM_CHUNK = 256      # Artımlı vacuum parçası (sayfa)
+
+
+def ensure_schema(cur: sqlite3.Cursor) -> None:
+    """Bakım günlüğü tablosunu oluşturur (`DatabaseManager._ensure_schema` çağırır)"""
+    cur.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS MaintenanceLog (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            task        TEXT    NOT NULL,
+            started_at  INTEGER NOT NULL,
+            duration_ms REAL    NOT NULL,
+            size_before INTEGER,
+            size_after  INTEGER,
+            status      TEXT    NOT NULL CHECK (status IN ('ok', 'skipped', 'failed')),
+            detail      TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_maintenancelog_task
+            ON MaintenanceLog(task, started_at);
+        """
+    )
+
+
+class Maintenance:
+    """Bakım görevlerini çalıştırır ve sonuçlarını günlüğe yazar."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def file_size(self) -> int:
+        """Veritabanı dosyası ve WAL dosyasının toplam boyutu (bayt)"""
+        total = 0
+        for path in (Path(self.db.db_path), Path(f"{self.db.db_path}-wal")):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    # ---------- Görevler ------------------------------------------------
+    def _optimize(self, full: bool, stop) -> Tuple[str, str]:
+        self.db.conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        self.db.conn.execute("PRAGMA optimize")
+        return "ok", ""
+
+    def _analyze(self, full: bool, stop) -> Tuple[str, str]:
+        conn = self.db.conn
+        # Tam bakımda sınırsız (kesin) istatistik, aksi halde örneklem
+        conn.execute(f"PRAGMA analysis_limit = {0 if full else ANALYSIS_LIMIT}")
+        conn.execute("ANALYZE")
+        conn.commit()
+        return "ok", ""
+
+    def _stock(self, full: bool, stop) -> Tuple[str, str]:
+        written = self.db.ensure_checkpoints()
+        self.db.stock_value()   # değerlemeyi son harekete kadar işler
+        summarized = self.db.sales_rollup.sync()
+        ranked = self.db.sales_ranking.refresh()   # gün dönümünde pencereleri kaydırır
+        return "ok", (f"{written} kontrol noktası, {summarized} günlük satış satırı,"
+                      f" {ranked} sıralama satırı")
+
+    def _wal(self, full: bool, stop) -> Tuple[str, str]:
+        mode = "TRUNCATE" if full else "PASSIVE"
+        busy, log, done = self.db.conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        if log < 0:
+            return "skipped", "WAL kipinde değil"
+        return "ok", f"{done}/{log} sayfa aktarıldı" + (" (meşgul)" if busy else "")
+
+    def _vacuum(self, full: bool, stop) -> Tuple[str, str]:
+        conn = self.db.conn
+        if full:
+            conn.commit()
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")   # Dosyayı yeniden yazar; artımlı vacuum açılır
+            return "ok", "tam VACUUM"
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return "skipped", "artımlı vacuum kapalı (bir kez: cli.py maintain --full)"
+        freed = 0
+        while True:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free or stop():
+                break
+            # Her parça ayrı, kısa bir yazma işlemi. Pragma her adımda bir sayfa
+            # verir ve satır döndürmez; execute() tek adım attığı için
+            # executescript() ile sonuna kadar çalıştırılır
+            conn.executescript(f"PRAGMA incremental_vacuum({min(free, VACUUM_CHUNK)});")
+            freed += min(free, VACUUM_CHUNK)
+        return "ok", f"{freed} sayfa geri verildi" + (f", {free} kaldı" if free else "")
+
+    def _integrity(self, full: bool, stop) -> Tuple[str, str]:
+        if full:
+            problems = self.db.integrity_report()
+        else:
+            problems = [row[0] for row in self.db.conn.execute("PRAGMA quick_check")
+                        if row[0] != "ok"]
+        if problems:
+            return "failed", "; ".join(problems[:5])
+        return "ok", ""
+
+    # ---------- Çalıştırma ----------------------------------------------
+    def run(self, tasks: Optional[Iterable[str]] = None, full: bool = False,
+            stop: Optional[Callable[[], bool]] = None) -> List[dict]:
+        """
+        Görevleri sırayla çalıştırır ve her birini günlüğe yazar.
+
+        Args:
+            tasks: Çalıştırılacak görevler (varsayılan: hepsi, `TASKS` sırasıyla)
+            full: Tam bakım (tam VACUUM, kesin ANALYZE, TRUNCATE checkpoint,
+                tam bütünlük kontrolü); yazmaları bekletir, mesai dışında çalıştırın
+            stop: True döndürdüğünde kalan görevler atlanır (kasada yeni işlem)
+
+        Returns:
+            Günlüğe yazılan kayıtlar (task, status, duration_ms, size_before,
+            size_after, detail)
+        """
+        if self.db.read_only:
+            return []
+        stop = stop or (lambda: False)
+        tasks = list(tasks or TASKS)
+        for task in tasks:
+            if task not in TASKS:
+                raise ValueError(f"Bilinmeyen bakım görevi: {task} ({', '.join(TASKS)})")
+
+        results = []
+        for task in tasks:
+            if stop():
+                break
+            started = time.time()
+            size_before = self.file_size()
+            try:
+                status, detail = getattr(self, f"_{task}")(full, stop)
+            except sqlite3.Error as e:
+                self.db.conn.rollback()
+                status, detail = "failed", str(e)
+            result = {
+                "task": task,
+                "status": status,
+                "duration_ms": round((time.time() - started) * 1000, 1),
+                "size_before": size_before,
+                "size_after": self.file_size(),
+                "detail": detail,
+            }
+            self.db.conn.execute(
+                "INSERT INTO MaintenanceLog(task, started_at, duration_ms, size_before,"
+                " size_after, status, detail) VALUES (?,?,?,?,?,?,?)",
+                (task, int(started), result["duration_ms"], size_before,
+                 result["size_after"], status, detail),
+            )
+            self.db.conn.commit()
+            results.append(result)
+        return results
+
+    def due_tasks(self, now: Optional[float] = None) -> List[str]:
+        """
+        Son başarılı çalışmasının üzerinden `INTERVALS` kadar geçmiş görevler.
+        "stock" ayrıca en çok satanlar sıralaması bugünün gerisindeyse vadelidir:
+        rapor sekmesi sıralamayı yalnızca okur, pencereler gün dönümünden sonraki
+        ilk boş anda kaydırılır.
+        """
+        now = time.time() if now is None else now
+        last = dict(self.db.conn.execute(
+            "SELECT task, MAX(started_at) FROM MaintenanceLog"
+            " WHERE status != 'failed' GROUP BY task"
+        ).fetchall())
+        ranked_as_of, _ = self.db.sales_ranking.state()
+        stale_ranking = ranked_as_of != date.fromtimestamp(now)
+        return [task for task in TASKS
+                if now - last.get(task, 0) >= INTERVALS[task]
+                or (task == "stock" and stale_ranking)]
+
+    def history(self, limit: int = 50) -> List[sqlite3.Row]:
+        return self.db.conn.execute(
+            "SELECT task, started_at, duration_ms, size_before, size_after, status, detail"
+            " FROM MaintenanceLog ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+
+class MaintenanceScheduler:
+    """
+    Vadesi gelen bakım görevlerini boşta veya mesai dışında arka planda çalıştırır.
+
+    Boşta: `data_version()` en az `idle_seconds` boyunca değişmedi. Görevler
+    arasında ve artımlı vacuum parçaları arasında sürüm yeniden okunur;
+    değiştiyse (kasada satış yapıldı) bakım bir sonraki boş ana bırakılır.
+    """
+
+    def __init__(self, db_factory: Callable, idle_seconds: float = 300,
+                 off_hours: Tuple[int, int] = (2, 6), poll: float = 60):
+        """
+        Args:
+            db_factory: Zamanlayıcı iş parçacığında çağrılıp kendi
+                `DatabaseManager`'ını döndüren fonksiyon
+            idle_seconds: Bakıma başlamak için gereken değişmeden geçen süre
+            off_hours: Boşta şartı aranmayan saat aralığı [başlangıç, bitiş)
+            poll: Kontrol aralığı (sn)
+        """
+        self.db_factory = db_factory
+        self.idle_seconds = idle_seconds
+        self.off_hours = off_hours
+        self.poll = poll
+        self.last_results: List[dict] = []
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _off_hours(self) -> bool:
+        start, end = self.off_hours
+        hour = datetime.now().hour
+        return start <= hour < end if start <= end else (hour >= start or hour < end)
+
+    def _run(self) -> None:
+        db = None
+        version, since = None, time.monotonic()
+        while not self._stop.wait(self.poll):
+            try:
+                if db is None:
+                    db = self.db_factory()
+                current = db.data_version()
+                if current != version:
+                    version, since = current, time.monotonic()
+                off_hours = self._off_hours()
+                if not off_hours and time.monotonic() - since < self.idle_seconds:
+                    continue
+                due = db.maintenance.due_tasks()
+                if not due:
+                    continue
+
+                def busy() -> bool:
+                    # Mesai içinde yeni bir yazma geldiyse bakımı bırak
+                    return self._stop.is_set() or (not off_hours and db.data_version() != version)
+
+                self.last_results = db.maintenance.run(due, stop=busy)
+                version = db.data_version()  # Bakımın kendi yazmaları boşta sayılır
+                self.last_error = None
+            except Exception as e:  # Kilit, disk hatası…
+                self.last_error = str(e)
+                if db is not None:
+                    db.close()
+                db = None
+        if db is not None:
+            db.close()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
@@ -3,27 +3,168 @@ models.py
 Veri katmanı: SQLite bağlantısı ve CRUD işlemleri.
 """
 
+import functools
 import sqlite3                    # Python yerleşik SQLite modülü :contentReference[oaicite:0]{index=0}
+import threading
+import uuid
 from datetime import datetime, date
 from pathlib import Path
-from typing import List, Tuple, Optional, Any
+from typing import List, Tuple, Optional, Any, Iterable
+
+import forecasting
+import maintenance
+import rankings
+import replication
+import valuation
+from catalog import ProductCatalog
+from report_cache import ReportCache
 
 # ✓ Uygulama kök dizininde /data/inventory.db dosyası oluşturur
 DB_PATH = Path(__file__).resolve().parent / "data" / "inventory.db"
 DB_PATH.parent.mkdir(exist_ok=True)
 
+# Konumu belirtilmeyen hareketler ürünün kendi konumuna (Product.location),
+# o da boşsa bu konuma yazılır
+DEFAULT_LOCATION = "Mağaza"
+
+# Bağlantı profilleri: iş yüküne göre PRAGMA'lar ve bağlantı seçenekleri.
+# Değerler `python -m benchmarks.profiles` ölçümleriyle seçildi.
+#   till        : kasa / servis — kısa yazma işlemleri, okurlar yazarı beklemez
+#   reporting   : rapor işçileri ve CLI — geniş önbellek, mmap, bellekte sıralama
+#   bulk-import : toplu içe aktarma ve eşitleme — en büyük önbellek, diske
+#                 yazma beklenmez (elektrik kesilirse son işlemler kaybolabilir)
+#   default     : SQLite varsayılanları (karşılaştırma için)
+PROFILES = {
+    "default": {"pragmas": {}, "cached_statements": 128, "timeout": 5.0},
+    "till": {
+        "pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -16_000,
+                    "mmap_size": 64 * 2**20, "temp_store": "MEMORY"},
+        "cached_statements": 256,
+        "timeout": 5.0,
+    },
+    "reporting": {
+        "pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -64_000,
+                    "mmap_size": 256 * 2**20, "temp_store": "MEMORY"},
+        "cached_statements": 256,
+        "timeout": 30.0,
+    },
+    "bulk-import": {
+        "pragmas": {"journal_mode": "WAL", "synchronous": "OFF", "cache_size": -128_000,
+                    "mmap_size": 256 * 2**20, "temp_store": "MEMORY"},
+        "cached_statements": 64,
+        "timeout": 30.0,
+    },
+}
+DEFAULT_PROFILE = "till"
+
+
+def _serialized(method):
+    """Yazan işlemleri nesnenin yazma kilidiyle sıraya sokar (tek yazıcı)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class DatabaseManager:
-    """SQLite tabanlı basit DAO (Data‑Access Object)."""
+    """
+    SQLite tabanlı basit DAO (Data‑Access Object).
+
+    İş parçacıkları arasında paylaşılabilir: her iş parçacığı `conn` üzerinden
+    kendi bağlantısını kullanır, yazan işlemler tek bir kilitle sıralanır.
+    Böylece okumalar birbirini beklemez, yazmalar "database is locked"
+    hatasına düşmez.
+    """
 
-    def __init__(self, db_path: Path = DB_PATH):
+    def __init__(self, db_path: Path = DB_PATH, read_only: bool = False,
+                 profile: str = DEFAULT_PROFILE):
+        """
+        Args:
+            db_path: Veritabanı dosyası
+            read_only: True ise bağlantı salt okunur açılır ve şema kontrolü
+                yapılmaz (rapor işçileri gibi yalnızca okuyan süreçler için)
+            profile: Bağlantı profili (`PROFILES` anahtarlarından biri)
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Bilinmeyen profil: {profile} ({', '.join(PROFILES)})")
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-        self._ensure_schema()     # tablo yoksa oluştur
+        self.read_only = read_only
+        self.profile = profile
+        self._local = threading.local()
+        self._connections = {}        # iş parçacığı → bağlantı (close() için)
+        self._conn_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self.valuation = valuation.ValuationEngine(self)
+        # Ürün yazmalarıyla ve ürün sayacıyla güncel tutulur (yerelde sayaç her okumada)
+        self.catalog = ProductCatalog(self, check_interval=0.0)
+        self.report_cache = ReportCache(self)  # data_version() ile etiketli sonuçlar
+        self.replication = replication.Replicator(self)
+        self.maintenance = maintenance.Maintenance(self)
+        self.sales_rollup = forecasting.SalesRollup(self)   # günlük satış özeti
+        self.sales_ranking = rankings.SalesRanking(self)    # en çok satanlar (7/30/90 gün)
+        if not read_only:
+            self._ensure_schema()     # tablo yoksa oluştur
+
+    def _connect(self) -> sqlite3.Connection:
+        # Bağlantı yalnızca sahibi olan iş parçacığında kullanılır; denetim
+        # kapalı, çünkü close() tüm bağlantıları çağıran iş parçacığından kapatır
+        settings = PROFILES[self.profile]
+        options = {"check_same_thread": False, "timeout": settings["timeout"],
+                   "cached_statements": settings["cached_statements"]}
+        if self.read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, **options)
+        else:
+            conn = sqlite3.connect(self.db_path, **options)
+        conn.row_factory = sqlite3.Row
+        self._apply_pragmas(conn)
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection) -> None:
+        for name, value in PROFILES[self.profile]["pragmas"].items():
+            if name == "journal_mode":
+                if self.read_only:
+                    continue  # Günlük kipi dosyaya yazılır; salt okunur bağlantı değiştiremez
+                try:
+                    conn.execute(f"PRAGMA journal_mode = {value}")
+                except sqlite3.OperationalError:
+                    pass  # Başka bir süreç kilit tutuyor: mevcut kiple devam
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+
+    def set_profile(self, profile: str) -> None:
+        """
+        Profili değiştirir: PRAGMA'lar bu iş parçacığının bağlantısına hemen,
+        diğer iş parçacıklarına bağlantıları yeniden açıldığında uygulanır.
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Bilinmeyen profil: {profile} ({', '.join(PROFILES)})")
+        self.profile = profile
+        self._apply_pragmas(self.conn)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Çağıran iş parçacığına ait bağlantı (ilk kullanımda açılır)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._conn_lock:
+                # Sonlanmış iş parçacıklarından kalan bağlantıları kapat
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
 
     # ---------- Şema --------------------------------------------------
     def _ensure_schema(self) -> None:
         cur = self.conn.cursor()
+        # Yeni veritabanlarında silinen sayfalar artımlı vacuum ile geri verilir.
+        # WAL kipi dosya başlığını çoktan yazdığı için ayar boş dosyada VACUUM
+        # ile uygulanır; mevcut veritabanları için bkz. `cli.py maintain --full`
+        if not cur.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]:
+            cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cur.execute("VACUUM")
         # Ürün tablosu
         cur.execute(
             """
@@ -65,33 +206,493 @@ class DatabaseManager:
             cur.execute("SELECT purchase_price FROM StockMovement LIMIT 1")
         except sqlite3.OperationalError:
             cur.execute("ALTER TABLE StockMovement ADD COLUMN purchase_price REAL DEFAULT NULL")
-        
+
+        # Kasa günlüğünden (sales_journal) gelen hareketler için tekillik anahtarı
+        try:
+            cur.execute("SELECT op_key FROM StockMovement LIMIT 1")
+        except sqlite3.OperationalError:
+            cur.execute("ALTER TABLE StockMovement ADD COLUMN op_key TEXT DEFAULT NULL")
+
+        # Konum sütunu, TRANSFER hareket türü ve tamsayı (epoch) zaman damgası:
+        # CHECK kısıtı ve sütun türü ALTER ile değiştirilemediği için tablo
+        # bir kez yeniden kurulur
+        movement_sql = cur.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='StockMovement'"
+        ).fetchone()[0]
+        movement_columns = {row[1] for row in cur.execute("PRAGMA table_info(StockMovement)")}
+        if "'TRANSFER'" not in movement_sql or "ts" not in movement_columns:
+            self._rebuild_movement_table(cur, movement_columns)
+        cur.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_movement_op_key"
+            " ON StockMovement(op_key) WHERE op_key IS NOT NULL"
+        )
+        # Alış fiyatı serisi (price_analytics): yalnızca alışları içeren, örten indeks
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_movement_purchase_price"
+            " ON StockMovement(product_id, ts, purchase_price)"
+            " WHERE reason = 'PURCHASE' AND purchase_price IS NOT NULL"
+        )
+        # Eski metin zaman damgasını bekleyen sorgular için uyumluluk görünümü
+        cur.execute(
+            """
+            CREATE VIEW IF NOT EXISTS StockMovementView AS
+            SELECT id, product_id, change, reason, purchase_price,
+                   DATETIME(ts, 'unixepoch') AS timestamp, op_key, location, ts
+            FROM StockMovement
+            """
+        )
+
+        # Konum bazında stok: (konum, ürün) → miktar, tetikleyicilerle güncel tutulur
+        new_location_table = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='LocationStock'"
+        ).fetchone() is None
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS LocationStock (
+                location   TEXT    NOT NULL,
+                product_id INTEGER NOT NULL REFERENCES Product (id),
+                qty        INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (location, product_id)
+            ) WITHOUT ROWID;
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_locationstock_product"
+            " ON LocationStock(product_id, location)"
+        )
+        if new_location_table:
+            self._rebuild_location_stock(cur)
+
+        # Kritik stok seviyesi (reorder point)
+        try:
+            cur.execute("SELECT reorder_point FROM Product LIMIT 1")
+        except sqlite3.OperationalError:
+            cur.execute("ALTER TABLE Product ADD COLUMN reorder_point INTEGER DEFAULT 0")
+
+        # Ürün başına güncel stok: hareketler yazıldıkça tetikleyicilerle güncellenir,
+        # böylece stok seviyesi ve kritik stok listesi için SUM(change) gerekmez
+        new_stock_table = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='StockLevel'"
+        ).fetchone() is None
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS StockLevel (
+                product_id    INTEGER PRIMARY KEY REFERENCES Product (id),
+                qty           INTEGER NOT NULL DEFAULT 0,
+                reorder_point INTEGER NOT NULL DEFAULT 0
+            );
+            """
+        )
+        # Kısmi indeks = kritik seviyenin altındaki ürünler kümesi
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stocklevel_low"
+            " ON StockLevel(product_id) WHERE qty <= reorder_point"
+        )
+        if new_stock_table:
+            self._rebuild_stock_levels(cur)
+        self._ensure_triggers(cur)
+
+        # Stok değerleme (FIFO / ortalama maliyet) tabloları
+        valuation.ensure_schema(cur)
+
+        # Satış hızı tahmini için günlük satış özeti
+        forecasting.ensure_schema(cur)
+        rankings.ensure_schema(cur)
+
+        # Satış fişleri: satış anındaki ad ve fiyat satırlara kopyalanır,
+        # böylece sonraki fiyat değişiklikleri geçmiş gelirleri değiştirmez
+        new_sale_tables = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='Sale'"
+        ).fetchone() is None
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS Sale (
+                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                op_key     TEXT    UNIQUE,
+                source     TEXT    NOT NULL DEFAULT 'till',
+                day        TEXT    NOT NULL,
+                created_at TEXT    DEFAULT CURRENT_TIMESTAMP,
+                item_count INTEGER NOT NULL DEFAULT 0,
+                total      REAL    NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_sale_day ON Sale(day);
+
+            CREATE TABLE IF NOT EXISTS SaleLine (
+                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                sale_id    INTEGER NOT NULL REFERENCES Sale (id),
+                product_id INTEGER NOT NULL,
+                name       TEXT    NOT NULL,
+                qty        INTEGER NOT NULL,
+                unit_price REAL    NOT NULL,
+                line_total REAL    NOT NULL,
+                day        TEXT    NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_saleline_sale ON SaleLine(sale_id, product_id);
+            CREATE INDEX IF NOT EXISTS idx_saleline_day
+                ON SaleLine(day, product_id, qty, line_total);
+            """
+        )
+        if new_sale_tables:
+            self._backfill_sales(cur)
+
+        # Birim fiyat değişim günlüğü: Product.unit_price her değiştiğinde aynı
+        # işlem içinde tetikleyiciyle bir satır yazılır. Birincil anahtar
+        # (product_id, effective_from) olduğundan price_at() tek B-ağacı aramasıdır
+        new_price_table = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='PriceChange'"
+        ).fetchone() is None
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS PriceChange (
+                product_id     INTEGER NOT NULL,
+                effective_from INTEGER NOT NULL,
+                price          REAL    NOT NULL,
+                PRIMARY KEY (product_id, effective_from)
+            ) WITHOUT ROWID;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_insert_price
+            AFTER INSERT ON Product BEGIN
+                INSERT OR REPLACE INTO PriceChange(product_id, effective_from, price)
+                VALUES (NEW.id,
+                        COALESCE(CAST(strftime('%s', NEW.created_at) AS INTEGER),
+                                 CAST(strftime('%s', 'now') AS INTEGER)),
+                        COALESCE(NEW.unit_price, 0));
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_update_price
+            AFTER UPDATE OF unit_price ON Product
+            WHEN NEW.unit_price IS NOT OLD.unit_price BEGIN
+                INSERT OR REPLACE INTO PriceChange(product_id, effective_from, price)
+                VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER),
+                        COALESCE(NEW.unit_price, 0));
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_delete_price
+            AFTER DELETE ON Product BEGIN
+                DELETE FROM PriceChange WHERE product_id = OLD.id;
+            END;
+            """
+        )
+        if new_price_table:
+            self._backfill_price_changes(cur)
+
+        # Aylık stok kontrol noktaları: geçmiş tarihli stok sorguları en yakın
+        # noktadan başlar ve yalnızca sonraki hareketleri toplar
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS StockCheckpoint (
+                ts          INTEGER PRIMARY KEY,
+                movement_id INTEGER NOT NULL,
+                created_at  INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+            );
+
+            CREATE TABLE IF NOT EXISTS CheckpointStock (
+                ts         INTEGER NOT NULL,
+                product_id INTEGER NOT NULL,
+                qty        INTEGER NOT NULL,
+                PRIMARY KEY (ts, product_id)
+            ) WITHOUT ROWID;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_delete_checkpoint
+            AFTER DELETE ON Product BEGIN
+                DELETE FROM CheckpointStock WHERE product_id = OLD.id;
+            END;
+            """
+        )
+
+        # Veri sürümü sayaçları: eklemeler son id'den anlaşılır; ürün
+        # değişiklikleri ve hareket silme/düzeltmeleri burada sayılır (eklemede
+        # varsayılan konumun doldurulması düzeltme sayılmaz)
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS DataVersion (
+                name    TEXT    PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            );
+            INSERT OR IGNORE INTO DataVersion(name, version) VALUES ('product', 0), ('movement', 0);
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_insert_version
+            AFTER INSERT ON Product BEGIN
+                UPDATE DataVersion SET version = version + 1 WHERE name = 'product';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_update_version
+            AFTER UPDATE ON Product BEGIN
+                UPDATE DataVersion SET version = version + 1 WHERE name = 'product';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_delete_version
+            AFTER DELETE ON Product BEGIN
+                UPDATE DataVersion SET version = version + 1 WHERE name = 'product';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_delete_version
+            AFTER DELETE ON StockMovement BEGIN
+                UPDATE DataVersion SET version = version + 1 WHERE name = 'movement';
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_update_version
+            AFTER UPDATE ON StockMovement WHEN OLD.location IS NOT NULL BEGIN
+                UPDATE DataVersion SET version = version + 1 WHERE name = 'movement';
+            END;
+            """
+        )
+
+        # Mağazalar arası eşitleme için değişiklik günlüğü
+        replication.ensure_schema(cur)
+
+        # Bakım görevlerinin günlüğü
+        maintenance.ensure_schema(cur)
+
         self.conn.commit()
 
+    def _ensure_triggers(self, cur: sqlite3.Cursor) -> None:
+        """StockLevel ve LocationStock tablolarını güncel tutan tetikleyiciler"""
+        cur.executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_product_insert_level
+            AFTER INSERT ON Product BEGIN
+                INSERT OR IGNORE INTO StockLevel(product_id, qty, reorder_point)
+                VALUES (NEW.id, 0, COALESCE(NEW.reorder_point, 0));
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_reorder_level
+            AFTER UPDATE OF reorder_point ON Product BEGIN
+                UPDATE StockLevel SET reorder_point = COALESCE(NEW.reorder_point, 0)
+                WHERE product_id = NEW.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_delete_level
+            AFTER DELETE ON Product BEGIN
+                DELETE FROM StockLevel WHERE product_id = OLD.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_product_delete_location
+            AFTER DELETE ON Product BEGIN
+                DELETE FROM LocationStock WHERE product_id = OLD.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_insert_level
+            AFTER INSERT ON StockMovement BEGIN
+                INSERT OR IGNORE INTO StockLevel(product_id, qty, reorder_point)
+                VALUES (NEW.product_id, 0, 0);
+                UPDATE StockLevel SET qty = qty + NEW.change
+                WHERE product_id = NEW.product_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_delete_level
+            AFTER DELETE ON StockMovement BEGIN
+                UPDATE StockLevel SET qty = qty - OLD.change
+                WHERE product_id = OLD.product_id;
+            END;
+
+            -- Konumu verilmeyen hareket ürünün konumuna yazılır; bu UPDATE
+            -- aşağıdaki trg_movement_update_location ile LocationStock'a yansır
+            CREATE TRIGGER IF NOT EXISTS trg_movement_default_location
+            AFTER INSERT ON StockMovement WHEN NEW.location IS NULL BEGIN
+                UPDATE StockMovement SET location = COALESCE(
+                    (SELECT NULLIF(location, '') FROM Product WHERE id = NEW.product_id),
+                    '{DEFAULT_LOCATION}')
+                WHERE id = NEW.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_insert_location
+            AFTER INSERT ON StockMovement WHEN NEW.location IS NOT NULL BEGIN
+                INSERT INTO LocationStock(location, product_id, qty)
+                VALUES (NEW.location, NEW.product_id, NEW.change)
+                ON CONFLICT(location, product_id) DO UPDATE SET qty = qty + excluded.qty;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_delete_location
+            AFTER DELETE ON StockMovement WHEN OLD.location IS NOT NULL BEGIN
+                UPDATE LocationStock SET qty = qty - OLD.change
+                WHERE location = OLD.location AND product_id = OLD.product_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_update_location
+            AFTER UPDATE OF change, product_id, location ON StockMovement BEGIN
+                UPDATE LocationStock SET qty = qty - OLD.change
+                WHERE OLD.location IS NOT NULL
+                  AND location = OLD.location AND product_id = OLD.product_id;
+                INSERT INTO LocationStock(location, product_id, qty)
+                SELECT NEW.location, NEW.product_id, NEW.change
+                WHERE NEW.location IS NOT NULL
+                ON CONFLICT(location, product_id) DO UPDATE SET qty = qty + excluded.qty;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_movement_update_level
+            AFTER UPDATE OF change, product_id ON StockMovement BEGIN
+                UPDATE StockLevel SET qty = qty - OLD.change
+                WHERE product_id = OLD.product_id;
+                UPDATE StockLevel SET qty = qty + NEW.change
+                WHERE product_id = NEW.product_id;
+            END;
+            """
+        )
+
+    def _backfill_sales(self, cur: sqlite3.Cursor) -> None:
+        """
+        Fiş tablolarından önceki satışları günlük birer "aktarılan" fişe
+        dönüştürür. Satış anındaki fiyat kaydedilmediği için güncel birim
+        fiyat kullanılır (eski rapor da böyle hesaplıyordu).
+        """
+        cur.execute(
+            """
+            INSERT INTO SaleLine(sale_id, product_id, name, qty, unit_price, line_total, day)
+            SELECT 0, p.id, p.name, SUM(-sm.change), p.unit_price,
+                   SUM(-sm.change) * p.unit_price, DATE(sm.ts, 'unixepoch', 'localtime')
+            FROM StockMovement sm JOIN Product p ON p.id = sm.product_id
+            WHERE (sm.reason = 'SALE' AND sm.change < 0
+                   OR sm.reason = 'ADJUST' AND sm.change > 0
+                      AND COALESCE(sm.op_key, '') NOT LIKE 'stocktake:%')
+            GROUP BY DATE(sm.ts, 'unixepoch', 'localtime'), p.id
+            HAVING SUM(-sm.change) > 0
+            """
+        )
+        cur.execute(
+            """
+            INSERT INTO Sale(op_key, source, day, created_at, item_count, total)
+            SELECT 'legacy:' || day, 'legacy', day, day, SUM(qty), SUM(line_total)
+            FROM SaleLine WHERE sale_id = 0 GROUP BY day
+            """
+        )
+        cur.execute(
+            "UPDATE SaleLine SET sale_id = (SELECT id FROM Sale WHERE op_key = 'legacy:' || SaleLine.day)"
+            " WHERE sale_id = 0"
+        )
+
+    def _backfill_price_changes(self, cur: sqlite3.Cursor) -> None:
+        """
+        Günlük tablosu yeni kurulduğunda bilinen fiyatları yazar: ürün eklenme
+        anından itibaren ilk fiyat, farklıysa geçiş anından itibaren güncel fiyat.
+        Aradaki değişikliklerin zamanı kayıtlı olmadığı için geri kazanılamaz.
+        """
+        cur.execute(
+            """
+            INSERT OR REPLACE INTO PriceChange(product_id, effective_from, price)
+            SELECT id, COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0),
+                   COALESCE(NULLIF(initial_price, 0), unit_price, 0)
+            FROM Product
+            """
+        )
+        cur.execute(
+            """
+            INSERT OR REPLACE INTO PriceChange(product_id, effective_from, price)
+            SELECT id, MAX(COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0),
+                           CAST(strftime('%s', 'now') AS INTEGER)),
+                   unit_price
+            FROM Product
+            WHERE unit_price IS NOT COALESCE(NULLIF(initial_price, 0), unit_price)
+            """
+        )
+
+    def _rebuild_movement_table(self, cur: sqlite3.Cursor, columns: set) -> None:
+        """
+        StockMovement'ı güncel biçimiyle yeniden kurar: konum sütunu, TRANSFER
+        türü ve metin `timestamp` yerine UTC epoch saniyesi olarak `ts`.
+        """
+        cur.execute("DROP VIEW IF EXISTS StockMovementView")
+        cur.execute("DROP TABLE IF EXISTS StockMovement_new")
+        cur.execute(
+            """
+            CREATE TABLE StockMovement_new (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id  INTEGER REFERENCES Product (id),
+                change      INTEGER,
+                reason      TEXT    CHECK(reason IN ('SALE','PURCHASE','ADJUST','TRANSFER')),
+                purchase_price REAL DEFAULT NULL,
+                ts          INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                op_key      TEXT    DEFAULT NULL,
+                location    TEXT    DEFAULT NULL
+            );
+            """
+        )
+        if "ts" in columns:
+            ts = "sm.ts"
+        else:
+            ts = ("COALESCE(CAST(strftime('%s', sm.timestamp) AS INTEGER),"
+                  " CAST(strftime('%s', 'now') AS INTEGER))")
+        location = "NULLIF(p.location, '')"
+        if "location" in columns:
+            location = f"sm.location, {location}"
+        cur.execute(
+            f"""
+            INSERT INTO StockMovement_new
+                (id, product_id, change, reason, purchase_price, ts, op_key, location)
+            SELECT sm.id, sm.product_id, sm.change, sm.reason, sm.purchase_price,
+                   {ts}, sm.op_key, COALESCE({location}, ?)
+            FROM StockMovement sm LEFT JOIN Product p ON p.id = sm.product_id
+            """,
+            (DEFAULT_LOCATION,),
+        )
+        cur.execute("DROP TABLE StockMovement")
+        cur.execute("ALTER TABLE StockMovement_new RENAME TO StockMovement")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_movement_location"
+            " ON StockMovement(location, product_id)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_movement_product_ts ON StockMovement(product_id, ts)"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_movement_ts ON StockMovement(ts)")
+
+    def _rebuild_location_stock(self, cur: sqlite3.Cursor) -> None:
+        """LocationStock tablosunu hareketlerden baştan hesaplar"""
+        cur.execute("DELETE FROM LocationStock")
+        cur.execute(
+            """
+            INSERT INTO LocationStock(location, product_id, qty)
+            SELECT location, product_id, SUM(change) FROM StockMovement
+            WHERE location IS NOT NULL
+            GROUP BY location, product_id
+            """
+        )
+
+    def _rebuild_stock_levels(self, cur: sqlite3.Cursor) -> None:
+        """StockLevel tablosunu hareketlerden baştan hesaplar"""
+        cur.execute("DELETE FROM StockLevel")
+        cur.execute(
+            """
+            INSERT INTO StockLevel(product_id, qty, reorder_point)
+            SELECT p.id,
+                   COALESCE((SELECT SUM(change) FROM StockMovement sm
+                             WHERE sm.product_id = p.id), 0),
+                   COALESCE(p.reorder_point, 0)
+            FROM Product p
+            """
+        )
+
     # ---------- Veritabanı Yönetimi -----------------------------------
     def refresh_connection(self):
         """Veritabanı bağlantısını yeniler"""
         try:
-            # Mevcut bağlantıyı kapat
-            self.conn.close()
+            # Bu iş parçacığının bağlantısını kapat
+            conn = getattr(self._local, "conn", None)
+            if conn is not None:
+                with self._conn_lock:
+                    self._connections.pop(threading.current_thread(), None)
+                self._local.conn = None
+                conn.close()
             # Bağlantıyı yeniden aç
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
+            self.conn
             return True
         except sqlite3.Error:
             return False
 
     # ---------- CRUD: Product ----------------------------------------
+    @_serialized
     def add_product(self, name: str, barcode: str,
-                    location: str, unit_price: float) -> int:
+                    location: str, unit_price: float,
+                    reorder_point: int = 0) -> int:
         cur = self.conn.cursor()
         # initial_price ile unit_price aynı değere sahip olacak ilk başta
         cur.execute(
-            "INSERT INTO Product(name, barcode, location, unit_price, initial_price)"
-            " VALUES (?,?,?,?,?)",
-            (name, barcode, location, unit_price, unit_price),
+            "INSERT INTO Product(name, barcode, location, unit_price, initial_price,"
+            " reorder_point) VALUES (?,?,?,?,?,?)",
+            (name, barcode, location, unit_price, unit_price, reorder_point),
         )
         self.conn.commit()
+        self.catalog.product_changed(cur.lastrowid)
         return cur.lastrowid
 
     def list_products(self) -> List[sqlite3.Row]:
@@ -108,6 +709,24 @@ class DatabaseManager:
             "SELECT * FROM Product WHERE barcode=?", (code,)
         ).fetchone()
         
+    def search_products(self, query: str,
+                        limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """
+        Ürünleri ad veya barkod içinde geçen metne göre arar (ada göre sıralı).
+        `limit` verilirse en fazla o kadar satır döner.
+        """
+        pattern = f'%{query}%'
+        sql = (
+            "SELECT id, name, barcode, location FROM Product"
+            " WHERE name LIKE ? OR barcode LIKE ? ORDER BY name"
+        )
+        params: Tuple[Any, ...] = (pattern, pattern)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (int(limit),)
+        return self.conn.execute(sql, params).fetchall()
+
+    @_serialized
     def delete_product(self, product_id: int) -> bool:
         """
         Ürünü ve ilişkili tüm stok hareketlerini siler.
@@ -120,21 +739,68 @@ class DatabaseManager:
             # Sonra ürünü sil
             cur.execute("DELETE FROM Product WHERE id=?", (product_id,))
             self.conn.commit()
+            self.catalog.product_changed(product_id)
             return cur.rowcount > 0  # Silinen satır varsa True
         except sqlite3.Error:
             self.conn.rollback()
             return False
 
     # ---------- Stok işlemleri ---------------------------------------
+    @_serialized
     def change_stock(self, product_id: int, qty: int,
-                     reason: str = "SALE", purchase_price: float = None) -> None:
+                     reason: str = "SALE", purchase_price: float = None,
+                     location: Optional[str] = None) -> None:
+        # location verilmezse hareket ürünün kendi konumuna yazılır
         self.conn.execute(
-            "INSERT INTO StockMovement(product_id, change, reason, purchase_price)"
-            " VALUES (?,?,?,?)",
-            (product_id, qty, reason, purchase_price),
+            "INSERT INTO StockMovement(product_id, change, reason, purchase_price, location)"
+            " VALUES (?,?,?,?,?)",
+            (product_id, qty, reason, purchase_price, location),
         )
         self.conn.commit()
         
+    @_serialized
+    def apply_movements(self, movements: List[dict]) -> int:
+        """
+        Kasa günlüğünden gelen hareketleri tek bir işlemde (transaction) yazar.
+
+        Her hareket `op_key` taşır; aynı anahtar daha önce yazıldıysa satır
+        atlanır, bu yüzden aynı parti güvenle tekrar gönderilebilir. Yalnızca
+        op_key çakışması atlanır: CHECK / NOT NULL ihlali gibi gerçek hatalar
+        IntegrityError verir ve parti geri alınır (günlükte kalır, kaybolmaz).
+
+        Args:
+            movements: op_key, product_id, change, reason, purchase_price ve
+                isteğe bağlı ts (satışın gerçek zamanı, epoch sn) veya
+                timestamp (aynı zaman, "YYYY-MM-DD HH:MM:SS" UTC) ile
+                location alanlı sözlükler
+
+        Returns:
+            int: Yeni eklenen hareket sayısı
+        """
+        try:
+            cur = self.conn.executemany(
+                "INSERT INTO StockMovement"
+                "(op_key, product_id, change, reason, purchase_price, ts, location)"
+                " VALUES (:op_key, :product_id, :change, :reason, :purchase_price,"
+                " COALESCE(:ts, CAST(strftime('%s', :timestamp) AS INTEGER),"
+                " CAST(strftime('%s', 'now') AS INTEGER)), :location)"
+                " ON CONFLICT(op_key) WHERE op_key IS NOT NULL DO NOTHING",
+                [{"purchase_price": None, "ts": None, "timestamp": None, "location": None,
+                  **m}
+                 for m in movements],
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        # rowcount tetikleyicilerin yazdıklarını (StockLevel, değişiklik günlüğü) saymaz
+        return cur.rowcount
+
+    def clone(self) -> "DatabaseManager":
+        """Aynı veritabanına ayrı bağlantıyla yeni bir DAO döndürür (arka plan işleri için)"""
+        return DatabaseManager(self.db_path, profile=self.profile)
+
+    @_serialized
     def update_unit_price(self, product_id: int, new_price: float) -> bool:
         """
         Ürünün güncel birim fiyatını günceller
@@ -148,6 +814,7 @@ class DatabaseManager:
         """
         try:
             cur = self.conn.cursor()
+            # trg_product_update_price aynı işlemde PriceChange'e satır ekler
             cur.execute(
                 "UPDATE Product SET unit_price = ? WHERE id = ?",
                 (new_price, product_id)
@@ -155,6 +822,7 @@ class DatabaseManager:
             self.conn.commit()
             # Değişikliklerin veritabanına yazıldığından emin olmak için bağlantıyı yeniliyoruz
             self.refresh_connection()
+            self.catalog.product_changed(product_id)
             # Güncellemeyi doğrula
             updated = self.get_product_by_id(product_id)
             return updated and abs(updated["unit_price"] - new_price) < 0.01
@@ -162,51 +830,600 @@ class DatabaseManager:
             self.conn.rollback()
             return False
 
+    def stock_levels(self) -> dict:
+        """Tüm ürünlerin stoğu: product_id → qty (tek sorgu, sürümle önbellekli)"""
+        return self.report_cache.cached("stock_levels", lambda: {
+            row[0]: row[1] for row in self.conn.execute("SELECT product_id, qty FROM StockLevel")
+        })
+
+    def data_version(self) -> Tuple[int, int, int, int]:
+        """
+        Verinin sürümü: (son hareket id, son fiş satırı id, ürün sayacı,
+        hareket düzeltme sayacı). Sürüm aynıysa raporlar ve listeler değişmemiştir.
+        """
+        return tuple(self.conn.execute(
+            """
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM StockMovement),
+                   (SELECT COALESCE(MAX(id), 0) FROM SaleLine),
+                   (SELECT version FROM DataVersion WHERE name = 'product'),
+                   (SELECT version FROM DataVersion WHERE name = 'movement')
+            """
+        ).fetchone())
+
+    def product_version(self) -> int:
+        """Ürün sayacı: Product tablosuna her bağlantıdan yapılan her yazmada artar"""
+        row = self.conn.execute(
+            "SELECT version FROM DataVersion WHERE name = 'product'").fetchone()
+        return row[0] if row else 0
+
     def get_stock_level(self, product_id: int) -> int:
         row = self.conn.execute(
-            "SELECT COALESCE(SUM(change),0) AS qty"
-            " FROM StockMovement WHERE product_id=?",
+            "SELECT qty FROM StockLevel WHERE product_id=?",
             (product_id,),
         ).fetchone()
         return row["qty"] if row else 0
 
-    # ---------- Günlük satış raporu ----------------------------------
-    def daily_sales_report(self) -> List[Tuple[Any, ...]]:
+    # ---------- Konum bazında stok -------------------------------------
+    @_serialized
+    def transfer_stock(self, product_id: int, qty: int,
+                       from_location: str, to_location: str) -> str:
+        """
+        Stoğu iki konum arasında taşır: çıkış ve giriş hareketleri aynı
+        işlemde yazılır, ikisi aynı op_key kökünü paylaşır.
+
+        Raises:
+            ValueError: Miktar/konum geçersizse veya kaynak konumda yeterli stok yoksa
+
+        Returns:
+            str: Transferin anahtarı
+        """
+        from_location, to_location = from_location.strip(), to_location.strip()
+        if qty <= 0:
+            raise ValueError("Transfer miktarı pozitif olmalı")
+        if not from_location or not to_location or from_location == to_location:
+            raise ValueError("Kaynak ve hedef konum farklı olmalı")
+
+        key = f"transfer:{uuid.uuid4().hex}"
+        self.conn.commit()
         cur = self.conn.cursor()
-        cur.execute(
+        try:
+            cur.execute("BEGIN IMMEDIATE")  # Stok kontrolü ile yazma arasında değişmesin
+            available = self.location_qty(product_id, from_location)
+            if available < qty:
+                raise ValueError(
+                    f"{from_location} konumunda yeterli stok yok (mevcut: {available})")
+            cur.executemany(
+                "INSERT INTO StockMovement(product_id, change, reason, op_key, location)"
+                " VALUES (?,?,'TRANSFER',?,?)",
+                [(product_id, -qty, f"{key}:out", from_location),
+                 (product_id, qty, f"{key}:in", to_location)],
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return key
+
+    def location_qty(self, product_id: int, location: str) -> int:
+        row = self.conn.execute(
+            "SELECT qty FROM LocationStock WHERE location = ? AND product_id = ?",
+            (location, product_id),
+        ).fetchone()
+        return row["qty"] if row else 0
+
+    def list_locations(self) -> List[sqlite3.Row]:
+        """Stok bulunan konumlar: location, product_count, qty"""
+        return self.report_cache.cached("locations", lambda: self.conn.execute(
             """
-            SELECT 
-                p.name,
-                SUM(CASE 
-                    WHEN sm.change < 0 AND sm.reason = 'SALE' THEN -sm.change
-                    WHEN sm.change > 0 AND sm.reason = 'ADJUST' THEN -sm.change
-                    ELSE 0 
-                END) AS sold_qty,
-                SUM(CASE 
-                    WHEN sm.change < 0 AND sm.reason = 'SALE' THEN -sm.change*p.unit_price
-                    WHEN sm.change > 0 AND sm.reason = 'ADJUST' THEN -sm.change*p.unit_price
-                    ELSE 0 
-                END) AS revenue
-            FROM StockMovement sm
-            JOIN Product p ON p.id = sm.product_id
-            WHERE DATE(sm.timestamp) = DATE('now', 'localtime')
-            GROUP BY p.id
-            HAVING sold_qty > 0
-            ORDER BY sold_qty DESC;
+            SELECT location, COUNT(*) AS product_count, SUM(qty) AS qty
+            FROM LocationStock WHERE qty != 0
+            GROUP BY location ORDER BY location
+            """
+        ).fetchall())
+
+    def location_stock(self, location: str) -> List[sqlite3.Row]:
+        """Bir konumdaki ürünler: id, name, barcode, qty (birincil anahtar öneki ile okunur)"""
+        return self.conn.execute(
+            """
+            SELECT p.id, p.name, p.barcode, ls.qty
+            FROM LocationStock ls JOIN Product p ON p.id = ls.product_id
+            WHERE ls.location = ? AND ls.qty != 0
+            ORDER BY p.name
+            """,
+            (location,),
+        ).fetchall()
+
+    def product_locations(self, product_id: int) -> List[sqlite3.Row]:
+        """Ürünün konumlara dağılımı: location, qty"""
+        return self.conn.execute(
+            "SELECT location, qty FROM LocationStock"
+            " WHERE product_id = ? AND qty != 0 ORDER BY location",
+            (product_id,),
+        ).fetchall()
+
+    # ---------- Stok sayımı -------------------------------------------
+    def _stock_count_sql(self, counts: dict, full: bool) -> str:
+        """
+        Sayımı geçici tabloya yükler ve fark sorgusunu döndürür.
+        Sütunlar: product_id, name, barcode, on_hand, counted, diff
+        """
+        self.conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS StockCount"
+            " (barcode TEXT PRIMARY KEY, counted INTEGER NOT NULL)"
+        )
+        self.conn.execute("DELETE FROM temp.StockCount")
+        self.conn.executemany(
+            "INSERT INTO temp.StockCount(barcode, counted) VALUES (?,?)",
+            [(str(code), int(qty)) for code, qty in counts.items()],
+        )
+        sql = """
+            SELECT p.id AS product_id, p.name, t.barcode,
+                   COALESCE(sl.qty, 0) AS on_hand, t.counted,
+                   t.counted - COALESCE(sl.qty, 0) AS diff
+            FROM temp.StockCount t
+            LEFT JOIN Product p ON p.barcode = t.barcode
+            LEFT JOIN StockLevel sl ON sl.product_id = p.id
+        """
+        if full:
+            # Tam sayım: okutulmayan ürünlerin sayımı 0 kabul edilir
+            sql += """
+            UNION ALL
+            SELECT p.id, p.name, p.barcode, sl.qty, 0, -sl.qty
+            FROM Product p JOIN StockLevel sl ON sl.product_id = p.id
+            WHERE sl.qty != 0
+              AND (p.barcode IS NULL
+                   OR p.barcode NOT IN (SELECT barcode FROM temp.StockCount))
             """
-        )                         # sorgu örnekleri :contentReference[oaicite:1]{index=1}
-        return cur.fetchall()
+        return sql
+
+    def preview_stock_count(self, counts: dict, full: bool = False) -> List[sqlite3.Row]:
+        """
+        Sayımı mevcut stokla karşılaştırır (veritabanına yazmaz).
+
+        Args:
+            counts: barkod → sayılan miktar
+            full: True ise sayılmayan ürünler 0 kabul edilir
+
+        Returns:
+            List[sqlite3.Row]: Farklı çıkan ve kayıtsız (product_id NULL) satırlar
+        """
+        sql = self._stock_count_sql(counts, full)
+        rows = self.conn.execute(
+            f"SELECT * FROM ({sql}) WHERE diff != 0 OR product_id IS NULL"
+            " ORDER BY product_id IS NOT NULL, ABS(diff) DESC"
+        ).fetchall()
+        self.conn.commit()
+        return rows
+
+    @_serialized
+    def apply_stock_count(self, counts: dict, session_id: str,
+                          full: bool = False) -> int:
+        """
+        Sayım farklarını tek bir işlemde ADJUST hareketi olarak yazar.
+
+        Farklar tek bir küme tabanlı sorguyla hesaplanır; her hareketin op_key'i
+        oturum ve ürün kimliğinden oluşur, böylece aynı oturum iki kez
+        onaylansa da fark bir kez yazılır. Yalnızca op_key çakışması atlanır;
+        diğer kısıt ihlalleri hata verir.
+
+        Returns:
+            int: Yazılan düzeltme hareketi sayısı
+        """
+        try:
+            sql = self._stock_count_sql(counts, full)
+            cur = self.conn.execute(
+                f"""
+                INSERT INTO StockMovement(product_id, change, reason, op_key)
+                SELECT product_id, diff, 'ADJUST', ? || product_id
+                FROM ({sql})
+                WHERE product_id IS NOT NULL AND diff != 0
+                ON CONFLICT(op_key) WHERE op_key IS NOT NULL DO NOTHING
+                """,
+                (f"{valuation.COUNT_KEY_PREFIX}{session_id}:",),
+            )
+            self.conn.commit()
+            return cur.rowcount
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    # ---------- Kritik stok --------------------------------------------
+    @_serialized
+    def set_reorder_point(self, product_id: int, level: int) -> bool:
+        """Ürünün kritik stok seviyesini ayarlar"""
+        cur = self.conn.execute(
+            "UPDATE Product SET reorder_point = ? WHERE id = ?",
+            (int(level), product_id),
+        )
+        self.conn.commit()
+        self.catalog.product_changed(product_id)
+        return cur.rowcount > 0
+
+    def low_stock_products(self) -> List[sqlite3.Row]:
+        """
+        Stoğu kritik seviyesinde veya altında olan ürünler (en acil önce).
+        Kısmi indeks sayesinde yalnızca bu küme okunur; katalog taranmaz.
+        """
+        return self.report_cache.cached("low_stock", lambda: self.conn.execute(
+            """
+            SELECT p.id, p.name, p.barcode, p.location,
+                   sl.qty, sl.reorder_point,
+                   sl.reorder_point - sl.qty AS shortage
+            FROM StockLevel sl INDEXED BY idx_stocklevel_low
+            JOIN Product p ON p.id = sl.product_id
+            WHERE sl.qty <= sl.reorder_point
+            ORDER BY shortage DESC, p.name
+            """
+        ).fetchall())
+
+    # ---------- Satış fişleri -----------------------------------------
+    @_serialized
+    def record_sale(self, lines: List[dict], op_key: Optional[str] = None,
+                    created_at: Optional[str] = None, day: Optional[str] = None) -> int:
+        """
+        Tamamlanan satışı fiş başlığı, satırları ve satırların SALE stok
+        hareketleriyle tek bir işlemde yazar. Sepet okutmaları veritabanına
+        yazılmaz; yarıda bırakılan ya da çöken bir sepet ne stok ne ciro bırakır,
+        hareketler ile fişler her zaman birbirini tutar.
+
+        Args:
+            lines: product_id, name, qty, unit_price alanlı sözlükler
+            op_key: Tekillik anahtarı; aynı anahtarla ikinci kayıt yazılmaz
+                (kasa günlüğü aynı fişi tekrar gönderebilir). Hareketler
+                "<op_key>:<satır no>" anahtarını taşır.
+            created_at: Satışın gerçek zamanı (günlükten gelen fişler için)
+            day: Satış günü (YYYY-MM-DD, yerel saat); verilmezse bugün
+
+        Returns:
+            int: Fiş numarası
+        """
+        day = day or date.today().isoformat()
+        total = round(sum(line["qty"] * line["unit_price"] for line in lines), 2)
+        count = sum(line["qty"] for line in lines)
+        cur = self.conn.cursor()
+        try:
+            cur.execute(
+                "INSERT OR IGNORE INTO Sale(op_key, day, created_at, item_count, total)"
+                " VALUES (?,?,COALESCE(?, CURRENT_TIMESTAMP),?,?)",
+                (op_key, day, created_at, count, total),
+            )
+            if not cur.rowcount:
+                # Bu fiş daha önce yazılmış
+                sale_id = cur.execute(
+                    "SELECT id FROM Sale WHERE op_key = ?", (op_key,)
+                ).fetchone()[0]
+                self.conn.commit()
+                return sale_id
+            sale_id = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO SaleLine(sale_id, product_id, name, qty, unit_price, line_total, day)"
+                " VALUES (?,?,?,?,?,?,?)",
+                [(sale_id, line["product_id"], line["name"], line["qty"], line["unit_price"],
+                  round(line["qty"] * line["unit_price"], 2), day)
+                 for line in lines],
+            )
+            created_at = cur.execute(
+                "SELECT created_at FROM Sale WHERE id = ?", (sale_id,)).fetchone()[0]
+            cur.executemany(
+                "INSERT INTO StockMovement(op_key, product_id, change, reason, ts)"
+                " VALUES (?,?,?,'SALE',COALESCE(CAST(strftime('%s', ?) AS INTEGER),"
+                " CAST(strftime('%s', 'now') AS INTEGER)))",
+                [(f"{op_key}:{i}" if op_key else None, line["product_id"], -line["qty"],
+                  created_at)
+                 for i, line in enumerate(lines)],
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return sale_id
+
+    def get_sale(self, sale_id: int) -> Optional[sqlite3.Row]:
+        """Fiş başlığı: id, source, day, created_at, item_count, total"""
+        return self.conn.execute(
+            "SELECT id, source, day, created_at, item_count, total FROM Sale WHERE id = ?",
+            (sale_id,),
+        ).fetchone()
+
+    def get_sale_lines(self, sale_id: int) -> List[sqlite3.Row]:
+        """Fiş satırları: product_id, name, qty, unit_price, line_total"""
+        return self.conn.execute(
+            "SELECT product_id, name, qty, unit_price, line_total FROM SaleLine"
+            " WHERE sale_id = ? ORDER BY id",
+            (sale_id,),
+        ).fetchall()
+
+    def recent_sales(self, limit: int = 50) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT id, source, day, created_at, item_count, total FROM Sale"
+            " ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+    def revenue_by_period(self, start: str, end: str,
+                          period: str = "day") -> List[sqlite3.Row]:
+        """
+        `start`–`end` arasındaki ciroyu güne veya aya göre toplar.
+        Sütunlar: period, receipts, items, revenue
+        """
+        if period not in ("day", "month"):
+            raise ValueError("period 'day' veya 'month' olmalı")
+        key = "day" if period == "day" else "substr(day, 1, 7)"
+        return self.conn.execute(
+            f"""
+            SELECT {key} AS period, COUNT(*) AS receipts,
+                   SUM(item_count) AS items, ROUND(SUM(total), 2) AS revenue
+            FROM Sale WHERE day BETWEEN DATE(?) AND DATE(?)
+            GROUP BY {key} ORDER BY period
+            """,
+            (start, end),
+        ).fetchall()
+
+    def basket_pairs(self, start: str, end: str, limit: int = 20) -> List[sqlite3.Row]:
+        """
+        Aynı fişte en sık birlikte satılan ürün çiftleri.
+        Sütunlar: product_a, name_a, product_b, name_b, receipts
+        """
+        return self.conn.execute(
+            """
+            SELECT a.product_id AS product_a, MAX(a.name) AS name_a,
+                   b.product_id AS product_b, MAX(b.name) AS name_b,
+                   COUNT(*) AS receipts
+            FROM Sale s
+            JOIN SaleLine a ON a.sale_id = s.id
+            JOIN SaleLine b ON b.sale_id = s.id AND b.product_id > a.product_id
+            WHERE s.day BETWEEN DATE(?) AND DATE(?) AND s.source = 'till'
+            GROUP BY a.product_id, b.product_id
+            ORDER BY receipts DESC, a.product_id, b.product_id
+            LIMIT ?
+            """,
+            (start, end, limit),
+        ).fetchall()
+
+    # ---------- Günlük satış raporu ----------------------------------
+    def daily_sales_report(self) -> List[Tuple[Any, ...]]:
+        """Bugünün satışları: name, sold_qty, revenue (satış anındaki fiyatlarla)"""
+        today = date.today().isoformat()
+        return self.sales_report(today, today)
+
+    # ---------- Dönem raporu ------------------------------------------
+    def sales_report(self, start: str, end: str) -> List[sqlite3.Row]:
+        """
+        `start`–`end` (YYYY-MM-DD, her ikisi dahil) arasındaki satışları ürün
+        bazında toplar. Sütunlar: name, sold_qty, revenue. Fiş satırlarındaki
+        fiyatlar kullanılır; ürün adı dönemdeki en son satıştaki addır.
+        Sonuç artımlıdır: tekrar çağrıldığında yalnızca yeni fiş satırları okunur.
+        """
+        return self.report_cache.sales_report(start, end)
+
+    # ---------- Stok değerleme ----------------------------------------
+    @_serialized
+    def _sync_valuation(self) -> None:
+        # Salt okunur bağlantılar (rapor işçileri) son işlenen duruma göre cevaplar
+        if not self.read_only:
+            self.valuation.sync()
+
+    def stock_value(self) -> dict:
+        """Toplam stok değeri: {"fifo": ..., "average": ...}"""
+        self._sync_valuation()
+        return self.valuation.stock_value()
+
+    def stock_valuation(self) -> List[sqlite3.Row]:
+        """Ürün bazında stok değeri (id, name, qty, avg_cost, fifo_value, avg_value)"""
+        self._sync_valuation()
+        return self.valuation.product_values()
+
+    def cogs_report(self, start: str, end: str) -> List[sqlite3.Row]:
+        """
+        `start`–`end` (YYYY-MM-DD, her ikisi dahil) dönemi için satılan malın
+        maliyeti. Sütunlar: id, name, qty, cogs_fifo, cogs_avg.
+        """
+        self._sync_valuation()
+        return self.valuation.cogs_report(start, end)
+
+    @_serialized
+    def rebuild_valuation(self) -> int:
+        """Değerlemeyi tüm hareketlerden yeniden kurar; işlenen hareket sayısını döndürür"""
+        return self.valuation.rebuild()
+
+    def verify_valuation(self) -> List[str]:
+        """Kayıtlı değerlemeyi hareketlerin baştan işlenmesiyle karşılaştırır"""
+        self._sync_valuation()
+        return self.valuation.verify()
+
+    # ---------- Satış hızı ve sipariş önerisi --------------------------
+    @_serialized
+    def _sync_daily_sales(self) -> None:
+        # Salt okunur bağlantılar son işlenen özete göre cevaplar
+        if not self.read_only:
+            self.sales_rollup.sync()
+
+    def daily_sales_since(self, day: str) -> List[sqlite3.Row]:
+        """
+        `day` (YYYY-MM-DD) ve sonrasının günlük satış özeti: product_id, day,
+        qty, revenue. Önce yeni hareketler özete işlenir (bkz. forecasting.py).
+        """
+        self._sync_daily_sales()
+        return self.sales_rollup.since(day)
+
+    @_serialized
+    def rebuild_daily_sales(self) -> int:
+        """Günlük satış özetini mevcut hareketlerden yeniden kurar"""
+        count = self.sales_rollup.rebuild()
+        self.sales_ranking.rebuild()
+        return count
+
+    # ---------- En çok satanlar ----------------------------------------
+    @_serialized
+    def refresh_sales_ranking(self) -> int:
+        """Günlük özeti ve en çok satanlar sıralamasını bugüne getirir (bkz. rankings.py)"""
+        if self.read_only:
+            return 0   # Salt okunur bağlantılar son yazılan sıralamayı okur
+        self.sales_rollup.sync()
+        return self.sales_ranking.refresh()
+
+    def top_sellers(self, days: int = 30, by: str = "revenue",
+                    limit: int = 20) -> List[sqlite3.Row]:
+        """
+        Son `days` (7, 30 veya 90) tam günün en çok satan `limit` ürünü; `by`
+        "revenue" veya "qty". Satırlar: rank, product_id, name, barcode, qty,
+        revenue, share (kümülatif ciro payı), abc.
+        """
+        self.refresh_sales_ranking()
+        return self.sales_ranking.top(days, by, limit)
+
+    def abc_summary(self, days: int = 30) -> List[sqlite3.Row]:
+        """ABC sınıfı başına ürün sayısı, adet ve ciro (son `days` gün)"""
+        self.refresh_sales_ranking()
+        return self.sales_ranking.abc_summary(days)
+
+    # ---------- Geçmiş tarihli stok ------------------------------------
+    # Kontrol noktası C: ts < C olan ve id <= movement_id olan hareketlerin
+    # ürün bazında toplamı. Nokta yazıldıktan sonra geçmiş tarihle eklenen
+    # hareketler (kasa günlüğü, içe aktarma) id > movement_id koşuluyla bulunur.
+    @staticmethod
+    def _month_starts(after_ts: int, until_ts: int) -> List[int]:
+        """`after_ts`'den sonraki ve `until_ts`'ye kadarki yerel ay başları"""
+        d = datetime.fromtimestamp(after_ts)
+        year, month = d.year, d.month
+        starts = []
+        while True:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            ts = int(datetime(year, month, 1).timestamp())
+            if ts > until_ts:
+                return starts
+            starts.append(ts)
+
+    def _stock_as_of_sql(self, ts: int, checkpoint, product_id: Optional[int] = None):
+        """
+        `ts` anından önceki stok için (product_id, qty) satırları üreten sorgu
+        ve parametreleri. Toplam, product_id'ye göre gruplanarak alınır.
+        """
+        only = "" if product_id is None else " AND product_id = ?"
+        extra = [] if product_id is None else [product_id]
+        if checkpoint is None:
+            return (f"SELECT product_id, change AS qty FROM StockMovement WHERE ts < ?{only}",
+                    [ts] + extra)
+        cp_ts, cp_id = checkpoint["ts"], checkpoint["movement_id"]
+        # Son dal yalnızca noktadan sonra yazılan id aralığını okumalı; tekli +
+        # sütunların indekslerini devre dışı bırakır (aksi halde tüm geçmiş taranır)
+        sql = f"""
+            SELECT product_id, qty FROM CheckpointStock WHERE ts = ?{only}
+            UNION ALL
+            SELECT product_id, change FROM StockMovement WHERE ts >= ? AND ts < ?{only}
+            UNION ALL
+            SELECT product_id, change FROM StockMovement
+            WHERE id > ? AND +ts < ?{only.replace("product_id", "+product_id")}
+        """
+        return sql, [cp_ts] + extra + [cp_ts, ts] + extra + [cp_id, cp_ts] + extra
+
+    def _nearest_checkpoint(self, ts: int) -> Optional[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT ts, movement_id FROM StockCheckpoint WHERE ts <= ?"
+            " ORDER BY ts DESC LIMIT 1",
+            (ts,),
+        ).fetchone()
+
+    @_serialized
+    def ensure_checkpoints(self, until: Optional[int] = None) -> int:
+        """
+        Son kontrol noktasından (yoksa ilk hareketten) bu yana geçen her ay başı
+        için kontrol noktası yazar. Her nokta bir öncekinden artımlı hesaplanır.
+
+        Returns:
+            int: Yazılan kontrol noktası sayısı
+        """
+        if self.read_only:
+            return 0
+        until = int(datetime.now().timestamp()) if until is None else int(until)
+        last = self.conn.execute(
+            "SELECT ts, movement_id FROM StockCheckpoint ORDER BY ts DESC LIMIT 1"
+        ).fetchone()
+        start = last["ts"] if last else self.conn.execute(
+            "SELECT MIN(ts) FROM StockMovement").fetchone()[0]
+        if start is None:
+            return 0
+        boundaries = self._month_starts(start, until)
+        if not boundaries:
+            return 0
+        cur = self.conn.cursor()
+        self.conn.commit()
+        cur.execute("BEGIN IMMEDIATE")  # movement_id okunduktan sonra araya hareket girmesin
+        try:
+            movement_id = cur.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM StockMovement").fetchone()[0]
+            previous = last
+            for ts in boundaries:
+                sql, params = self._stock_as_of_sql(ts, previous)
+                cur.execute(
+                    "INSERT INTO CheckpointStock(ts, product_id, qty)"
+                    f" SELECT ?, product_id, SUM(qty) FROM ({sql})"
+                    " GROUP BY product_id HAVING SUM(qty) != 0",
+                    [ts] + params,
+                )
+                cur.execute(
+                    "INSERT INTO StockCheckpoint(ts, movement_id) VALUES (?,?)",
+                    (ts, movement_id),
+                )
+                previous = {"ts": ts, "movement_id": movement_id}
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return len(boundaries)
+
+    @_serialized
+    def clear_checkpoints(self) -> None:
+        """Kontrol noktalarını siler (sonraki sorguda yeniden yazılırlar)"""
+        self.conn.execute("DELETE FROM CheckpointStock")
+        self.conn.execute("DELETE FROM StockCheckpoint")
+        self.conn.commit()
+
+    def product_stock_as_of(self, product_id: int, ts: int) -> int:
+        """Ürünün `ts` (epoch saniyesi) anındaki stoğu; o andaki hareketler hariç"""
+        self.ensure_checkpoints()
+        sql, params = self._stock_as_of_sql(int(ts), self._nearest_checkpoint(int(ts)), product_id)
+        return self.conn.execute(
+            f"SELECT COALESCE(SUM(qty), 0) FROM ({sql})", params
+        ).fetchone()[0]
+
+    def stock_as_of(self, ts: int) -> List[sqlite3.Row]:
+        """
+        Tüm kataloğun `ts` (epoch saniyesi) anındaki stoğu: product_id, name,
+        barcode, location, qty. O anda stoğu olan veya o tarihte kayıtlı olan
+        ürünler listelenir. Ay sonu için bir sonraki ayın ilk anı verilir.
+        """
+        ts = int(ts)
+        self.ensure_checkpoints()
+        sql, params = self._stock_as_of_sql(ts, self._nearest_checkpoint(ts))
+        return self.conn.execute(
+            f"""
+            SELECT p.id AS product_id, p.name, p.barcode, p.location,
+                   COALESCE(s.qty, 0) AS qty
+            FROM Product p
+            LEFT JOIN (SELECT product_id, SUM(qty) AS qty FROM ({sql})
+                       GROUP BY product_id) s ON s.product_id = p.id
+            WHERE s.qty != 0
+               OR COALESCE(CAST(strftime('%s', p.created_at) AS INTEGER), 0) < ?
+            ORDER BY p.name
+            """,
+            params + [ts],
+        ).fetchall()
 
     # ---------- Fiyat Takibi -----------------------------------------
-    def get_product_price_history(self, product_id: int) -> List[sqlite3.Row]:
+    def get_product_price_history(self, product_id: int, limit: Optional[int] = None,
+                                  offset: int = 0) -> List[sqlite3.Row]:
         """
-        Bir ürünün fiyat geçmişini getirir.
+        Bir ürünün fiyat geçmişini getirir (yeniden eskiye).
         Sadece alış hareketlerindeki (PURCHASE) fiyat değişimlerini içerir.
+        `ts` epoch saniyesidir; `timestamp` eski çağıranlar için UTC metnidir.
+        `limit`/`offset` verilirse yalnızca o sayfa okunur (tablonun tembel yüklemesi).
         """
         return self.conn.execute(
             """
             SELECT 
-                sm.timestamp,
+                sm.ts,
+                DATETIME(sm.ts, 'unixepoch') AS timestamp,
                 sm.purchase_price,
                 p.name as product_name
             FROM StockMovement sm
@@ -214,7 +1431,114 @@ class DatabaseManager:
             WHERE sm.product_id = ? 
               AND sm.reason = 'PURCHASE'
               AND sm.purchase_price IS NOT NULL
-            ORDER BY sm.timestamp DESC
+            ORDER BY sm.ts DESC, sm.id DESC
+            LIMIT ? OFFSET ?
+            """,
+            (product_id, -1 if limit is None else limit, offset)
+        ).fetchall()
+
+    def price_history_points(self, product_id: int, buckets: int = 400) -> List[sqlite3.Row]:
+        """
+        Grafik için alış fiyatı noktaları (ts, purchase_price), eskiden yeniye.
+        Geçmiş ne kadar uzun olursa olsun en fazla 2 × `buckets` satır döner:
+        zaman aralığı eşit kovalara bölünür ve her kovadan yalnızca en düşük ve
+        en yüksek fiyatlı alış alınır (ani sıçramalar kaybolmaz). Kovalama
+        SQLite içinde, örten alış indeksi üzerinde yapılır.
+        """
+        return self.conn.execute(
+            """
+            WITH purchase AS (
+                SELECT id, ts, purchase_price FROM StockMovement
+                WHERE product_id = :pid AND reason = 'PURCHASE'
+                  AND purchase_price IS NOT NULL
+            ),
+            span AS (SELECT MIN(ts) AS t0, MAX(ts) - MIN(ts) + 1 AS width FROM purchase),
+            ranked AS (
+                SELECT p.ts, p.purchase_price,
+                       ROW_NUMBER() OVER (PARTITION BY b ORDER BY p.purchase_price, p.id) AS low,
+                       ROW_NUMBER() OVER (PARTITION BY b ORDER BY p.purchase_price DESC, p.id) AS high
+                FROM (SELECT purchase.*, (ts - t0) * :buckets / width AS b
+                      FROM purchase, span) p
+            )
+            SELECT ts, purchase_price FROM ranked
+            WHERE low = 1 OR high = 1
+            ORDER BY ts
+            """,
+            {"pid": product_id, "buckets": int(buckets)}
+        ).fetchall()
+
+    def purchase_price_series(self, since: int, until: int) -> List[sqlite3.Row]:
+        """
+        Tüm ürünlerin [since, until) dönemindeki alış fiyatları ve her ürünün
+        dönemden önceki son alışı (product_id, ts, purchase_price), ürün ve
+        zamana göre sıralı. Katalog genelindeki analiz için tek sorgu; eski
+        alışlar SQLite içinde ürün başına tek satıra indirilir (bkz. price_analytics.py).
+        """
+        return self.conn.execute(
+            """
+            SELECT product_id, MAX(ts) AS ts, purchase_price FROM StockMovement
+            WHERE reason = 'PURCHASE' AND purchase_price IS NOT NULL AND ts < :since
+            GROUP BY product_id
+            UNION ALL
+            SELECT product_id, ts, purchase_price FROM StockMovement
+            WHERE reason = 'PURCHASE' AND purchase_price IS NOT NULL
+              AND ts >= :since AND ts < :until
+            ORDER BY product_id, ts
+            """,
+            {"since": int(since), "until": int(until)}
+        ).fetchall()
+
+    # Zamandaki fiyat: ts anında geçerli son değişiklik; ts ilk kayıttan önceyse
+    # bilinen ilk fiyat. İki alt sorgu da PriceChange birincil anahtarında aramadır
+    _PRICE_AT_SQL = """
+        COALESCE(
+            (SELECT pc.price FROM PriceChange pc
+             WHERE pc.product_id = {pid} AND pc.effective_from <= {ts}
+             ORDER BY pc.effective_from DESC LIMIT 1),
+            (SELECT pc.price FROM PriceChange pc
+             WHERE pc.product_id = {pid}
+             ORDER BY pc.effective_from LIMIT 1))
+    """
+
+    def price_at(self, product_id: int, ts: int) -> Optional[float]:
+        """
+        Ürünün `ts` (epoch saniyesi) anındaki birim fiyatı.
+        Günlükte hiç kaydı olmayan ürün için None döner.
+        """
+        sql = self._PRICE_AT_SQL.format(pid="?", ts="?")
+        return self.conn.execute(
+            f"SELECT {sql}", (product_id, int(ts), product_id)
+        ).fetchone()[0]
+
+    def prices_at(self, lookups: Iterable[Tuple[int, int]]) -> List[Optional[float]]:
+        """
+        Toplu price_at: (product_id, ts) çiftleri geçici tabloya yüklenir ve
+        tek sorguda fiyatlanır. Sonuç girdiyle aynı sıradadır.
+        """
+        self.conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS PriceLookup"
+            " (seq INTEGER PRIMARY KEY, product_id INTEGER, ts INTEGER)"
+        )
+        self.conn.execute("DELETE FROM temp.PriceLookup")
+        self.conn.executemany(
+            "INSERT INTO temp.PriceLookup(seq, product_id, ts) VALUES (?,?,?)",
+            [(seq, pid, int(ts)) for seq, (pid, ts) in enumerate(lookups)],
+        )
+        sql = self._PRICE_AT_SQL.format(pid="l.product_id", ts="l.ts")
+        rows = self.conn.execute(
+            f"SELECT {sql} FROM temp.PriceLookup l ORDER BY l.seq"
+        ).fetchall()
+        self.conn.execute("DELETE FROM temp.PriceLookup")
+        self.conn.commit()
+        return [row[0] for row in rows]
+
+    def get_price_changes(self, product_id: int) -> List[sqlite3.Row]:
+        """Birim fiyat değişim günlüğü (yeniden eskiye): effective_from, timestamp, price"""
+        return self.conn.execute(
+            """
+            SELECT effective_from, DATETIME(effective_from, 'unixepoch') AS timestamp, price
+            FROM PriceChange WHERE product_id = ?
+            ORDER BY effective_from DESC
             """,
             (product_id,)
         ).fetchall()
@@ -239,7 +1563,267 @@ class DatabaseManager:
             (query, query)
         ).fetchall()
 
+    # ---------- Mağazalar arası eşitleme --------------------------------
+    def store_id(self) -> str:
+        """Bu veritabanının kalıcı mağaza kimliği"""
+        return self.replication.store_id()
+
+    def sync_cursor(self, peer_id: str) -> int:
+        """`peer_id` mağazasından alınıp uygulanan son günlük sıra numarası"""
+        return self.replication.received_seq(peer_id)
+
+    def sync_peers(self) -> List[sqlite3.Row]:
+        """Eşitlenen mağazalar: peer_id, received_seq, sent_seq, synced_at, pending"""
+        return self.replication.peers()
+
+    def export_changes(self, since: int, exclude_origin: Optional[str] = None,
+                       limit: int = replication.BATCH_SIZE) -> dict:
+        """`since` sıra numarasından sonraki değişiklik partisi (bkz. replication.py)"""
+        return self.replication.export_changes(since, exclude_origin, limit)
+
+    @_serialized
+    def apply_changes(self, batch: dict) -> dict:
+        """Diğer mağazanın değişiklik partisini tek işlemde, idempotent olarak uygular"""
+        return self.replication.apply_changes(batch)
+
+    @_serialized
+    def mark_sent(self, peer_id: str, seq: int) -> None:
+        """`peer_id` mağazasına `seq`'e kadar olan kayıtların iletildiğini kaydeder"""
+        self.replication.mark_sent(peer_id, seq)
+
+    # ---------- Toplu içe aktarma ---------------------------------------
+    @_serialized
+    def import_products(self, rows, update_existing: bool = False) -> Tuple[int, int]:
+        """
+        Ürün kataloğunu tek bir işlemde içe aktarır.
+
+        Args:
+            rows: name, barcode, location, unit_price ve isteğe bağlı quantity
+                alanlı sözlükler (ör. csv.DictReader)
+            update_existing: Barkodu kayıtlı ürünlerin ad/konum/fiyatı güncellensin mi
+
+        Returns:
+            (eklenen, güncellenen) ürün sayıları
+        """
+        inserted = updated = 0
+        cur = self.conn.cursor()
+        try:
+            for row in rows:
+                name = (row.get("name") or "").strip()
+                if not name:
+                    continue
+                barcode = (row.get("barcode") or "").strip() or None
+                location = (row.get("location") or "").strip()
+                price = float(row.get("unit_price") or 0)
+                qty = int(float(row.get("quantity") or 0))
+
+                existing = None
+                if barcode:
+                    existing = cur.execute(
+                        "SELECT id FROM Product WHERE barcode=?", (barcode,)
+                    ).fetchone()
+                if existing:
+                    product_id = existing["id"]
+                    if update_existing:
+                        cur.execute(
+                            "UPDATE Product SET name=?, location=?, unit_price=? WHERE id=?",
+                            (name, location, price, product_id),
+                        )
+                        updated += 1
+                else:
+                    cur.execute(
+                        "INSERT INTO Product(name, barcode, location, unit_price, initial_price)"
+                        " VALUES (?,?,?,?,?)",
+                        (name, barcode, location, price, price),
+                    )
+                    product_id = cur.lastrowid
+                    inserted += 1
+                if qty:
+                    cur.execute(
+                        "INSERT INTO StockMovement(product_id, change, reason, purchase_price)"
+                        " VALUES (?,?,?,?)",
+                        (product_id, qty, "PURCHASE", price),
+                    )
+            self.conn.commit()
+        except (sqlite3.Error, ValueError):
+            self.conn.rollback()
+            raise
+        if inserted or updated:
+            self.catalog.invalidate()
+        return inserted, updated
+
+    # ---------- Bakım ---------------------------------------------------
+    def backup(self, dest: Path) -> Path:
+        """Çalışan veritabanının tutarlı bir kopyasını `dest` dosyasına alır."""
+        dest = Path(dest)
+        target = sqlite3.connect(dest)
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+        return dest
+
+    @_serialized
+    def archive_movements(self, before: str, archive_path: Path) -> int:
+        """
+        `before` (YYYY-MM-DD) tarihinden eski SALE/ADJUST hareketlerini arşiv
+        veritabanına taşır. Stok toplamları bozulmasın diye her ürün için
+        arşivlenen miktar kadar tek bir açılış (ADJUST) hareketi yazılır.
+        Alış (PURCHASE) hareketleri fiyat geçmişi için yerinde kalır.
+
+        Returns:
+            int: Arşive taşınan hareket sayısı
+        """
+        cur = self.conn.cursor()
+        self.conn.commit()  # ATTACH açık bir işlem içinde yapılamaz
+        cur.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+        try:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS archive.StockMovement (
+                    id             INTEGER PRIMARY KEY,
+                    product_id     INTEGER,
+                    change         INTEGER,
+                    reason         TEXT,
+                    purchase_price REAL,
+                    timestamp      TEXT,
+                    op_key         TEXT,
+                    location       TEXT
+                )
+                """
+            )
+            try:
+                cur.execute("SELECT location FROM archive.StockMovement LIMIT 1")
+            except sqlite3.OperationalError:
+                cur.execute("ALTER TABLE archive.StockMovement ADD COLUMN location TEXT")
+            cutoff = ("WHERE reason IN ('SALE','ADJUST')"
+                      " AND ts < CAST(strftime('%s', DATE(?)) AS INTEGER) AND id <= ?")
+            cur.execute("BEGIN IMMEDIATE")  # last_id okunduktan sonra araya hareket girmesin
+            last_id = cur.execute(
+                "SELECT COALESCE(MAX(id),0) FROM StockMovement"
+            ).fetchone()[0]
+            cur.execute(
+                "INSERT OR IGNORE INTO archive.StockMovement"
+                "(id, product_id, change, reason, purchase_price, timestamp, op_key, location)"
+                " SELECT id, product_id, change, reason, purchase_price,"
+                " DATETIME(ts, 'unixepoch'), op_key,"
+                f" location FROM main.StockMovement {cutoff}",
+                (before, last_id),
+            )
+            archived = cur.rowcount
+            # Arşivlenecek hareketler değerlemeye ve günlük satış özetine işlenmiş olsun
+            self.valuation.sync(upto=last_id, commit=False)
+            self.sales_rollup.sync(upto=last_id, commit=False)
+            # Açılış hareketleri yalnızca bu veritabanının özetidir: diğer mağazaya
+            # gönderilmez (orada silinen hareketler hâlâ duruyor)
+            replication.suppress_log(cur)
+            cur.execute(
+                "INSERT INTO StockMovement(product_id, change, reason, ts, location)"
+                " SELECT product_id, SUM(change), 'ADJUST',"
+                " CAST(strftime('%s', DATE(?)) AS INTEGER) - 1,"
+                f" location FROM StockMovement {cutoff}"
+                " GROUP BY product_id, location HAVING SUM(change) != 0",
+                (before, before, last_id),
+            )
+            cur.execute(f"DELETE FROM main.StockMovement {cutoff}", (before, last_id))
+            replication.clear_context(cur)
+            # Açılış hareketleri yeni id'lerle geçmiş tarihe yazıldığından kontrol
+            # noktaları artık geçersiz; sonraki sorguda yeniden hesaplanırlar
+            cur.execute("DELETE FROM CheckpointStock")
+            cur.execute("DELETE FROM StockCheckpoint")
+            # Açılış hareketleri silinenlerin toplamıdır; değerlemeyi tekrar etkilemesin
+            new_last_id = cur.execute("SELECT COALESCE(MAX(id),0) FROM StockMovement").fetchone()[0]
+            if self.valuation.watermark() >= last_id:
+                self.valuation.set_watermark(new_last_id)
+                # Silinen hareketler artık yeniden oynatılamaz: yeniden kurma ve
+                # doğrulama bu andaki değerlemeden başlar
+                self.valuation.save_opening()
+            self.sales_rollup.set_watermark(new_last_id)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        finally:
+            cur.execute("DETACH DATABASE archive")
+        return archived
+
+    def integrity_report(self) -> List[str]:
+        """
+        Veritabanı ve uygulama düzeyinde tutarlılık kontrolleri yapar.
+
+        Returns:
+            List[str]: Bulunan sorunlar (boş liste = sorun yok)
+        """
+        problems = []
+        for row in self.conn.execute("PRAGMA integrity_check"):
+            if row[0] != "ok":
+                problems.append(f"integrity_check: {row[0]}")
+        for row in self.conn.execute("PRAGMA foreign_key_check"):
+            problems.append(f"foreign_key_check: {row[0]} satır {row[1]} → {row[2]}")
+        orphans = self.conn.execute(
+            "SELECT COUNT(*) FROM StockMovement"
+            " WHERE product_id NOT IN (SELECT id FROM Product)"
+        ).fetchone()[0]
+        if orphans:
+            problems.append(f"Ürünü silinmiş {orphans} stok hareketi var")
+        for row in self.conn.execute(
+            "SELECT p.id, p.name, SUM(sm.change) AS qty FROM StockMovement sm"
+            " JOIN Product p ON p.id = sm.product_id"
+            " GROUP BY p.id HAVING qty < 0"
+        ):
+            problems.append(f"Negatif stok: {row['name']} (id {row['id']}) = {row['qty']}")
+        drift = self.conn.execute(
+            """
+            SELECT COUNT(*) FROM Product p
+            LEFT JOIN StockLevel sl ON sl.product_id = p.id
+            WHERE COALESCE(sl.qty, -1) != COALESCE(
+                (SELECT SUM(change) FROM StockMovement WHERE product_id = p.id), 0)
+            """
+        ).fetchone()[0]
+        if drift:
+            problems.append(f"{drift} ürünün StockLevel değeri hareket toplamıyla uyuşmuyor")
+        location_drift = self.conn.execute(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT location, product_id FROM (
+                    SELECT location, product_id, change AS qty FROM StockMovement
+                    UNION ALL
+                    SELECT location, product_id, -qty FROM LocationStock
+                )
+                GROUP BY location, product_id HAVING SUM(qty) != 0
+            )
+            """
+        ).fetchone()[0]
+        if location_drift:
+            problems.append(
+                f"{location_drift} konum/ürün stoğu hareket toplamıyla uyuşmuyor")
+        return problems
+
+    # ---------- Bakım --------------------------------------------------
+    @_serialized
+    def run_maintenance(self, tasks: Optional[List[str]] = None,
+                        full: bool = False) -> List[dict]:
+        """Bakım görevlerini çalıştırır ve günlüğe yazar (bkz. maintenance.py)"""
+        return self.maintenance.run(tasks, full)
+
+    def maintenance_log(self, limit: int = 50) -> List[sqlite3.Row]:
+        """Son bakım kayıtları, yeniden eskiye"""
+        return self.maintenance.history(limit)
+
+    @_serialized
+    def rebuild_stock_levels(self) -> None:
+        """StockLevel ve LocationStock tablolarını hareketlerden yeniden kurar (onarım için)"""
+        cur = self.conn.cursor()
+        self._rebuild_stock_levels(cur)
+        self._rebuild_location_stock(cur)
+        self.conn.commit()
+
     # ---------- Kapat -------------------------------------------------
     def close(self):
-        self.conn.close()
+        """Tüm iş parçacıklarının bağlantılarını kapatır"""
+        with self._conn_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
@@ -0,0 +1,134 @@
+"""
+price_analytics.py
+Tüm katalog için alış fiyatı analizi (NumPy/pandas, vektörel).
+
+Dönemdeki PURCHASE fiyatları ve her ürünün dönem öncesi son alışı tek
+sorguyla (`purchase_price_series`) ürün ve zamana göre sıralı dizilere
+yüklenir; ürün başına ölçüler Python döngüsü olmadan dizi işlemleri ve
+gruplamayla hesaplanır:
+
+    base_price   : dönem öncesi son alış fiyatı (yoksa dönemin ilk alışı)
+    last_price   : dönem sonundaki son alış fiyatı
+    change_pct   : dönemdeki alış fiyatı değişimi (%)
+    volatility   : dönemdeki ardışık alışlar arası log değişimlerin standart
+                   sapması (%, en az iki değişim gerekir)
+    margin_pct   : güncel satış fiyatına (unit_price) göre brüt marj (%)
+    erosion_pts  : dönem başındaki marjdan kaybedilen puan (dönem başı
+                   satış fiyatı PriceChange günlüğünden, `prices_at`)
+
+Qt içe aktarmaz; `ReportTab`, rapor işçileri ve `cli.py price-analytics`
+aynı fonksiyonları kullanır. `db` yerel `DatabaseManager` veya servis
+istemcisi olabilir.
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Sıralama ölçütü → (sütun, büyükten küçüğe)
+SORT_KEYS = {
+    "increase": ("change_pct", False),
+    "volatility": ("volatility", False),
+    "erosion": ("erosion_pts", False),
+}
+
+COLUMNS = ["product_id", "name", "barcode", "purchases", "base_price", "last_price",
+           "change_pct", "volatility", "unit_price", "margin_pct", "erosion_pts"]
+
+# Dışa aktarımdaki sütun başlıkları
+EXPORT_COLUMNS = {
+    "name": "Ürün",
+    "barcode": "Barkod",
+    "purchases": "Alış Sayısı",
+    "base_price": "Önceki Alış",
+    "last_price": "Son Alış",
+    "change_pct": "Değişim %",
+    "volatility": "Oynaklık %",
+    "unit_price": "Satış Fiyatı",
+    "margin_pct": "Marj %",
+    "erosion_pts": "Marj Kaybı (puan)",
+}
+
+
+def _day_ts(day: str) -> int:
+    """YYYY-MM-DD gününün yerel saatle başlangıcı (epoch saniyesi)"""
+    return int(datetime.combine(date.fromisoformat(day), datetime.min.time()).timestamp())
+
+
+def price_metrics(db, start: str, end: str) -> pd.DataFrame:
+    """
+    `start`–`end` (YYYY-MM-DD, ikisi de dahil) dönemi için ürün başına alış
+    fiyatı ölçüleri. Dönemde en az bir alışı olan ürünleri döndürür; sütunlar
+    `COLUMNS`, tanımsız ölçüler NaN.
+    """
+    start_ts = _day_ts(start)
+    end_ts = _day_ts((date.fromisoformat(end) + timedelta(days=1)).isoformat())
+
+    series = pd.DataFrame([tuple(r) for r in db.purchase_price_series(start_ts, end_ts)],
+                          columns=["product_id", "ts", "price"])
+    if series.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    # Seri (product_id, ts) sıralı gelir: önceki satır aynı ürünse ardışık alıştır
+    pid = series["product_id"].to_numpy()
+    ts = series["ts"].to_numpy()
+    price = series["price"].to_numpy(dtype=float)
+    same = np.zeros(len(pid), dtype=bool)
+    same[1:] = pid[1:] == pid[:-1]
+    prev = np.roll(price, 1)
+    valid = same & (price > 0) & (prev > 0)
+    log_change = np.full(len(price), np.nan)
+    log_change[valid] = np.log(price[valid] / prev[valid])
+    in_period = ts >= start_ts
+    series["log_change"] = log_change
+    series["in_period"] = in_period
+
+    period = series[in_period].groupby("product_id", sort=False)
+    result = pd.DataFrame({
+        "purchases": period.size(),
+        "first_in_period": period["price"].first(),
+        "last_price": period["price"].last(),
+        # Dönemin ilk alışının önceki alışa göre değişimi de dönem içidir
+        "volatility": period["log_change"].std(ddof=1) * 100,
+    })
+    before = series[~in_period].groupby("product_id", sort=False)["price"].last()
+    result["base_price"] = before.reindex(result.index).fillna(result["first_in_period"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["change_pct"] = np.where(
+            result["base_price"] > 0,
+            (result["last_price"] / result["base_price"] - 1) * 100, np.nan)
+
+    # Ürün bilgisi ve marj: güncel satış fiyatı ile dönem başındaki satış fiyatı
+    products = pd.DataFrame(
+        [(r["id"], r["name"], r["barcode"], r["unit_price"]) for r in db.list_products()],
+        columns=["product_id", "name", "barcode", "unit_price"],
+    ).set_index("product_id")
+    result = result.join(products, how="inner")
+    sale_then = np.array(
+        db.prices_at([(int(p), start_ts) for p in result.index]), dtype=float)
+    sale_then = np.where(np.isnan(sale_then), result["unit_price"], sale_then)
+    unit_price = result["unit_price"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin_now = np.where(unit_price > 0,
+                              (1 - result["last_price"] / unit_price) * 100, np.nan)
+        margin_then = np.where(sale_then > 0,
+                               (1 - result["base_price"] / sale_then) * 100, np.nan)
+    result["margin_pct"] = margin_now
+    result["erosion_pts"] = margin_then - margin_now
+
+    return result.reset_index()[COLUMNS]
+
+
+def rank(metrics: pd.DataFrame, by: str = "increase", limit: int | None = None) -> pd.DataFrame:
+    """Ölçüleri `SORT_KEYS` ölçütüne göre sıralar (NaN'lar sonda)"""
+    column, ascending = SORT_KEYS[by]
+    ranked = metrics.sort_values(column, ascending=ascending, na_position="last", kind="stable")
+    return ranked.head(limit) if limit else ranked
+
+
+def price_analytics_rows(db, start: str, end: str, by: str = "increase",
+                         limit: int | None = None) -> list:
+    """Tablo ve CLI için düz satırlar (`COLUMNS` sırasıyla, NaN → None)"""
+    ranked = rank(price_metrics(db, start, end), by, limit).astype(object)
+    return [tuple(row) for row in ranked.where(ranked.notna(), None).to_numpy().tolist()]
@@ -0,0 +1,141 @@
+"""
+price_chart.py
+Alış fiyatı geçmişi için hafif çizgi grafik (QPainter, ek bağımlılık yok).
+
+Grafik veriyi `DatabaseManager.price_history_points` ile alır (en fazla
+2 × kova sayısı nokta) ve çizmeden önce `downsample.lttb` ile widget
+genişliğinin yarısı kadar noktaya indirir. Çizilen nokta sayısı bu yüzden
+geçmişin uzunluğundan bağımsızdır. Güncel satış fiyatı kesikli çizgiyle
+gösterilir.
+"""
+
+from datetime import datetime
+
+import numpy as np
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+from downsample import lttb
+
+MARKER_LIMIT = 60   # Bundan az noktada her alış ayrıca işaretlenir
+
+
+class PriceChart(QWidget):
+    """Zaman – fiyat çizgi grafiği"""
+
+    MARGIN_LEFT = 64
+    MARGIN_RIGHT = 16
+    MARGIN_TOP = 12
+    MARGIN_BOTTOM = 28
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(200)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.ts = np.empty(0)
+        self.prices = np.empty(0)
+        self.reference = None           # Güncel satış fiyatı (kesikli çizgi)
+        self.message = "Fiyat geçmişi yok"
+        self._drawn = None              # (genişlik, ts, fiyat) — LTTB önbelleği
+
+    def set_series(self, points, reference=None) -> None:
+        """
+        Args:
+            points: (ts, fiyat) satırları, eskiden yeniye
+            reference: Yatay referans çizgisi olarak gösterilecek fiyat
+        """
+        if points:
+            ts, prices = zip(*[(row[0], row[1]) for row in points])
+            self.ts = np.array(ts, dtype=float)
+            self.prices = np.array(prices, dtype=float)
+        else:
+            self.ts, self.prices = np.empty(0), np.empty(0)
+        self.reference = reference
+        self._drawn = None
+        self.update()
+
+    def clear(self, message: str = "Fiyat geçmişi yok") -> None:
+        self.message = message
+        self.set_series([])
+
+    def visible_points(self, width: int):
+        """Çizim alanının genişliğine göre seyreltilmiş seri (genişlik başına önbellekli)"""
+        if self._drawn is None or self._drawn[0] != width:
+            target = max(3, width // 2)
+            self._drawn = (width, *lttb(self.ts, self.prices, target))
+        return self._drawn[1], self._drawn[2]
+
+    # ---------- Çizim ---------------------------------------------------
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), self.palette().base())
+        plot = QRectF(self.MARGIN_LEFT, self.MARGIN_TOP,
+                      self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT,
+                      self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM)
+        text_color = self.palette().text().color()
+
+        if not len(self.ts) or plot.width() <= 0 or plot.height() <= 0:
+            painter.setPen(text_color)
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.message)
+            return
+
+        ts, prices = self.visible_points(int(plot.width()))
+        t0, t1 = ts[0], ts[-1]
+        values = prices if self.reference is None else np.append(prices, self.reference)
+        low, high = float(values.min()), float(values.max())
+        pad = (high - low) * 0.05 or max(abs(high) * 0.05, 1.0)
+        low, high = low - pad, high + pad
+
+        def to_x(t):
+            return plot.left() + (t - t0) / (t1 - t0) * plot.width() if t1 > t0 else plot.center().x()
+
+        def to_y(price):
+            return plot.bottom() - (price - low) / (high - low) * plot.height()
+
+        # Eksenler ve ızgara: üç fiyat seviyesi, baş / orta / son tarih
+        grid = QColor(text_color)
+        grid.setAlpha(40)
+        for i in range(3):
+            price = low + (high - low) * (i + 0.5) / 3
+            y = to_y(price)
+            painter.setPen(QPen(grid))
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(text_color)
+            painter.drawText(QRectF(0, y - 8, self.MARGIN_LEFT - 6, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                             f"{price:.2f}")
+        for fraction, align in ((0.0, Qt.AlignmentFlag.AlignLeft),
+                                (0.5, Qt.AlignmentFlag.AlignHCenter),
+                                (1.0, Qt.AlignmentFlag.AlignRight)):
+            label = datetime.fromtimestamp(t0 + (t1 - t0) * fraction).strftime("%d.%m.%Y")
+            x = plot.left() + plot.width() * fraction
+            box = QRectF(x - 40 if fraction else x, plot.bottom() + 6, 80, 16)
+            if fraction == 1.0:
+                box.moveRight(x)
+            painter.drawText(box, align, label)
+        painter.setPen(QPen(text_color))
+        painter.drawRect(plot)
+
+        # Güncel satış fiyatı
+        if self.reference is not None:
+            pen = QPen(QColor(Qt.GlobalColor.darkGreen))
+            pen.setStyle(Qt.PenStyle.DashLine)
+            painter.setPen(pen)
+            y = to_y(self.reference)
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+
+        # Fiyat çizgisi: alış fiyatı bir sonraki alışa kadar geçerlidir (basamak)
+        line = QPolygonF()
+        for i, (t, price) in enumerate(zip(ts, prices)):
+            point = QPointF(to_x(t), to_y(price))
+            if i:
+                line.append(QPointF(point.x(), line.last().y()))
+            line.append(point)
+        painter.setPen(QPen(self.palette().highlight().color(), 2))
+        painter.drawPolyline(line)
+        if len(ts) <= MARKER_LIMIT:
+            painter.setBrush(self.palette().highlight())
+            for t, price in zip(ts, prices):
+                painter.drawEllipse(QPointF(to_x(t), to_y(price)), 3, 3)
@@ -0,0 +1,240 @@
+"""
+rankings.py
+En çok satanlar: son 7 / 30 / 90 günün adet ve ciro sıralaması ile ABC sınıfı.
+
+Sıralama `SalesRanking` tablosunda hazır tutulur; ilk k ürün
+(`days`, `revenue_rank`) veya (`days`, `qty_rank`) indeksinde k satırlık bir
+aralık okumasıdır. Pencereler bugünden önceki tam günleri kapsar (bugün,
+gün bitmeden sıralamayı oynatmasın diye dahil edilmez).
+
+Tablo günlük satış özetinden (`DailySales`, forecasting.py) artımlı
+güncellenir: gün ilerlediğinde her pencereye yalnızca yeni giren günler
+eklenir, dışarıda kalan günler çıkarılır; ardından sıralar ve ABC sınıfları
+tek bir UPDATE ile yeniden yazılır. Geçmiş bir güne sonradan hareket
+yazılmışsa (eşitleme, geçmiş tarihli içe aktarma) tablo özetten yeniden
+kurulur. ABC: ciroya göre sıralı ürünlerin kümülatif payı %80'e kadar A,
+%95'e kadar B, kalanı C.
+"""
+
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from valuation import begin_write
+
+WINDOWS = (7, 30, 90)           # Sıralanan pencereler (gün)
+SORT_KEYS = ("revenue", "qty")
+ABC_LIMITS = (0.80, 0.95)       # A ve B sınıflarının kümülatif ciro payı üst sınırı
+
+COLUMNS = ["rank", "product_id", "name", "barcode", "qty", "revenue", "share", "abc"]
+
+
+def ensure_schema(cur: sqlite3.Cursor) -> None:
+    """Sıralama tablolarını oluşturur (`DatabaseManager._ensure_schema` çağırır)"""
+    cur.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS SalesRanking (
+            days         INTEGER NOT NULL,
+            product_id   INTEGER NOT NULL,
+            qty          INTEGER NOT NULL DEFAULT 0,
+            revenue      REAL    NOT NULL DEFAULT 0,
+            qty_rank     INTEGER,
+            revenue_rank INTEGER,
+            share        REAL,                -- ciroya göre kümülatif pay (0–1)
+            abc          TEXT,
+            PRIMARY KEY (days, product_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_ranking_revenue ON SalesRanking(days, revenue_rank);
+        CREATE INDEX IF NOT EXISTS idx_ranking_qty ON SalesRanking(days, qty_rank);
+
+        CREATE TABLE IF NOT EXISTS SalesRankingState (
+            id          INTEGER PRIMARY KEY CHECK (id = 1),
+            as_of       TEXT,                 -- pencerelerin dışında kalan ilk gün
+            movement_id INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO SalesRankingState(id, as_of, movement_id) VALUES (1, NULL, 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_product_delete_ranking
+        AFTER DELETE ON Product BEGIN
+            DELETE FROM SalesRanking WHERE product_id = OLD.id;
+        END;
+        """
+    )
+
+
+def _day_ts(day: date) -> int:
+    """Yerel gün başının epoch saniyesi"""
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+class SalesRanking:
+    """Günlük satış özetinden artımlı güncellenen en çok satanlar tablosu."""
+
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.db.conn
+
+    def state(self):
+        """(as_of, movement_id): son güncellemenin günü ve özetin o anki son hareketi"""
+        row = self.conn.execute(
+            "SELECT as_of, movement_id FROM SalesRankingState WHERE id = 1").fetchone()
+        return (date.fromisoformat(row[0]) if row and row[0] else None,
+                row[1] if row else 0)
+
+    def _late_movements(self, as_of: date, after_id: int, upto_id: int) -> bool:
+        """Son güncellemeden sonra yazılıp sıralanmış bir güne düşen hareket var mı"""
+        return self.conn.execute(
+            "SELECT 1 FROM StockMovement WHERE id > ? AND id <= ? AND ts < ? LIMIT 1",
+            (after_id, upto_id, _day_ts(as_of)),
+        ).fetchone() is not None
+
+    def refresh(self, as_of: Optional[date] = None, commit: bool = True) -> int:
+        """
+        Sıralamayı `as_of` gününe (varsayılan bugün) getirir. Günlük özetin
+        önceden işlenmiş olması beklenir (`SalesRollup.sync`).
+
+        Returns:
+            int: Toplamı değişen (pencere, ürün) satırı sayısı; güncelse 0
+        """
+        as_of = as_of or date.today()
+        changed = 0
+        # Durum yazma kilidi altında okunur: aynı dosyadaki başka bir bağlantı
+        # pencereleri aynı anda kaydırıp günleri iki kez ekleyemez
+        begin_write(self.conn)
+        try:
+            old_as_of, old_id = self.state()
+            upto_id = self.db.sales_rollup.watermark()
+            if old_as_of is not None and old_as_of > as_of:
+                old_as_of = None    # Saat geri alındı: baştan kur
+            if old_as_of is not None and self._late_movements(old_as_of, old_id, upto_id):
+                old_as_of = None
+            if old_as_of == as_of:
+                if upto_id != old_id:
+                    self._set_state(as_of, upto_id)
+                if commit:
+                    self.conn.commit()
+                return 0
+
+            if old_as_of is None:
+                self.conn.execute("DELETE FROM SalesRanking")
+            for days in WINDOWS:
+                changed += self._shift(days, old_as_of, as_of)
+            self.conn.execute(
+                "DELETE FROM SalesRanking WHERE qty = 0 AND ABS(revenue) < 0.005")
+            self._rerank()
+            self._set_state(as_of, upto_id)
+            if commit:
+                self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return changed
+
+    def rebuild(self, as_of: Optional[date] = None) -> int:
+        """Sıralamayı günlük özetten baştan kurar"""
+        self._set_state(None, 0)
+        return self.refresh(as_of)
+
+    def _set_state(self, as_of: Optional[date], movement_id: int) -> None:
+        self.conn.execute(
+            "UPDATE SalesRankingState SET as_of = ?, movement_id = ? WHERE id = 1",
+            (as_of.isoformat() if as_of else None, movement_id),
+        )
+
+    def _shift(self, days: int, old_as_of: Optional[date], as_of: date) -> int:
+        """
+        Bir pencereyi `old_as_of`'tan `as_of`'a kaydırır: pencereye yeni giren
+        günler eklenir, çıkanlar çıkarılır (old_as_of None ise tüm pencere eklenir).
+        """
+        add_from = as_of - timedelta(days=days)
+        sub_from = sub_to = None
+        if old_as_of is not None:
+            old_from = old_as_of - timedelta(days=days)
+            add_from = max(old_as_of, add_from)
+            sub_from, sub_to = old_from, min(old_as_of, as_of - timedelta(days=days))
+        add_to = as_of - timedelta(days=1)
+        sub_to = sub_to - timedelta(days=1) if sub_to else None
+        # Çıkarılan aralık her zaman eklenenden öncedir: gün karşılaştırması yön verir
+        cur = self.conn.execute(
+            """
+            INSERT INTO SalesRanking(days, product_id, qty, revenue)
+            SELECT :days, product_id,
+                   SUM(CASE WHEN day >= :add_from THEN qty ELSE -qty END),
+                   SUM(CASE WHEN day >= :add_from THEN revenue ELSE -revenue END)
+            FROM DailySales
+            WHERE day BETWEEN :add_from AND :add_to
+               OR day BETWEEN :sub_from AND :sub_to
+            GROUP BY product_id
+            ON CONFLICT(days, product_id) DO UPDATE SET
+                qty     = qty + excluded.qty,
+                revenue = ROUND(revenue + excluded.revenue, 6)
+            """,
+            {"days": days, "add_from": add_from.isoformat(), "add_to": add_to.isoformat(),
+             "sub_from": sub_from.isoformat() if sub_from else None,
+             "sub_to": sub_to.isoformat() if sub_to else None},
+        )
+        return max(cur.rowcount, 0)
+
+    def _rerank(self) -> None:
+        """Tüm pencerelerde adet / ciro sırasını, kümülatif payı ve ABC sınıfını yazar"""
+        a_limit, b_limit = ABC_LIMITS
+        self.conn.execute(
+            """
+            UPDATE SalesRanking SET qty_rank = r.qty_rank, revenue_rank = r.revenue_rank,
+                                    share = r.share, abc = r.abc
+            FROM (
+                SELECT days, product_id, qty_rank, revenue_rank, share,
+                       CASE WHEN revenue <= 0 OR total <= 0 THEN 'C'
+                            WHEN share - revenue / total < :a THEN 'A'
+                            WHEN share - revenue / total < :b THEN 'B'
+                            ELSE 'C' END AS abc
+                FROM (
+                    SELECT days, product_id, revenue,
+                           ROW_NUMBER() OVER (PARTITION BY days
+                                              ORDER BY qty DESC, product_id) AS qty_rank,
+                           ROW_NUMBER() OVER w AS revenue_rank,
+                           SUM(MAX(revenue, 0)) OVER (PARTITION BY days) AS total,
+                           SUM(MAX(revenue, 0)) OVER w
+                               / NULLIF(SUM(MAX(revenue, 0)) OVER (PARTITION BY days), 0)
+                               AS share
+                    FROM SalesRanking
+                    WINDOW w AS (PARTITION BY days ORDER BY revenue DESC, product_id
+                                 ROWS UNBOUNDED PRECEDING)
+                )
+            ) AS r
+            WHERE SalesRanking.days = r.days AND SalesRanking.product_id = r.product_id
+            """,
+            {"a": a_limit, "b": b_limit},
+        )
+
+    # ---------- Sorgular ------------------------------------------------
+    def top(self, days: int = 30, by: str = "revenue", limit: int = 20) -> List[sqlite3.Row]:
+        """İlk `limit` ürün (`COLUMNS`); sıra indeksinden k satır okunur"""
+        if days not in WINDOWS:
+            raise ValueError(f"Pencere {WINDOWS} değerlerinden biri olmalı: {days}")
+        if by not in SORT_KEYS:
+            raise ValueError(f"Sıralama ölçütü {SORT_KEYS} değerlerinden biri olmalı: {by}")
+        rank = f"{by}_rank"
+        return self.conn.execute(
+            f"""
+            SELECT r.{rank} AS rank, r.product_id, p.name, p.barcode, r.qty,
+                   r.revenue, r.share, r.abc
+            FROM SalesRanking r JOIN Product p ON p.id = r.product_id
+            WHERE r.days = ? AND r.{rank} <= ?
+            ORDER BY r.{rank}
+            """,
+            (days, limit),
+        ).fetchall()
+
+    def abc_summary(self, days: int = 30) -> List[sqlite3.Row]:
+        """Sınıf başına ürün sayısı, adet ve ciro: abc, products, qty, revenue"""
+        if days not in WINDOWS:
+            raise ValueError(f"Pencere {WINDOWS} değerlerinden biri olmalı: {days}")
+        return self.conn.execute(
+            "SELECT abc, COUNT(*) AS products, SUM(qty) AS qty, SUM(revenue) AS revenue"
+            " FROM SalesRanking WHERE days = ? GROUP BY abc ORDER BY abc",
+            (days,),
+        ).fetchall()
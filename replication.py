@@ -0,0 +1,475 @@
+"""
+replication.py
+Mağazalar arası eşitleme: Product ve StockMovement değişiklik günlüğü.
+
+Her veritabanının kalıcı bir mağaza kimliği (`SyncState.store_id`) vardır.
+Ürün ekleme/güncelleme/silme ve stok hareketi eklemeleri aynı işlem içinde
+tetikleyicilerle `ChangeLog` tablosuna, artan sıra numarasıyla (`seq`) yazılır.
+Günlük yalnızca büyür; kayıtlar değişikliğin kendisini değil hangi satırın
+değiştiğini tutar, gönderilecek değerler dışa aktarımda okunur.
+
+Eşitleme alıcı tarafından çekilir: alıcı her mağaza için aldığı son sıra
+numarasını (`SyncPeer.received_seq`) saklar ve yalnızca ondan sonraki
+kayıtları ister. Partiler tek işlemde uygulanır ve imleç aynı işlemde
+ilerler; aynı parti ikinci kez gelirse atlanır. Böylece eşitlemenin maliyeti
+veritabanı büyüklüğüne değil değişiklik sayısına bağlıdır.
+
+Kurallar:
+    – Ürünler barkodla eşleşir (barkodsuz ürünler eşitlenmez). Çakışan
+      düzenlemelerde son yazan kazanır: sürüm (ts, kaynak mağaza) çiftidir,
+      yerel değişikliklerin ts'si aynı barkodun son sürümünden her zaman
+      büyüktür, eşitlikte mağaza kimliği karar verir.
+    – Hareketler genel anahtarla (`op_key`, yoksa "<mağaza>:<id>") eklenir;
+      anahtar zaten varsa satır atlanır, yani uygulama idempotenttir.
+    – Hareket silme ve düzeltmeleri ile arşivlemenin yazdığı açılış
+      hareketleri gönderilmez.
+
+Taşıma: `pull()` her iki tarafta da `DatabaseManager` veya
+`RemoteDatabaseManager` (yerel `inventory_service` soketi) kabul eder;
+`export_file()` / `import_file()` partileri JSON Lines dosyasıyla taşır.
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+BATCH_SIZE = 500   # Parti başına en fazla günlük kaydı
+
+_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def _log_sql(entity: str, op: str, ref: str, key: str = "NULL",
+             prev_key: str = "NULL") -> str:
+    """
+    Tetikleyici gövdesi: günlüğe tek satır yazar. Eşitleme sırasında
+    `SyncContext` satırı kaynağı ve sürümü verir; `log = 0` ise yazılmaz.
+    """
+    if key == "NULL":
+        local_ts = _NOW
+    else:
+        # Aynı barkodun son sürümünden büyük: saat geri kalsa da son yazan kazanır
+        local_ts = (f"MAX({_NOW}, COALESCE((SELECT l.ts + 1 FROM ChangeLog l"
+                    f" WHERE l.key = {key} ORDER BY l.seq DESC LIMIT 1), 0))")
+    return f"""
+        INSERT INTO ChangeLog(entity, op, ref, key, prev_key, origin, ts)
+        SELECT '{entity}', '{op}', {ref}, {key}, {prev_key},
+               COALESCE(c.origin, s.store_id),
+               CASE WHEN c.origin IS NOT NULL THEN c.ts ELSE {local_ts} END
+        FROM SyncState s LEFT JOIN SyncContext c ON c.id = 1
+        WHERE COALESCE(c.log, 1);
+    """
+
+
+def ensure_schema(cur: sqlite3.Cursor) -> None:
+    """Eşitleme tablolarını oluşturur (`DatabaseManager._ensure_schema` çağırır)"""
+    new_log = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='ChangeLog'"
+    ).fetchone() is None
+    cur.executescript(
+        f"""
+        CREATE TABLE IF NOT EXISTS SyncState (
+            id       INTEGER PRIMARY KEY CHECK (id = 1),
+            store_id TEXT    NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS ChangeLog (
+            seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity   TEXT    NOT NULL CHECK (entity IN ('product', 'movement')),
+            op       TEXT    NOT NULL CHECK (op IN ('upsert', 'delete', 'insert')),
+            ref      INTEGER NOT NULL,   -- yerel Product.id / StockMovement.id
+            key      TEXT,               -- ürünlerde barkod
+            prev_key TEXT,               -- barkod değiştiyse eskisi
+            origin   TEXT    NOT NULL,   -- değişikliğin yapıldığı mağaza
+            ts       INTEGER NOT NULL    -- ürünlerde sürüm zamanı (epoch sn)
+        );
+        CREATE INDEX IF NOT EXISTS idx_changelog_ref ON ChangeLog(entity, ref, seq);
+        CREATE INDEX IF NOT EXISTS idx_changelog_key
+            ON ChangeLog(key, seq) WHERE key IS NOT NULL;
+
+        -- Yalnızca eşitleme işlemi sürerken dolu (işlem dışında hiç görünmez)
+        CREATE TABLE IF NOT EXISTS SyncContext (
+            id     INTEGER PRIMARY KEY CHECK (id = 1),
+            origin TEXT,
+            ts     INTEGER,
+            log    INTEGER NOT NULL DEFAULT 1
+        );
+
+        CREATE TABLE IF NOT EXISTS SyncPeer (
+            peer_id      TEXT    PRIMARY KEY,
+            received_seq INTEGER NOT NULL DEFAULT 0,   -- o mağazadan alınan son kayıt
+            sent_seq     INTEGER NOT NULL DEFAULT 0,   -- o mağazaya gönderilen son kayıt
+            synced_at    INTEGER
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_product_insert_log
+        AFTER INSERT ON Product WHEN NEW.barcode IS NOT NULL BEGIN
+            {_log_sql("product", "upsert", "NEW.id", "NEW.barcode")}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_product_update_log
+        AFTER UPDATE OF name, barcode, location, unit_price, initial_price, reorder_point
+        ON Product WHEN NEW.barcode IS NOT NULL BEGIN
+            {_log_sql("product", "upsert", "NEW.id", "NEW.barcode",
+                      "CASE WHEN OLD.barcode IS NOT NEW.barcode THEN OLD.barcode END")}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_product_delete_log
+        AFTER DELETE ON Product WHEN OLD.barcode IS NOT NULL BEGIN
+            {_log_sql("product", "delete", "OLD.id", "OLD.barcode")}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_movement_insert_log
+        AFTER INSERT ON StockMovement BEGIN
+            {_log_sql("movement", "insert", "NEW.id")}
+        END;
+        """
+    )
+    cur.execute("INSERT OR IGNORE INTO SyncState(id, store_id) VALUES (1, ?)",
+                (uuid.uuid4().hex,))
+    if new_log:
+        # Günlükten önceki veriler bir kez yazılır; ilk eşitleme tam kopyadır
+        cur.execute(
+            f"""
+            INSERT INTO ChangeLog(entity, op, ref, key, origin, ts)
+            SELECT 'product', 'upsert', id, barcode, (SELECT store_id FROM SyncState),
+                   COALESCE(CAST(strftime('%s', created_at) AS INTEGER), {_NOW})
+            FROM Product WHERE barcode IS NOT NULL ORDER BY id
+            """
+        )
+        cur.execute(
+            """
+            INSERT INTO ChangeLog(entity, op, ref, origin, ts)
+            SELECT 'movement', 'insert', id, (SELECT store_id FROM SyncState), ts
+            FROM StockMovement ORDER BY id
+            """
+        )
+
+
+def suppress_log(cur: sqlite3.Cursor) -> None:
+    """Açık işlemin kalanında yapılan değişiklikleri günlüğe yazma (bakım işleri için)"""
+    cur.execute("INSERT OR REPLACE INTO SyncContext(id, origin, ts, log) VALUES (1, NULL, NULL, 0)")
+
+
+def clear_context(cur: sqlite3.Cursor) -> None:
+    """`suppress_log` veya uygulanan parti bağlamını kaldırır (işlem bitmeden çağrılır)"""
+    cur.execute("DELETE FROM SyncContext")
+
+
+class Replicator:
+    """Değişiklik günlüğünü dışa aktarır ve diğer mağazaların partilerini uygular."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def store_id(self) -> str:
+        return self.db.conn.execute("SELECT store_id FROM SyncState").fetchone()[0]
+
+    def received_seq(self, peer_id: str) -> int:
+        row = self.db.conn.execute(
+            "SELECT received_seq FROM SyncPeer WHERE peer_id = ?", (peer_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def peers(self) -> List[sqlite3.Row]:
+        """Bilinen mağazalar: peer_id, received_seq, sent_seq, synced_at, pending"""
+        return self.db.conn.execute(
+            """
+            SELECT peer_id, received_seq, sent_seq, synced_at,
+                   (SELECT COUNT(*) FROM ChangeLog
+                    WHERE seq > p.sent_seq AND origin != p.peer_id) AS pending
+            FROM SyncPeer p ORDER BY peer_id
+            """
+        ).fetchall()
+
+    def mark_sent(self, peer_id: str, seq: int) -> None:
+        conn = self.db.conn
+        conn.execute(
+            """
+            INSERT INTO SyncPeer(peer_id, sent_seq, synced_at) VALUES (?, ?, ?)
+            ON CONFLICT(peer_id) DO UPDATE SET
+                sent_seq = MAX(sent_seq, excluded.sent_seq), synced_at = excluded.synced_at
+            """,
+            (peer_id, seq, int(time.time())),
+        )
+        conn.commit()
+
+    # ---------- Dışa aktarma --------------------------------------------
+    def export_changes(self, since: int, exclude_origin: Optional[str] = None,
+                       limit: int = BATCH_SIZE) -> dict:
+        """
+        `since`'ten sonraki en fazla `limit` günlük kaydını parti olarak döndürür.
+
+        Değerler satırın güncel hâlinden okunur; kayıtlar sırayla gönderilir ki
+        hareketler ürünlerinden sonra gelsin. `exclude_origin` mağazasından
+        gelmiş kayıtlar ona geri gönderilmez; imleç yine de bu kayıtların
+        üstünden geçer.
+
+        Returns:
+            {"store_id", "since", "upto", "more", "changes": [...]}
+        """
+        rows = self.db.conn.execute(
+            """
+            SELECT c.seq, c.entity, c.op, c.key, c.prev_key, c.origin, c.ts, p.barcode, p.name, p.location, p.unit_price, p.initial_price,
+                   p.reorder_point, p.created_at,
+                   m.id AS movement_id, m.op_key, m.change, m.reason, m.purchase_price,
+                   m.ts AS moved_at, m.location AS movement_location,
+                   mp.barcode AS movement_barcode
+            FROM ChangeLog c
+            LEFT JOIN Product p ON c.entity = 'product' AND c.op = 'upsert' AND p.id = c.ref
+            LEFT JOIN StockMovement m ON c.entity = 'movement' AND m.id = c.ref
+            LEFT JOIN Product mp ON mp.id = m.product_id
+            WHERE c.seq > ? ORDER BY c.seq LIMIT ?
+            """,
+            (since, limit),
+        ).fetchall()
+
+        changes = []
+        for row in rows:
+            if row["origin"] == exclude_origin:
+                continue
+            change = {"seq": row["seq"], "entity": row["entity"], "op": row["op"],
+                      "origin": row["origin"], "ts": row["ts"]}
+            if row["entity"] == "product" and row["op"] == "delete":
+                change["barcode"] = row["key"]
+            elif row["entity"] == "product":
+                if row["barcode"] is None:
+                    continue  # Ürün sonradan silindi veya barkodu kaldırıldı
+                # Karşı tarafta ürün, kaydın yazıldığı andaki barkoduyla da bulunur
+                prev_barcode = row["prev_key"]
+                if prev_barcode is None and row["key"] != row["barcode"]:
+                    prev_barcode = row["key"]
+                change.update(
+                    barcode=row["barcode"], prev_barcode=prev_barcode, name=row["name"],
+                    location=row["location"], unit_price=row["unit_price"],
+                    initial_price=row["initial_price"], reorder_point=row["reorder_point"],
+                    created_at=row["created_at"],
+                )
+            else:
+                if row["movement_id"] is None or row["movement_barcode"] is None:
+                    continue  # Hareket silindi/arşivlendi veya ürünü barkodsuz
+                change.update(
+                    op_key=row["op_key"] or f"{row['origin']}:{row['movement_id']}",
+                    barcode=row["movement_barcode"], change=row["change"],
+                    reason=row["reason"], purchase_price=row["purchase_price"],
+                    location=row["movement_location"], moved_at=row["moved_at"],
+                )
+            changes.append(change)
+
+        return {
+            "store_id": self.store_id(),
+            "since": since,
+            "upto": rows[-1]["seq"] if rows else since,
+            "more": len(rows) == limit,
+            "changes": changes,
+        }
+
+    # ---------- Uygulama ------------------------------------------------
+    def apply_changes(self, batch: dict) -> dict:
+        """
+        Diğer mağazanın partisini tek işlemde uygular ve imlecini ilerletir.
+
+        Raises:
+            ValueError: Parti bu veritabanının kendisinden geliyorsa veya
+                alınan son kayıt ile parti arasında boşluk varsa
+
+        Returns:
+            {"applied": ..., "skipped": ..., "upto": ...}: uygulanan ve
+            (çakışmayı kaybettiği, zaten var olduğu ya da ürünü bulunamadığı
+            için) atlanan değişiklik sayıları ile yeni imleç
+        """
+        sender = batch["store_id"]
+        conn = self.db.conn
+        cur = conn.cursor()
+        conn.commit()
+        cur.execute("BEGIN IMMEDIATE")  # İmleç kontrolü ile yazma arasına başka yazma girmesin
+        try:
+            if sender == self.store_id():
+                raise ValueError("Parti bu veritabanının kendi günlüğünden")
+            received = self.received_seq(sender)
+            if batch["since"] > received:
+                raise ValueError(
+                    f"{sender} günlüğünde boşluk: {received} sonrası bekleniyordu,"
+                    f" parti {batch['since']} sonrasından başlıyor")
+            applied = skipped = 0
+            products = set()
+            if batch["upto"] > received:
+                for change in batch["changes"]:
+                    if change["seq"] <= received:
+                        continue
+                    if change["entity"] == "product":
+                        product_id = self._apply_product(cur, change)
+                    else:
+                        product_id = self._apply_movement(cur, change)
+                    if product_id is None:
+                        skipped += 1
+                        continue
+                    applied += 1
+                    if change["entity"] == "product":
+                        products.add(product_id)
+                clear_context(cur)
+                received = batch["upto"]
+            cur.execute(
+                """
+                INSERT INTO SyncPeer(peer_id, received_seq, synced_at) VALUES (?, ?, ?)
+                ON CONFLICT(peer_id) DO UPDATE SET
+                    received_seq = excluded.received_seq, synced_at = excluded.synced_at
+                """,
+                (sender, received, int(time.time())),
+            )
+            conn.commit()
+        except (sqlite3.Error, ValueError, KeyError):
+            conn.rollback()
+            raise
+        for product_id in products:
+            self.db.catalog.product_changed(product_id)
+        return {"applied": applied, "skipped": skipped, "upto": received}
+
+    @staticmethod
+    def _set_context(cur: sqlite3.Cursor, change: dict) -> None:
+        # Tetikleyiciler günlüğe yerel saat yerine kaynağın sürümünü yazar
+        cur.execute("INSERT OR REPLACE INTO SyncContext(id, origin, ts, log) VALUES (1, ?, ?, 1)",
+                    (change["origin"], change["ts"]))
+
+    def _apply_product(self, cur: sqlite3.Cursor, change: dict) -> Optional[int]:
+        """Son yazan kazanır; uygulanırsa ürün id'si, atlanırsa None"""
+        local = cur.execute(
+            "SELECT ts, origin FROM ChangeLog WHERE key = ? ORDER BY seq DESC LIMIT 1",
+            (change["barcode"],),
+        ).fetchone()
+        if local is not None and (local["ts"], local["origin"]) >= (change["ts"], change["origin"]):
+            return None
+        existing = cur.execute(
+            "SELECT id FROM Product WHERE barcode = ?", (change["barcode"],)
+        ).fetchone()
+        if existing is None and change.get("prev_barcode"):
+            existing = cur.execute(
+                "SELECT id FROM Product WHERE barcode = ?", (change["prev_barcode"],)
+            ).fetchone()
+
+        self._set_context(cur, change)
+        if change["op"] == "delete":
+            if existing is None:
+                return None
+            # delete_product ile aynı: önce ürünün hareketleri
+            cur.execute("DELETE FROM StockMovement WHERE product_id = ?", (existing["id"],))
+            cur.execute("DELETE FROM Product WHERE id = ?", (existing["id"],))
+            return existing["id"]
+        values = (change["name"], change["barcode"], change["location"], change["unit_price"],
+                  change["initial_price"], change["reorder_point"] or 0)
+        if existing is not None:
+            cur.execute(
+                "UPDATE Product SET name=?, barcode=?, location=?, unit_price=?,"
+                " initial_price=?, reorder_point=? WHERE id=?",
+                values + (existing["id"],),
+            )
+            return existing["id"]
+        cur.execute(
+            "INSERT INTO Product(name, barcode, location, unit_price, initial_price,"
+            " reorder_point, created_at) VALUES (?,?,?,?,?,?, COALESCE(?, CURRENT_TIMESTAMP))",
+            values + (change.get("created_at"),),
+        )
+        return cur.lastrowid
+
+    def _apply_movement(self, cur: sqlite3.Cursor, change: dict) -> Optional[int]:
+        """Hareketi genel anahtarıyla ekler; uygulanırsa ürün id'si, atlanırsa None"""
+        product = cur.execute(
+            "SELECT id FROM Product WHERE barcode = ?", (change["barcode"],)
+        ).fetchone()
+        if product is None:
+            return None
+        self._set_context(cur, change)
+        cur.execute(
+            "INSERT INTO StockMovement"
+            "(op_key, product_id, change, reason, purchase_price, ts, location)"
+            " VALUES (?,?,?,?,?,?,?)"
+            " ON CONFLICT(op_key) WHERE op_key IS NOT NULL DO NOTHING",
+            (change["op_key"], product["id"], change["change"], change["reason"],
+             change["purchase_price"], change["moved_at"], change["location"]),
+        )
+        return product["id"] if cur.rowcount == 1 else None
+
+
+# ---------- Taşıma ------------------------------------------------------
+def pull(local, remote, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    `remote`'un yeni değişikliklerini `local`'e uygular (yalnızca eksik kısım).
+
+    İki taraf da `DatabaseManager` veya `RemoteDatabaseManager` olabilir.
+
+    Returns:
+        {"batches", "applied", "skipped", "upto"}
+    """
+    local_id, remote_id = local.store_id(), remote.store_id()
+    since = local.sync_cursor(remote_id)
+    totals = {"batches": 0, "applied": 0, "skipped": 0, "upto": since}
+    while True:
+        batch = remote.export_changes(since, local_id, batch_size)
+        result = local.apply_changes(batch)
+        remote.mark_sent(local_id, result["upto"])
+        totals["batches"] += 1
+        totals["applied"] += result["applied"]
+        totals["skipped"] += result["skipped"]
+        totals["upto"] = since = result["upto"]
+        if not batch["more"]:
+            return totals
+
+
+def sync(local, remote, batch_size: int = BATCH_SIZE) -> Tuple[dict, dict]:
+    """İki yönlü eşitleme: önce `remote` → `local`, sonra `local` → `remote`"""
+    return pull(local, remote, batch_size), pull(remote, local, batch_size)
+
+
+def export_file(db, path: Path, peer_id: Optional[str] = None,
+                since: Optional[int] = None, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Değişiklikleri JSON Lines dosyasına parti parti yazar.
+
+    Args:
+        peer_id: Hedef mağaza; verilirse ona daha önce gönderilenlerden sonrası
+            yazılır, ondan gelmiş kayıtlar atlanır ve gönderim imleci ilerler
+        since: Bu sıra numarasından sonrası (verilirse imleç yerine kullanılır)
+
+    Returns:
+        Yazılan değişiklik sayısı
+    """
+    if since is None:
+        since = 0
+        if peer_id is not None:
+            row = db.conn.execute(
+                "SELECT sent_seq FROM SyncPeer WHERE peer_id = ?", (peer_id,)
+            ).fetchone()
+            since = row[0] if row else 0
+    written = 0
+    with open(path, "w", encoding="utf-8") as fh:
+        while True:
+            batch = db.export_changes(since, peer_id, batch_size)
+            fh.write(json.dumps(batch, ensure_ascii=False) + "\n")
+            written += len(batch["changes"])
+            since = batch["upto"]
+            if not batch["more"]:
+                break
+    if peer_id is not None:
+        db.mark_sent(peer_id, since)
+    return written
+
+
+def read_batches(path: Path) -> Iterable[dict]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def import_file(db, path: Path) -> dict:
+    """`export_file` ile yazılmış partileri sırayla uygular (tekrar içe aktarmak güvenlidir)"""
+    totals = {"batches": 0, "applied": 0, "skipped": 0, "upto": 0}
+    for batch in read_batches(path):
+        result = db.apply_changes(batch)
+        totals["batches"] += 1
+        totals["applied"] += result["applied"]
+        totals["skipped"] += result["skipped"]
+        totals["upto"] = result["upto"]
+    return totals
@@ -0,0 +1,135 @@
+"""
+report_cache.py
+Veri sürümüyle etiketlenmiş rapor ve liste sonuçları önbelleği.
+
+Veri sürümü `DatabaseManager.data_version()` ile okunur: son StockMovement
+ve SaleLine id'leri ile ürün ve hareket düzenleme sayaçları. Sürüm
+değişmediyse sonuç bellekten döner. Satış raporları artımlı tutulur: fiş
+satırları yalnızca eklendiği için her dönem toplamı, son işlenen SaleLine
+id'sinden sonraki satırlarla güncellenir (yalnızca yeni satışlar okunur).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+class SalesRow(tuple):
+    """sales_report satırı: (name, sold_qty, revenue), sütun adıyla da okunur"""
+
+    _keys = ("name", "sold_qty", "revenue")
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._keys.index(key)
+            except ValueError:
+                raise IndexError(f"Sütun yok: {key}") from None
+        return tuple.__getitem__(self, key)
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+
+class _SalesRollup:
+    """Bir dönemin ürün bazında satış toplamı ve işlenen son SaleLine id'si"""
+
+    __slots__ = ("last_id", "totals")
+
+    def __init__(self):
+        self.last_id = 0
+        self.totals: Dict[int, list] = {}   # product_id → [ad, adet, gelir]
+
+    def rows(self) -> List[SalesRow]:
+        rows = [SalesRow((name, qty, round(revenue, 2)))
+                for name, qty, revenue in self.totals.values() if qty > 0]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows
+
+
+class ReportCache:
+    """Sürüm etiketli sonuç önbelleği (iş parçacıkları arasında paylaşılabilir)"""
+
+    def __init__(self, db, max_entries: int = 64):
+        self.db = db
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._rollups: "OrderedDict[Tuple[str, str], _SalesRollup]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, store: OrderedDict, key, value) -> None:
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+
+    def cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Veri sürümü değişmediyse önceki sonucu, değiştiyse `compute()` sonucunu döndürür"""
+        version = self.db.data_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._remember(self._entries, key, (version, value))
+        return value
+
+    def sales_report(self, start: str, end: str) -> List[SalesRow]:
+        """
+        `start`–`end` (YYYY-MM-DD) dönemi satış toplamı; ilk çağrıda tam
+        hesaplanır, sonrakilerde yalnızca yeni fiş satırları eklenir.
+        """
+        conn = self.db.conn
+        key = (start, end)
+        # Üst sınır önce okunur: sorgular arasında yazılan satırlar bir
+        # sonraki çağrıya kalır, iki kez sayılmaz
+        upper = conn.execute("SELECT COALESCE(MAX(id), 0) FROM SaleLine").fetchone()[0]
+        while True:
+            with self._lock:
+                rollup = self._rollups.get(key)
+                if rollup is None:
+                    rollup = _SalesRollup()
+                    self._remember(self._rollups, key, rollup)
+                last_id = rollup.last_id
+                if upper <= last_id:
+                    self.hits += 1
+                    self._rollups.move_to_end(key)
+                    return rollup.rows()
+            # Yeni satırlar kilit dışında okunur; toplamlar yalnızca kilit altında değişir
+            # MAX(id) ile seçilen satırın adı gelir (SQLite'ın yalın sütun kuralı)
+            delta = conn.execute(
+                """
+                SELECT product_id, name, SUM(qty), SUM(line_total), MAX(id) FROM SaleLine
+                WHERE id > ? AND id <= ? AND day BETWEEN DATE(?) AND DATE(?)
+                GROUP BY product_id
+                """,
+                (last_id, upper, start, end),
+            ).fetchall()
+            with self._lock:
+                if rollup.last_id != last_id:
+                    continue   # Başka bir iş parçacığı araya girip ilerletti: kalan aralık yeniden okunur
+                totals = rollup.totals
+                for product_id, name, qty, revenue, _ in delta:
+                    current = totals.get(product_id)
+                    if current is None:
+                        totals[product_id] = [name, qty, revenue]
+                    else:
+                        # Ad, dönemdeki en son satıştaki addır
+                        current[0] = name
+                        current[1] += qty
+                        current[2] += revenue
+                rollup.last_id = upper
+                self.misses += 1
+                self._remember(self._rollups, key, rollup)
+                return rollup.rows()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rollups.clear()
@@ -0,0 +1,239 @@
+"""
+report_jobs.py
+Rapor sorgularını ve dosya yazımını arayüz iş parçacığından alan iş yürütücüsü.
+
+Her rapor işi bir `ProcessPoolExecutor` sürecinde çalışır; her işçi süreç
+veritabanına kendi salt okunur bağlantısıyla bağlanır. Böylece SQL ve
+pandas/openpyxl işi kasayı kilitlemez ve birden çok dışa aktarım farklı
+çekirdeklerde paralel yürür. İlerleme ve iptal süreçler arası bir Manager
+kuyruğu/sözlüğü üzerinden iletilir.
+
+Bu modül Qt içe aktarmaz; `ReportTab` sonuçları `poll()` ile QTimer'dan toplar.
+"""
+
+import itertools
+import multiprocessing as mp
+import queue
+import sqlite3
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# ---------- İşçi süreç tarafı ------------------------------------------
+_db = None              # Süreç başına salt okunur DatabaseManager
+_progress = None        # Manager kuyruğu: (job_id, yüzde, mesaj)
+_cancelled = None       # Manager sözlüğü: job_id → True
+_current_job = None
+
+
+class JobCancelled(Exception):
+    """İş kullanıcı tarafından iptal edildi"""
+
+
+def _init_worker(db_path: str, progress, cancelled) -> None:
+    global _db, _progress, _cancelled
+    from models import DatabaseManager
+
+    _db = DatabaseManager(Path(db_path), read_only=True, profile="reporting")
+    _progress, _cancelled = progress, cancelled
+    # Uzun sorgular iptal bayrağını periyodik olarak kontrol etsin
+    _db.conn.set_progress_handler(_should_interrupt, 200_000)
+
+
+def _should_interrupt() -> int:
+    return 1 if _current_job is not None and _cancelled.get(_current_job) else 0
+
+
+def _step(job_id: int, percent: int, message: str) -> None:
+    """İlerleme bildirir; iş iptal edildiyse JobCancelled fırlatır."""
+    if _cancelled.get(job_id):
+        raise JobCancelled()
+    _progress.put((job_id, percent, message))
+
+
+def _daily_rows(job_id: int, params: dict):
+    _step(job_id, 10, "Sorgu çalışıyor")
+    return [tuple(row) for row in _db.daily_sales_report()]
+
+
+def _daily_export(job_id: int, params: dict):
+    from reports import export_daily_sales
+
+    _step(job_id, 10, "Excel dosyası hazırlanıyor")
+    return export_daily_sales(_db, params["path"])
+
+
+def _period_export(job_id: int, params: dict):
+    from reports import export_sales_report
+
+    _step(job_id, 10, "Dönem raporu hazırlanıyor")
+    return export_sales_report(_db, params["start"], params["end"], params["path"])
+
+
+def _price_rows(job_id: int, params: dict):
+    from price_analytics import price_analytics_rows
+
+    _step(job_id, 10, "Alış fiyatları yükleniyor")
+    return price_analytics_rows(_db, params["start"], params["end"], params["by"],
+                                params.get("limit"))
+
+
+def _price_export(job_id: int, params: dict):
+    from reports import export_price_analytics
+
+    _step(job_id, 10, "Fiyat analizi hazırlanıyor")
+    return export_price_analytics(_db, params["start"], params["end"], params["path"],
+                                  params["by"])
+
+
+def _top_sellers(job_id: int, params: dict):
+    # İşçi bağlantısı salt okunur: sıralama tazelenmez, bakımın son yazdığı okunur
+    _step(job_id, 10, "Sıralama okunuyor")
+    days = params["days"]
+    rows = _db.top_sellers(days, params["by"], params["limit"])
+    summary = _db.abc_summary(days)
+    return days, [dict(row) for row in rows], [dict(row) for row in summary]
+
+
+JOB_FUNCTIONS = {
+    "daily_rows": _daily_rows,
+    "daily_export": _daily_export,
+    "period_export": _period_export,
+    "price_rows": _price_rows,
+    "price_export": _price_export,
+    "top_sellers": _top_sellers,
+}
+
+
+def _run_job(job_id: int, kind: str, params: dict):
+    global _current_job
+    _current_job = job_id
+    try:
+        result = JOB_FUNCTIONS[kind](job_id, params)
+        _step(job_id, 100, "Tamamlandı")
+        return result
+    except sqlite3.OperationalError as e:
+        if "interrupted" in str(e):
+            raise JobCancelled() from None
+        raise
+    finally:
+        _current_job = None
+
+
+# ---------- Arayüz tarafı ------------------------------------------------
+@dataclass
+class JobEvent:
+    """`poll()` ile teslim edilen iş olayı"""
+    job_id: int
+    kind: str
+    state: str                  # "progress", "done", "failed", "cancelled"
+    percent: int = 0
+    message: str = ""
+    result: Any = None
+
+
+class ReportJobRunner:
+    """Rapor işlerini süreç havuzunda çalıştırır, ilerleme ve sonuçları toplar."""
+
+    def __init__(self, db_path: Path, max_workers: Optional[int] = None):
+        self.db_path = Path(db_path)
+        self.max_workers = max_workers
+        self._manager = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, Future] = {}
+        self._kinds: Dict[int, str] = {}
+        self._finished: "queue.Queue[JobEvent]" = queue.Queue()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        """Süreç havuzunu ilk işte başlatır (uygulama açılışını yavaşlatmasın)."""
+        if self._pool is None:
+            ctx = mp.get_context("spawn")   # Qt içeren süreçten fork yapma
+            self._manager = ctx.Manager()
+            self._progress = self._manager.Queue()
+            self._cancelled = self._manager.dict()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(str(self.db_path), self._progress, self._cancelled),
+            )
+        return self._pool
+
+    def submit(self, kind: str, **params) -> int:
+        """
+        Yeni bir rapor işi başlatır.
+
+        Args:
+            kind: `JOB_FUNCTIONS` anahtarlarından biri ("daily_rows",
+                "daily_export", "period_export", "price_rows", "price_export",
+                "top_sellers")
+            params: İşe özel parametreler (path, start, end, by, limit, days)
+
+        Returns:
+            int: İş numarası
+        """
+        if kind not in JOB_FUNCTIONS:
+            raise ValueError(f"Bilinmeyen rapor işi: {kind}")
+        job_id = next(self._ids)
+        future = self._ensure_pool().submit(_run_job, job_id, kind, params)
+        self._jobs[job_id] = future
+        self._kinds[job_id] = kind
+        future.add_done_callback(lambda f, j=job_id: self._on_done(j, f))
+        return job_id
+
+    def _on_done(self, job_id: int, future: Future) -> None:
+        kind = self._kinds.get(job_id, "")
+        try:
+            result = future.result()
+            event = JobEvent(job_id, kind, "done", 100, "Tamamlandı", result)
+        except (CancelledError, JobCancelled):
+            event = JobEvent(job_id, kind, "cancelled", 0, "İptal edildi")
+        except Exception as e:
+            event = JobEvent(job_id, kind, "failed", 0, str(e))
+        self._finished.put(event)
+
+    def cancel(self, job_id: int) -> None:
+        """İşi iptal eder: başlamadıysa kuyruktan düşer, çalışıyorsa kesilir."""
+        future = self._jobs.get(job_id)
+        if future is None or future.done():
+            return
+        if not future.cancel():
+            self._cancelled[job_id] = True
+
+    def active_jobs(self) -> List[int]:
+        return [j for j, f in self._jobs.items() if not f.done()]
+
+    def poll(self) -> List[JobEvent]:
+        """Biriken ilerleme ve tamamlanma olaylarını döndürür (engellemez)."""
+        events = []
+        if self._pool is None:
+            return events
+        while True:
+            try:
+                job_id, percent, message = self._progress.get_nowait()
+            except (queue.Empty, OSError, EOFError):
+                break
+            if percent < 100:
+                events.append(JobEvent(job_id, self._kinds.get(job_id, ""),
+                                       "progress", percent, message))
+        while True:
+            try:
+                event = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._jobs.pop(event.job_id, None)
+            self._kinds.pop(event.job_id, None)
+            self._cancelled.pop(event.job_id, None)
+            events.append(event)
+        return events
+
+    def shutdown(self) -> None:
+        if self._pool is None:
+            return
+        for job_id in self.active_jobs():
+            self.cancel(job_id)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+        self._pool = None
@@ -8,10 +8,19 @@ import pandas as pd                             # DataFrame & to_excel :contentR
 from models import DatabaseManager
 
 
+def _write_frame(df: pd.DataFrame, path: str) -> str:
+    """Tabloyu uzantıya göre .csv veya .xlsx olarak yazar; dosya adını döndürür."""
+    if path.endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+
 def export_daily_sales(db: DatabaseManager,
                        path: str | None = None) -> str | None:
     """
-    Günümüz satışlarını `path`'teki .xlsx dosyasına yazar.
+    Günümüz satışlarını `path`'teki dosyaya yazar (.xlsx veya .csv).
     Parametre verilmezse dosya adı `satis_YYYY‑MM‑DD.xlsx` olur.
     Dönüş: kaydedilen dosyanın tam adı veya satış yoksa None.
     """
@@ -22,5 +31,92 @@ def export_daily_sales(db: DatabaseManager,
     # DataFrame oluştur → Excel'e yaz  (pandas+openpyxl) :contentReference[oaicite:2]{index=2}
     df = pd.DataFrame(rows, columns=["Ürün", "Satış Adedi", "Gelir"])
     filename = path or f"satis_{date.today().isoformat()}.xlsx"     # isoformat :contentReference[oaicite:3]{index=3}
-    df.to_excel(filename, index=False)                              # to_excel :contentReference[oaicite:4]{index=4}
-    return filename
+    return _write_frame(df, filename)
+
+
+def export_sales_report(db: DatabaseManager, start: str, end: str,
+                        path: str | None = None) -> str | None:
+    """
+    `start`–`end` dönemindeki satışları dosyaya yazar (.xlsx veya .csv).
+    Parametre verilmezse dosya adı `satis_BAŞLANGIÇ_BİTİŞ.xlsx` olur.
+    Dönüş: kaydedilen dosyanın adı veya satış yoksa None.
+    """
+    rows = db.sales_report(start, end)
+    if not rows:
+        return None
+
+    df = pd.DataFrame(rows, columns=["Ürün", "Satış Adedi", "Gelir"])
+    filename = path or f"satis_{start}_{end}.xlsx"
+    return _write_frame(df, filename)
+
+
+def export_low_stock(db: DatabaseManager, path: str | None = None) -> str | None:
+    """
+    Kritik seviyenin altındaki ürünleri satın alma listesi olarak yazar (.xlsx veya .csv).
+    Parametre verilmezse dosya adı `kritik_stok_YYYY-MM-DD.xlsx` olur.
+    Dönüş: kaydedilen dosyanın adı veya kritik ürün yoksa None.
+    """
+    rows = db.low_stock_products()
+    if not rows:
+        return None
+
+    df = pd.DataFrame(
+        [(r["name"], r["barcode"], r["location"], r["qty"], r["reorder_point"], r["shortage"])
+         for r in rows],
+        columns=["Ürün", "Barkod", "Konum", "Stok", "Kritik Seviye", "Eksik"],
+    )
+    filename = path or f"kritik_stok_{date.today().isoformat()}.xlsx"
+    return _write_frame(df, filename)
+
+
+def export_stock_snapshot(db: DatabaseManager, ts: int, path: str) -> str:
+    """
+    Tüm kataloğun `ts` (epoch saniyesi) anındaki stoğunu yazar (.xlsx veya .csv).
+    Dönüş: kaydedilen dosyanın adı.
+    """
+    rows = db.stock_as_of(ts)
+    df = pd.DataFrame(
+        [(r["name"], r["barcode"], r["location"], r["qty"]) for r in rows],
+        columns=["Ürün", "Barkod", "Konum", "Stok"],
+    )
+    return _write_frame(df, path)
+
+
+def export_price_analytics(db: DatabaseManager, start: str, end: str,
+                           path: str | None = None, by: str = "increase") -> str | None:
+    """
+    `start`–`end` dönemindeki alış fiyatı analizini yazar (.xlsx veya .csv),
+    `by` ölçütüne göre sıralı (bkz. price_analytics.SORT_KEYS).
+    Parametre verilmezse dosya adı `fiyat_analizi_BAŞLANGIÇ_BİTİŞ.xlsx` olur.
+    Dönüş: kaydedilen dosyanın adı veya dönemde alış yoksa None.
+    """
+    from price_analytics import EXPORT_COLUMNS, price_metrics, rank
+
+    metrics = price_metrics(db, start, end)
+    if metrics.empty:
+        return None
+
+    df = rank(metrics, by)[list(EXPORT_COLUMNS)].rename(columns=EXPORT_COLUMNS).round(2)
+    filename = path or f"fiyat_analizi_{start}_{end}.xlsx"
+    return _write_frame(df, filename)
+
+
+def export_purchase_suggestions(db: DatabaseManager, path: str | None = None,
+                                all_products: bool = False, **params) -> str | None:
+    """
+    Satış hızına göre sipariş önerilerini yazar (.xlsx veya .csv); `params`
+    forecasting.forecast parametreleridir (lead_time, review_days, window…).
+    Parametre verilmezse dosya adı `siparis_onerisi_YYYY-MM-DD.xlsx` olur.
+    Dönüş: kaydedilen dosyanın adı veya önerilecek ürün yoksa None.
+    """
+    from forecasting import EXPORT_COLUMNS, forecast, suggestions
+
+    result = forecast(db, **params)
+    if not all_products:
+        result = suggestions(result)
+    if result.empty:
+        return None
+
+    df = result[list(EXPORT_COLUMNS)].rename(columns=EXPORT_COLUMNS).round(2)
+    filename = path or f"siparis_onerisi_{date.today().isoformat()}.xlsx"
+    return _write_frame(df, filename)
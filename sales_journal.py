@@ -0,0 +1,253 @@
+"""
+sales_journal.py
+Satışlar için çevrimdışı öncelikli yazma-arkası (write-behind) günlüğü.
+
+Kasa, stok hareketlerini önce yerel bir SQLite günlüğüne yazar (dayanıklı,
+milisaniyeler içinde); arka plandaki boşaltıcı (drain) iş parçacığı bunları
+partiler halinde ana veritabanına `apply_movements` ile uygular. Her kaydın
+benzersiz bir `op_key` değeri vardır, böylece yarıda kalan bir parti tekrar
+gönderildiğinde hareketler iki kez yazılmaz.
+
+Tamamlanan satışların fişleri (`record_sale`) de aynı şekilde günlüğe yazılır
+ve `DatabaseManager.record_sale` ile op_key'leriyle birlikte aktarılır; fişin
+SALE hareketleri ana veritabanında fişle aynı işlemde yazılır.
+
+Ana veritabanı kilitli ya da ağ yolu kopmuş olsa bile satış akmaya devam eder;
+bağlantı geri geldiğinde bekleyen kayıtlar sırayla uygulanır.
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from models import DB_PATH
+
+JOURNAL_PATH = DB_PATH.parent / "sales_journal.db"
+
+
+class SalesJournal:
+    """Yerel, dayanıklı hareket günlüğü ve arka plan boşaltıcısı."""
+
+    def __init__(self, path: Path = JOURNAL_PATH, batch_size: int = 200):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.last_error: Optional[str] = None
+        self._pending: Dict[int, int] = {}      # product_id → uygulanmamış miktar
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.conn = self._connect()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS JournalEntry (
+                id             INTEGER PRIMARY KEY AUTOINCREMENT,
+                op_key         TEXT    NOT NULL UNIQUE,
+                product_id     INTEGER NOT NULL,
+                change         INTEGER NOT NULL,
+                reason         TEXT    NOT NULL,
+                purchase_price REAL    DEFAULT NULL,
+                timestamp      TEXT    DEFAULT CURRENT_TIMESTAMP
+            );
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS JournalSale (
+                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                op_key     TEXT    NOT NULL UNIQUE,
+                day        TEXT    NOT NULL,
+                lines      TEXT    NOT NULL,
+                created_at TEXT    DEFAULT CURRENT_TIMESTAMP
+            );
+            """
+        )
+        self.conn.commit()
+        # Önceki oturumdan kalan (uygulanmamış) kayıtları belleğe al
+        for row in self.conn.execute(
+            "SELECT product_id, SUM(change) AS qty FROM JournalEntry GROUP BY product_id"
+        ):
+            self._pending[row["product_id"]] = row["qty"]
+        for row in self.conn.execute("SELECT lines FROM JournalSale"):
+            self._add_pending(json.loads(row["lines"]), -1)
+
+    def _add_pending(self, lines: List[dict], sign: int) -> None:
+        """Fiş satırlarının stok etkisini bekleyen toplama ekler (sign=-1) / düşer (+1)"""
+        for line in lines:
+            pid = line["product_id"]
+            left = self._pending.get(pid, 0) + sign * line["qty"]
+            if left:
+                self._pending[pid] = left
+            else:
+                self._pending.pop(pid, None)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")  # Kayıt döndüğünde diske yazılmış olsun
+        return conn
+
+    # ---------- Kasa tarafı -------------------------------------------
+    def record(self, product_id: int, change: int, reason: str = "SALE",
+               purchase_price: Optional[float] = None) -> str:
+        """
+        Hareketi günlüğe yazar ve boşaltıcıyı uyandırır.
+
+        Returns:
+            str: Hareketin tekillik anahtarı (op_key)
+        """
+        op_key = uuid.uuid4().hex
+        # Kilit, boşaltıcının kaydı bellekteki toplama eklenmeden düşmesini önler
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO JournalEntry(op_key, product_id, change, reason, purchase_price)"
+                " VALUES (?,?,?,?,?)",
+                (op_key, product_id, change, reason, purchase_price),
+            )
+            self.conn.commit()
+            self._pending[product_id] = self._pending.get(product_id, 0) + change
+        self._wake.set()
+        return op_key
+
+    def record_sale(self, lines: List[dict]) -> str:
+        """
+        Tamamlanan satışın fişini günlüğe yazar (bkz. `DatabaseManager.record_sale`).
+        Satırların stok düşüşü aktarılana kadar `pending_delta`'da görünür.
+
+        Returns:
+            str: Fişin tekillik anahtarı (op_key)
+        """
+        op_key = uuid.uuid4().hex
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO JournalSale(op_key, day, lines) VALUES (?,?,?)",
+                (op_key, date.today().isoformat(), json.dumps(lines)),
+            )
+            self.conn.commit()
+            self._add_pending(lines, -1)
+        self._wake.set()
+        return op_key
+
+    def pending_delta(self, product_id: int) -> int:
+        """Ürün için henüz ana veritabanına yazılmamış toplam miktar"""
+        with self._lock:
+            return self._pending.get(product_id, 0)
+
+    def pending_count(self) -> int:
+        return self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM JournalEntry) + (SELECT COUNT(*) FROM JournalSale)"
+        ).fetchone()[0]
+
+    # ---------- Boşaltma ----------------------------------------------
+    def drain_once(self, db, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Bekleyen kayıtlardan bir partiyi ana veritabanına uygular.
+
+        Args:
+            db: `apply_movements` sunan DAO (DatabaseManager veya uzak istemci)
+            conn: Günlük bağlantısı (arka plan iş parçacığının kendi bağlantısı)
+
+        Returns:
+            int: Partideki kayıt sayısı (0 ise bekleyen kayıt yok)
+        """
+        conn = conn or self.conn
+        applied = self._drain_movements(db, conn)
+        if not applied:
+            # Fişler, satırlarındaki hareketlerden sonra aktarılır
+            applied = self._drain_sales(db, conn)
+        return applied
+
+    def _drain_movements(self, db, conn: sqlite3.Connection) -> int:
+        rows = conn.execute(
+            "SELECT id, op_key, product_id, change, reason, purchase_price, timestamp"
+            " FROM JournalEntry ORDER BY id LIMIT ?",
+            (self.batch_size,),
+        ).fetchall()
+        if not rows:
+            return 0
+
+        db.apply_movements([
+            {k: row[k] for k in ("op_key", "product_id", "change", "reason",
+                                 "purchase_price", "timestamp")}
+            for row in rows
+        ])
+        # Ana veritabanı onayladı → günlükten düş
+        conn.execute("DELETE FROM JournalEntry WHERE id <= ?", (rows[-1]["id"],))
+        conn.commit()
+        with self._lock:
+            for row in rows:
+                pid = row["product_id"]
+                left = self._pending.get(pid, 0) - row["change"]
+                if left:
+                    self._pending[pid] = left
+                else:
+                    self._pending.pop(pid, None)
+        return len(rows)
+
+    def _drain_sales(self, db, conn: sqlite3.Connection) -> int:
+        rows = conn.execute(
+            "SELECT id, op_key, day, lines, created_at FROM JournalSale ORDER BY id LIMIT ?",
+            (self.batch_size,),
+        ).fetchall()
+        for row in rows:
+            lines = json.loads(row["lines"])
+            db.record_sale(lines, row["op_key"], row["created_at"], row["day"])
+            conn.execute("DELETE FROM JournalSale WHERE id = ?", (row["id"],))
+            conn.commit()
+            with self._lock:
+                self._add_pending(lines, +1)
+        return len(rows)
+
+    def _run(self, db_factory: Callable, interval: float) -> None:
+        conn = self._connect()
+        db = None
+        backoff = interval
+        while not self._stop.is_set():
+            self._wake.clear()  # Boşaltma sırasında gelen kayıtlar yeniden uyandırsın
+            try:
+                if db is None:
+                    db = db_factory()
+                while self.drain_once(db, conn):
+                    pass
+                self.last_error = None
+                backoff = interval
+            except Exception as e:  # Kilit, ağ kopması, servis hatası…
+                self.last_error = str(e)
+                db = None  # Bir sonraki denemede bağlantıyı yeniden kur
+                backoff = min(backoff * 2, 5.0)
+            self._wake.wait(backoff)
+        conn.close()
+
+    def start(self, db_factory: Callable, interval: float = 1.0) -> None:
+        """
+        Arka plan boşaltıcısını başlatır.
+
+        Args:
+            db_factory: Boşaltıcı iş parçacığında çağrılıp kendi DAO'sunu
+                döndüren fonksiyon (sqlite bağlantıları iş parçacığına özeldir)
+            interval: Yeni kayıt gelmediğinde kontrol aralığı (sn)
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(db_factory, interval),
+                                        name="sales-journal-drain", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Boşaltıcıyı durdurur (o ana kadar uygulanabilenler uygulanmış olur)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        self.conn.close()
@@ -0,0 +1,118 @@
+"""
+stock_take.py
+Stok sayımı (cycle count) oturumu.
+
+Sayım sırasında okutulan barkodlar yalnızca bellekte toplanır; her okutma
+ayrıca ekleme-yalnız (append-only) bir günlük dosyasına tek satır olarak
+yazılır, böylece uygulama çökerse oturum kaldığı yerden yüklenir. Sayım
+bitince farklar `DatabaseManager.apply_stock_count` ile tek bir işlemde
+(transaction) ADJUST hareketi olarak yazılır. Okutma başına veritabanına
+yazma yapılmadığı için on binlerce okutmalık oturumlar yavaşlamaz.
+
+Günlük biçimi (UTF-8, sekme ile ayrılmış):
+    #session	<oturum kimliği>	<başlangıç zamanı>
+    <barkod>	<miktar>
+"""
+
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from models import DB_PATH
+
+STOCK_TAKE_PATH = DB_PATH.parent / "stock_take.log"
+
+
+class StockTakeSession:
+    """Bellek içi sayım toplamları + çökmeye dayanıklı günlük dosyası."""
+
+    def __init__(self, path: Path = STOCK_TAKE_PATH, fsync_every: int = 100):
+        """
+        Args:
+            path: Günlük dosyası; varsa içindeki yarım kalmış oturum yüklenir
+            fsync_every: Kaç okutmada bir dosyanın diske zorla yazılacağı
+                (her satır ayrıca hemen işletim sistemine aktarılır)
+        """
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.counts: Dict[str, int] = {}
+        self.scans = 0
+        self.session_id: Optional[str] = None
+        self.started_at: Optional[str] = None
+        self._unsynced = 0
+        self._file = None
+        if self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if parts[0] == "#session" and len(parts) >= 3:
+                    self.session_id, self.started_at = parts[1], parts[2]
+                elif len(parts) == 2:
+                    try:
+                        self._add(parts[0], int(parts[1]))
+                    except ValueError:
+                        pass  # Çökme anında yarım yazılmış son satır
+
+    def _add(self, barcode: str, qty: int) -> int:
+        total = self.counts.get(barcode, 0) + qty
+        if total:
+            self.counts[barcode] = total
+        else:
+            self.counts.pop(barcode, None)
+        self.scans += 1
+        return total
+
+    def _open(self):
+        if self._file is None:
+            new = self.session_id is None
+            self._file = open(self.path, "a", encoding="utf-8")
+            if new:
+                self.session_id = uuid.uuid4().hex
+                self.started_at = datetime.now().isoformat(timespec="seconds")
+                self._file.write(f"#session\t{self.session_id}\t{self.started_at}\n")
+        return self._file
+
+    @property
+    def active(self) -> bool:
+        """Devam eden (henüz onaylanmamış) bir sayım var mı?"""
+        return self.session_id is not None
+
+    def record(self, barcode: str, qty: int = 1) -> int:
+        """
+        Okutulan barkodu sayıma ekler (düzeltme için qty negatif olabilir).
+
+        Returns:
+            int: Barkodun güncel sayım toplamı
+        """
+        f = self._open()
+        f.write(f"{barcode}\t{qty}\n")
+        f.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+        return self._add(barcode, qty)
+
+    def sync(self) -> None:
+        """Günlüğü diske zorla yazar"""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def finish(self) -> None:
+        """Oturumu kapatır ve günlüğü siler (sayım onaylandı veya iptal edildi)"""
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.counts.clear()
+        self.scans = 0
+        self.session_id = self.started_at = None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,60 @@
+"""
+Ortak test düzeneği: her test geçici dizinde yeni bir veritabanı kullanır.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import DatabaseManager   # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "inventory.db"
+
+
+@pytest.fixture
+def open_db(db_path):
+    """Aynı dosyaya ayrı DatabaseManager açan fabrika (kasa + bakım gibi)"""
+    opened = []
+
+    def factory(path=None, **kwargs):
+        manager = DatabaseManager(path or db_path, **kwargs)
+        opened.append(manager)
+        return manager
+
+    yield factory
+    for manager in opened:
+        manager.close()
+
+
+@pytest.fixture
+def db(open_db):
+    return open_db()
+
+
+def interleave(target, delay: float = 0.2):
+    """
+    `target`'ı ayrı iş parçacığında başlatır ve biraz bekler; çağıran kodun
+    ortasında başka bir bağlantının araya girmesini taklit eder. Dönen
+    iş parçacığı test sonunda join edilmelidir.
+    """
+    errors = []
+
+    def run():
+        try:
+            target()
+        except Exception as e:   # pragma: no cover - yalnızca hata raporu
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.errors = errors
+    thread.start()
+    time.sleep(delay)
+    return thread
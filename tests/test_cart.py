@@ -0,0 +1,54 @@
+"""Sepet: satır ekleme, adet değiştirme, çıkarma ve kuruş cinsinden toplam."""
+
+import pytest
+
+from cart import Cart
+
+
+def product(pid, price):
+    return {"id": pid, "name": f"Ürün {pid}", "unit_price": price}
+
+
+def test_add_merges_lines_and_keeps_first_price():
+    cart = Cart()
+    first = cart.add(product(1, 0.1))
+    cart.add(product(2, 0.2), 3)
+    again = cart.add(product(1, 9.99), 2)         # fiyat sonradan değişse de
+    assert again is first and first.qty == 3 and first.unit_price == 0.1
+    assert len(cart) == 2 and cart.item_count == 6
+    assert cart.total_cents == 90 and cart.total == 0.9   # 0.1 + 0.2 kayan nokta hatası yok
+
+
+def test_remove_moves_last_line_into_the_gap():
+    cart = Cart()
+    for pid in (1, 2, 3):
+        cart.add(product(pid, 1.0))
+    moved = cart.remove(1)
+    assert moved.product_id == 3 and moved.row == 0
+    assert [line.product_id for line in cart] == [3, 2]
+    assert all(cart.line_at(line.row) is line for line in cart)
+    assert cart.remove(2) is None                 # son satır: taşınan yok
+    assert cart.total_cents == 100 and cart.item_count == 1
+
+
+def test_set_qty_to_zero_removes_the_line():
+    cart = Cart()
+    cart.add(product(1, 2.5), 2)
+    cart.add(product(2, 1.0))
+    line, moved = cart.set_qty(1, 5)
+    assert line.qty == 5 and moved is None and cart.total_cents == 1350
+    line, moved = cart.set_qty(1, 0)
+    assert moved.product_id == 2 and cart.line(1) is None
+    assert cart.total_cents == 100 and cart.item_count == 1
+    assert cart.line_at(5) is None and cart.line_at(-1) is None
+
+
+def test_receipt_lines_and_clear():
+    cart = Cart()
+    cart.add(product(1, 2.5), 2)
+    assert cart.receipt_lines() == [
+        {"product_id": 1, "name": "Ürün 1", "qty": 2, "unit_price": 2.5}]
+    cart.clear()
+    assert not cart and cart.total_cents == 0 and cart.item_count == 0
+    with pytest.raises(KeyError):
+        cart.remove(1)
@@ -0,0 +1,90 @@
+"""Bellekteki ürün kataloğunun başka bağlantıların yazmalarıyla güncel kalması."""
+
+import os
+import sqlite3
+import time
+
+import pytest
+
+
+def test_sees_products_added_by_another_connection(open_db, db):
+    other = open_db()                      # ör. ikinci kasa veya CLI içe aktarma
+    pid = db.add_product("Çay", "1", "Raf", 10.0)
+    assert db.catalog.by_barcode("1").unit_price == 10.0
+
+    new_id = other.add_product("Kahve", "2", "Raf", 30.0)
+    other.update_unit_price(pid, 12.5)
+
+    assert db.catalog.by_barcode("2").id == new_id
+    assert db.catalog.by_barcode("1").unit_price == 12.5
+    assert {r.barcode for r in db.catalog.all()} == {"1", "2"}
+
+
+def test_own_writes_do_not_reload(db, monkeypatch):
+    pid = db.add_product("Çay", "1", "Raf", 10.0)
+    record = db.catalog.by_barcode("1")
+    loads = []
+    monkeypatch.setattr(db.catalog, "load", lambda: loads.append(1))
+    db.update_unit_price(pid, 11.0)
+    db.add_product("Kahve", "2", "Raf", 30.0)
+    assert db.catalog.by_barcode("2").name == "Kahve"
+    assert record.unit_price == 11.0       # elde tutulan kayıt yerinde güncellendi
+    assert loads == []
+
+
+def test_check_interval_limits_version_reads(open_db, db):
+    db.add_product("Çay", "1", "Raf", 10.0)
+    db.catalog.check_interval = 60.0
+    db.catalog.by_barcode("1")
+    other = open_db()
+    other.update_unit_price(db.catalog.by_barcode("1").id, 20.0)
+    assert db.catalog.by_barcode("1").unit_price == 10.0    # aralık dolmadı
+    db.catalog._checked = time.monotonic() - 61
+    assert db.catalog.by_barcode("1").unit_price == 20.0
+
+
+def test_loaded_catalog_survives_an_unreachable_database(db, monkeypatch):
+    db.add_product("Çay", "1", "Raf", 10.0)
+    assert db.catalog.by_barcode("1").name == "Çay"
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "product_version", locked)
+    monkeypatch.setattr(db, "list_products", locked)
+    assert db.catalog.by_barcode("1").name == "Çay"      # bellekteki kayıt
+    assert db.catalog.by_barcode("404") is None
+    db.catalog.invalidate()
+    with pytest.raises(sqlite3.OperationalError):        # hiç yüklenmemiş katalog
+        db.catalog.by_barcode("1")
+
+
+def test_till_scans_known_barcode_while_offline(db, monkeypatch, tmp_path):
+    pytest.importorskip("PyQt6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+    from controllers import SalesTab
+    from sales_journal import SalesJournal
+
+    app = QApplication.instance() or QApplication([])
+    warnings = []
+    monkeypatch.setattr(QMessageBox, "warning", lambda *args: warnings.append(args[1]))
+    pid = db.add_product("Çay", "1", "Raf", 10.0)
+    db.change_stock(pid, 5, "PURCHASE", 6.0)
+    journal = SalesJournal(tmp_path / "journal.db")
+    tab = SalesTab(db, journal)
+    try:
+        tab._scan_code("1")                               # katalog ve stok yüklendi
+
+        def offline(*args, **kwargs):
+            raise sqlite3.OperationalError("unable to open database file")
+
+        for name in ("product_version", "list_products", "get_stock_level"):
+            monkeypatch.setattr(db, name, offline)
+        tab._scan_code("1")
+        assert warnings == []
+        assert tab.cart.line(pid).qty == 2
+    finally:
+        tab.deleteLater()
+        app.processEvents()
+        journal.close()
@@ -0,0 +1,56 @@
+"""Günlük satış özeti (DailySales) ve tahmin modülünün içe aktarma maliyeti."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from conftest import interleave
+
+
+def daily_totals(db):
+    return [tuple(r) for r in db.conn.execute(
+        "SELECT day, product_id, qty, revenue FROM DailySales ORDER BY day, product_id")]
+
+
+def test_rollup_matches_rebuild(db):
+    pid = db.add_product("Defter", "300", "Raf", 12.5)
+    db.change_stock(pid, 50, "PURCHASE", 6.0)
+    for qty in (3, 1, 4):
+        db.change_stock(pid, -qty, "SALE")
+        db.daily_sales_since("2000-01-01")     # ara ara artımlı işle
+    db.change_stock(pid, 1, "ADJUST")          # iade
+    db.daily_sales_since("2000-01-01")
+    incremental = daily_totals(db)
+    assert [row[2:] for row in incremental] == [(7, 87.5)]
+    db.rebuild_daily_sales()
+    assert daily_totals(db) == incremental
+
+
+def test_concurrent_rollup_counts_each_sale_once(open_db, db):
+    other = open_db()
+    pid = db.add_product("Defter", "300", "Raf", 10.0)
+    db.change_stock(pid, -2, "SALE")
+
+    rollup = db.sales_rollup
+    read = rollup.watermark
+    threads = []
+
+    def watermark():
+        rollup.watermark = read
+        value = read()
+        threads.append(interleave(other.sales_rollup.sync))
+        return value
+
+    rollup.watermark = watermark
+    rollup.sync()
+    threads[0].join()
+    assert threads[0].errors == []
+    assert [row[2:] for row in daily_totals(db)] == [(2, 20.0)]
+
+
+def test_models_import_does_not_load_pandas():
+    root = Path(__file__).resolve().parent.parent
+    code = "import sys, models; print('pandas' in sys.modules, 'numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True,
+                         text=True, check=True).stdout
+    assert out.split() == ["False", "False"]
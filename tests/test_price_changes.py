@@ -0,0 +1,44 @@
+"""Birim fiyat günlüğü (PriceChange) ve zamandaki fiyat sorguları."""
+
+
+def backdate(db, product_id, seconds):
+    """Ürünün mevcut fiyat kayıtlarını geçmişe kaydırır (aynı saniyedeki değişiklikler birleşir)"""
+    db.conn.execute(
+        "UPDATE PriceChange SET effective_from = effective_from - ? WHERE product_id = ?",
+        (seconds, product_id),
+    )
+    db.conn.commit()
+
+
+def test_price_changes_are_logged_by_trigger(db):
+    pid = db.add_product("Su", "500", "Raf", 5.0)
+    assert [row["price"] for row in db.get_price_changes(pid)] == [5.0]
+    backdate(db, pid, 100)
+    db.update_unit_price(pid, 5.0)                # aynı fiyat: kayıt yok
+    db.update_unit_price(pid, 6.5)
+    changes = db.get_price_changes(pid)
+    assert [row["price"] for row in changes] == [6.5, 5.0]
+    assert changes[0]["effective_from"] - changes[1]["effective_from"] >= 100
+
+    db.delete_product(pid)
+    assert db.get_price_changes(pid) == []
+
+
+def test_price_at_picks_the_change_in_effect(db):
+    pid = db.add_product("Su", "500", "Raf", 5.0)
+    backdate(db, pid, 200)
+    db.update_unit_price(pid, 6.0)
+    backdate(db, pid, 100)
+    db.update_unit_price(pid, 7.0)
+    first, second, third = sorted(row["effective_from"] for row in db.get_price_changes(pid))
+
+    assert db.price_at(pid, first - 50) == 5.0    # ilk kayıttan önce: bilinen ilk fiyat
+    assert db.price_at(pid, first) == 5.0
+    assert db.price_at(pid, second - 1) == 5.0
+    assert db.price_at(pid, second) == 6.0
+    assert db.price_at(pid, third + 10) == 7.0
+    assert db.price_at(pid + 1, third) is None    # günlükte kaydı olmayan ürün
+
+    lookups = [(pid, third), (pid + 1, first), (pid, first - 50), (pid, second)]
+    assert db.prices_at(lookups) == [db.price_at(p, t) for p, t in lookups]
+    assert db.prices_at([]) == []
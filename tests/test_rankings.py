@@ -0,0 +1,110 @@
+"""En çok satanlar: artımlı pencere kaydırma ile baştan kurulumun eşitliği."""
+
+import queue
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import interleave
+
+TODAY = date.today()
+
+
+def noon(day):
+    return int(datetime(day.year, day.month, day.day, 12).timestamp())
+
+
+def snapshot(db):
+    return [tuple(round(v, 9) if isinstance(v, float) else v for v in row)
+            for row in db.conn.execute(
+                "SELECT days, product_id, qty, revenue, qty_rank, revenue_rank, share, abc"
+                " FROM SalesRanking ORDER BY days, product_id")]
+
+
+@pytest.fixture
+def sales(db):
+    rng = random.Random(7)
+    pids = [db.add_product(f"Ürün {i}", str(100 + i), "Raf", 1.0 + i) for i in range(12)]
+    moves = []
+    for back in range(1, 120):
+        for n in range(rng.randint(0, 6)):
+            moves.append({"op_key": f"{back}:{n}", "product_id": rng.choice(pids),
+                          "change": -rng.randint(1, 5), "reason": "SALE",
+                          "ts": noon(TODAY - timedelta(days=back))})
+    db.apply_movements(moves)
+    db.sales_rollup.sync()
+    return pids
+
+
+def test_incremental_refresh_matches_rebuild(db, sales):
+    ranking = db.sales_ranking
+    start = TODAY - timedelta(days=40)
+    days, snapshots = start, {}
+    step = iter([1, 2, 1, 5, 1, 1, 7, 3] * 10)
+    while days <= TODAY:
+        ranking.refresh(as_of=days)
+        snapshots[days] = snapshot(db)
+        days += timedelta(days=next(step))
+    assert snapshots[start]
+
+    for days, incremental in snapshots.items():
+        ranking.rebuild(as_of=days)
+        assert snapshot(db) == incremental, days
+
+
+def test_late_movement_triggers_rebuild(db, sales):
+    db.refresh_sales_ranking()
+    db.apply_movements([{"op_key": "late", "product_id": sales[0], "change": -500,
+                         "reason": "SALE", "ts": noon(TODAY - timedelta(days=3))}])
+    top = db.top_sellers(7, "qty", 1)
+    assert top[0]["product_id"] == sales[0] and top[0]["abc"] == "A"
+    incremental = snapshot(db)
+    db.sales_ranking.rebuild()
+    assert snapshot(db) == incremental
+
+
+def test_concurrent_refresh_shifts_windows_once(open_db, db, sales):
+    other = open_db()
+    ranking = db.sales_ranking
+    ranking.refresh(as_of=TODAY - timedelta(days=10))
+    read = ranking.state
+    threads = []
+
+    def state():
+        ranking.state = read
+        value = read()
+        threads.append(interleave(other.sales_ranking.refresh))
+        return value
+
+    ranking.state = state
+    ranking.refresh()
+    threads[0].join()
+    assert threads[0].errors == []
+    incremental = snapshot(db)
+    ranking.rebuild()
+    assert snapshot(db) == incremental
+
+
+def test_report_job_reads_ranking_kept_by_maintenance(open_db, db, sales, monkeypatch):
+    import report_jobs
+
+    assert "stock" in db.maintenance.due_tasks()
+    db.maintenance.run(["stock"])
+    assert "stock" not in db.maintenance.due_tasks()
+
+    reader = open_db(read_only=True, profile="reporting")   # işçi sürecin bağlantısı
+    monkeypatch.setattr(report_jobs, "_db", reader)
+    monkeypatch.setattr(report_jobs, "_progress", queue.Queue())
+    monkeypatch.setattr(report_jobs, "_cancelled", {})
+    days, rows, summary = report_jobs._run_job(
+        1, "top_sellers", {"days": 7, "by": "qty", "limit": 3})
+    assert days == 7 and len(rows) == 3
+    assert rows == [dict(row) for row in db.sales_ranking.top(7, "qty", 3)]
+    assert summary == [dict(row) for row in db.sales_ranking.abc_summary(7)]
+
+    # Gün dönümü: sıralama bugünün gerisinde kaldıysa "stock" yeniden vadeli
+    db.conn.execute("UPDATE SalesRankingState SET as_of = ?",
+                    ((TODAY - timedelta(days=1)).isoformat(),))
+    db.conn.commit()
+    assert "stock" in db.maintenance.due_tasks()
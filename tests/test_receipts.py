@@ -0,0 +1,36 @@
+"""Fişler: satış hareketleri fişle aynı işlemde ve yalnızca bir kez yazılır."""
+
+
+def sale_movements(db):
+    return db.conn.execute(
+        "SELECT product_id, change FROM StockMovement WHERE reason = 'SALE' ORDER BY id"
+    ).fetchall()
+
+
+def test_receipt_writes_its_movements(db):
+    a = db.add_product("Su", "500", "Raf", 5.0)
+    b = db.add_product("Çay", "501", "Raf", 30.0)
+    db.change_stock(a, 10, "PURCHASE", 2.0)
+    db.change_stock(b, 10, "PURCHASE", 20.0)
+
+    sale_id = db.record_sale([
+        {"product_id": a, "name": "Su", "qty": 3, "unit_price": 5.0},
+        {"product_id": b, "name": "Çay", "qty": 1, "unit_price": 30.0},
+    ])
+    assert db.get_sale(sale_id)["total"] == 45.0
+    assert [tuple(m) for m in sale_movements(db)] == [(a, -3), (b, -1)]
+    assert db.get_stock_level(a) == 7 and db.get_stock_level(b) == 9
+
+
+def test_resent_receipt_is_written_once(db):
+    pid = db.add_product("Su", "500", "Raf", 5.0)
+    db.change_stock(pid, 10, "PURCHASE", 2.0)
+    lines = [{"product_id": pid, "name": "Su", "qty": 2, "unit_price": 5.0}]
+
+    first = db.record_sale(lines, op_key="k1", created_at="2026-10-01 09:30:00",
+                           day="2026-10-01")
+    assert db.record_sale(lines, op_key="k1") == first
+    assert len(sale_movements(db)) == 1
+    assert db.get_stock_level(pid) == 8
+    ts = db.conn.execute("SELECT ts FROM StockMovement WHERE op_key = 'k1:0'").fetchone()[0]
+    assert ts == 1790847000                     # satışın gerçek zamanı (UTC)
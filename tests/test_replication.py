@@ -0,0 +1,86 @@
+"""Mağazalar arası eşitleme: tekrar güvenliği ve üç mağazanın yakınsaması."""
+
+import pytest
+
+import replication
+
+
+@pytest.fixture
+def stores(open_db, tmp_path):
+    return [open_db(tmp_path / f"{name}.db") for name in ("a", "b", "c")]
+
+
+def state(db):
+    """Barkod → (ad, fiyat, stok) ve genel hareket anahtarları"""
+    products = {
+        row["barcode"]: (row["name"], row["unit_price"], db.get_stock_level(row["id"]))
+        for row in db.list_products()
+    }
+    keys = {
+        row[0] for row in db.conn.execute(
+            "SELECT COALESCE(m.op_key, c.origin || ':' || m.id) FROM StockMovement m"
+            " JOIN ChangeLog c ON c.entity = 'movement' AND c.ref = m.id")
+    }
+    return products, keys
+
+
+def test_reapplying_a_batch_is_a_no_op(stores):
+    a, b, _ = stores
+    pid = a.add_product("Su", "500", "Raf", 5.0)
+    a.change_stock(pid, 10, "PURCHASE", 2.0)
+    a.change_stock(pid, -3, "SALE")
+
+    batch = a.export_changes(0, b.store_id())
+    first = b.apply_changes(batch)
+    assert first["applied"] == 3
+    again = b.apply_changes(batch)               # imleç ilerlemeden önce çökmüş gibi
+    assert again["applied"] == 0 and again["upto"] == first["upto"]
+    assert replication.pull(b, a)["applied"] == 0
+    assert state(b) == state(a)
+
+    with pytest.raises(ValueError):
+        b.apply_changes(dict(batch, since=batch["upto"] + 5))   # günlükte boşluk
+
+
+def test_file_import_is_idempotent(stores, tmp_path):
+    a, b, _ = stores
+    pid = a.add_product("Su", "500", "Raf", 5.0)
+    a.change_stock(pid, 4, "PURCHASE", 2.0)
+    path = tmp_path / "changes.jsonl"
+    assert replication.export_file(a, path, batch_size=1) == 2
+    assert replication.import_file(b, path)["applied"] == 2
+    assert replication.import_file(b, path)["applied"] == 0
+    assert state(b) == state(a)
+
+
+def test_three_stores_converge(stores):
+    a, b, c = stores
+    pa = a.add_product("Su", "500", "Raf", 5.0)
+    a.change_stock(pa, 30, "PURCHASE", 2.0)
+    pc = c.add_product("Çay", "600", "Depo", 40.0)
+    c.change_stock(pc, 12, "PURCHASE", 25.0)
+    replication.sync(a, b, batch_size=2)
+    replication.sync(b, c, batch_size=2)
+
+    # Her mağaza ayrı ayrı satış yapar ve aynı ürünü düzenler
+    for db, qty in ((a, -2), (b, -5), (c, -1)):
+        su = db.find_product_by_barcode("500")
+        db.change_stock(su["id"], qty, "SALE")
+    b.update_unit_price(b.find_product_by_barcode("600")["id"], 42.0)
+    c.update_unit_price(c.find_product_by_barcode("600")["id"], 45.0)
+    c.add_product("Simit", "700", "Raf", 10.0)
+
+    for _ in range(2):
+        for left, right in ((a, b), (b, c), (c, a)):
+            replication.sync(left, right, batch_size=3)
+
+    expected = state(a)
+    assert state(b) == expected and state(c) == expected
+    products, _ = expected
+    assert products["500"][2] == 30 - 2 - 5 - 1
+    assert products["600"][1] in (42.0, 45.0)    # aynı saniye: mağaza kimliği karar verir
+    assert set(products) == {"500", "600", "700"}
+    # Yakınsamadan sonra eşitleme bir şey uygulamaz
+    for left, right in ((a, b), (b, c), (c, a)):
+        pulled, pushed = replication.sync(left, right)
+        assert pulled["applied"] == pushed["applied"] == 0
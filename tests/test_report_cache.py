@@ -0,0 +1,52 @@
+"""Sürüm etiketli rapor önbelleği: artımlı satış toplamları ve sayaçlar."""
+
+import threading
+from datetime import date
+
+from report_cache import ReportCache
+
+TODAY = date.today().isoformat()
+
+
+def sell(db, pid, key, qty=1):
+    db.record_sale([{"product_id": pid, "name": "Çay", "qty": qty, "unit_price": 10.0}],
+                   op_key=key)
+
+
+def test_incremental_sales_report_matches_fresh_cache(db):
+    pid = db.add_product("Çay", "1", "Raf", 10.0)
+    sell(db, pid, "a", 2)
+    cache = db.report_cache
+    assert list(cache.sales_report(TODAY, TODAY)) == [("Çay", 2, 20.0)]
+    assert cache.sales_report(TODAY, TODAY) == [("Çay", 2, 20.0)]
+    sell(db, pid, "b", 3)
+    assert cache.sales_report(TODAY, TODAY) == ReportCache(db).sales_report(TODAY, TODAY)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_concurrent_readers_count_each_sale_once(db):
+    pid = db.add_product("Çay", "1", "Raf", 10.0)
+    cache = db.report_cache
+    stop = threading.Event()
+    calls, errors = [0] * 4, []
+
+    def reader(i):
+        try:
+            while not stop.is_set():
+                cache.sales_report(TODAY, TODAY)
+                calls[i] += 1
+        except Exception as e:   # pragma: no cover - yalnızca hata raporu
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for n in range(200):
+        sell(db, pid, f"s{n}")
+    stop.set()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert cache.sales_report(TODAY, TODAY) == [("Çay", 200, 2000.0)]
+    assert cache.hits + cache.misses == sum(calls) + 1
@@ -0,0 +1,38 @@
+"""Rapor sekmesi sorgularını arayüz iş parçacığı yerine iş yürütücüsünde çalıştırır."""
+
+import os
+import time
+
+import pytest
+
+
+def test_report_tab_loads_daily_rows_in_a_job(db, db_path, monkeypatch):
+    pytest.importorskip("PyQt6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from controllers import ReportTab
+    from report_jobs import ReportJobRunner
+
+    app = QApplication.instance() or QApplication([])
+    pid = db.add_product("Çay", "1", "Raf", 10.0)
+    db.record_sale([{"product_id": pid, "name": "Çay", "qty": 2, "unit_price": 10.0}],
+                   op_key="t1")
+
+    def on_gui_thread(*args, **kwargs):
+        raise AssertionError("rapor sorgusu arayüz iş parçacığında çalıştı")
+
+    monkeypatch.setattr(db, "daily_sales_report", on_gui_thread)
+    jobs = ReportJobRunner(db_path, max_workers=1)
+    tab = ReportTab(db, jobs)
+    try:
+        assert tab.pending_refresh is not None
+        deadline = time.monotonic() + 60
+        while tab.pending_refresh is not None and time.monotonic() < deadline:
+            tab.poll_jobs()
+            time.sleep(0.05)
+        assert tab.pending_refresh is None
+        assert tab.table.rowCount() == 1 and tab.table.item(0, 0).text() == "Çay"
+    finally:
+        jobs.shutdown()
+        tab.deleteLater()
+        app.processEvents()
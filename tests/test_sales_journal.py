@@ -0,0 +1,95 @@
+"""Kasa günlüğü: boşaltmanın tekrar güvenliği ve çökme sonrası yeniden oynatma."""
+
+import sqlite3
+
+import pytest
+
+from sales_journal import SalesJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = SalesJournal(tmp_path / "journal.db", batch_size=2)
+    yield journal
+    journal.close()
+
+
+@pytest.fixture
+def product(db):
+    pid = db.add_product("Su", "500", "Raf", 5.0)
+    db.change_stock(pid, 20, "PURCHASE", 2.0)
+    return pid
+
+
+def drain_all(journal, db):
+    while journal.drain_once(db):
+        pass
+
+
+def test_drain_applies_every_entry_once(db, journal, product):
+    for _ in range(5):
+        journal.record(product, -1)
+    assert journal.pending_delta(product) == -5
+    drain_all(journal, db)
+    assert db.get_stock_level(product) == 15
+    assert journal.pending_count() == 0 and journal.pending_delta(product) == 0
+    drain_all(journal, db)                   # tekrar boşaltmak bir şey yazmaz
+    assert db.get_stock_level(product) == 15
+
+
+def test_replay_after_crash_before_journal_delete(db, journal, product, tmp_path):
+    journal.record(product, -3)
+    journal.record(product, -2)
+    # Ana veritabanı partiyi yazdı ama kasa günlükten düşmeden çöktü
+    rows = journal.conn.execute(
+        "SELECT op_key, product_id, change, reason, purchase_price, timestamp"
+        " FROM JournalEntry").fetchall()
+    assert db.apply_movements([dict(row) for row in rows]) == 2
+    journal.close()
+
+    reopened = SalesJournal(tmp_path / "journal.db")
+    try:
+        assert reopened.pending_delta(product) == -5      # bekleyenler geri yüklendi
+        drain_all(reopened, db)
+        assert db.get_stock_level(product) == 15
+        assert reopened.pending_count() == 0
+    finally:
+        reopened.close()
+
+
+def test_invalid_entry_is_not_dropped(db, journal, product):
+    journal.record(product, -1, reason="BOGUS")           # CHECK ihlali
+    with pytest.raises(sqlite3.IntegrityError):
+        journal.drain_once(db)
+    assert journal.pending_count() == 1                   # günlükte kaldı
+    assert db.get_stock_level(product) == 20
+
+
+def test_sale_receipts_drain_once(db, journal, product):
+    journal.record_sale([{"product_id": product, "name": "Su", "qty": 2, "unit_price": 5.0}])
+    assert journal.pending_delta(product) == -2
+    drain_all(journal, db)
+    drain_all(journal, db)
+    sales = db.recent_sales()
+    assert len(sales) == 1 and sales[0]["total"] == 10.0
+    assert db.get_stock_level(product) == 18                # hareket fişle birlikte, bir kez
+    assert journal.pending_delta(product) == 0
+
+
+def test_receipt_replay_after_crash(db, journal, product, tmp_path):
+    lines = [{"product_id": product, "name": "Su", "qty": 3, "unit_price": 5.0}]
+    journal.record_sale(lines)
+    # Ana veritabanı fişi yazdı ama kasa günlükten düşmeden çöktü
+    row = journal.conn.execute("SELECT op_key, day, created_at FROM JournalSale").fetchone()
+    db.record_sale(lines, row["op_key"], row["created_at"], row["day"])
+    journal.close()
+
+    reopened = SalesJournal(tmp_path / "journal.db")
+    try:
+        assert reopened.pending_delta(product) == -3
+        drain_all(reopened, db)
+        assert db.get_stock_level(product) == 17
+        assert len(db.recent_sales()) == 1
+        assert reopened.pending_delta(product) == 0
+    finally:
+        reopened.close()
@@ -0,0 +1,81 @@
+"""Envanter servisi: gövde sınırı, argüman hataları ve anahtar denetimi."""
+
+import http.client
+import json
+
+import pytest
+
+from inventory_client import RemoteDatabaseManager, ServiceError
+from inventory_service import MAX_BODY, InventoryService
+
+
+@pytest.fixture
+def start_service(db_path):
+    services = []
+
+    def start(**kwargs):
+        service = InventoryService(db_path, port=0, **kwargs)
+        service.start_in_thread()
+        services.append(service)
+        return service
+
+    yield start
+    for service in services:
+        service.stop()
+
+
+def post(port, method, body, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("POST", f"/api/{method}", body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"{}")
+    finally:
+        conn.close()
+
+
+def test_oversized_body_is_refused(start_service):
+    service = start_service()
+    conn = http.client.HTTPConnection("127.0.0.1", service.port, timeout=5)
+    conn.putrequest("POST", "/api/list_products")
+    conn.putheader("Content-Length", str(MAX_BODY + 1))
+    conn.endheaders()
+    assert conn.getresponse().status == 413
+    conn.close()
+
+
+def test_only_binding_errors_are_bad_requests(start_service, monkeypatch):
+    service = start_service()
+    status, data = post(service.port, "get_stock_level",
+                        json.dumps({"args": [1, 2, 3]}).encode())
+    assert status == 400 and data["error"] == "BadRequest"
+
+    # Metodun içindeki TypeError istemcinin hatası değildir
+    monkeypatch.setattr(service.db, "search_products", lambda term: term + 1)
+    status, data = post(service.port, "search_products",
+                        json.dumps({"args": ["su"]}).encode())
+    assert status == 500 and data["error"] == "TypeError"
+
+
+def test_non_loopback_host_needs_token(db_path):
+    with pytest.raises(ValueError):
+        InventoryService(db_path, host="0.0.0.0", port=0)
+
+
+def test_token_is_required_when_configured(start_service):
+    service = start_service(host="0.0.0.0", token="s3cret")
+    status, _ = post(service.port, "list_products", b"{}")
+    assert status == 401
+    status, _ = post(service.port, "list_products", b"{}",
+                     {"Authorization": "Bearer wrong"})
+    assert status == 401
+
+    client = RemoteDatabaseManager(f"http://127.0.0.1:{service.port}", token="s3cret")
+    try:
+        assert client.ping()
+        assert client.add_product("Su", "500", "Raf", 5.0)
+        assert len(client.list_products()) == 1
+        with pytest.raises(ServiceError):
+            RemoteDatabaseManager(f"http://127.0.0.1:{service.port}").list_products()
+    finally:
+        client.close()
@@ -0,0 +1,53 @@
+"""Geçmiş tarihli stok: kontrol noktaları ve sonradan yazılan geçmiş hareketler."""
+
+from datetime import datetime
+
+
+def ts(*args):
+    return int(datetime(*args).timestamp())
+
+
+def naive(db, product_id, at):
+    return db.conn.execute(
+        "SELECT COALESCE(SUM(change), 0) FROM StockMovement WHERE product_id = ? AND ts < ?",
+        (product_id, at),
+    ).fetchone()[0]
+
+
+def move(db, key, product_id, change, at, reason="ADJUST"):
+    db.apply_movements([{"op_key": key, "product_id": product_id, "change": change,
+                         "reason": reason, "ts": at}])
+
+
+def test_late_movements_behind_checkpoints_are_counted(db):
+    a = db.add_product("Su", "500", "Raf", 5.0)
+    b = db.add_product("Çay", "501", "Raf", 30.0)
+    move(db, "a1", a, 50, ts(2026, 1, 10), "PURCHASE")
+    move(db, "b1", b, 20, ts(2026, 2, 5), "PURCHASE")
+    move(db, "a2", a, -7, ts(2026, 3, 15), "SALE")
+    move(db, "b2", b, -4, ts(2026, 4, 2), "SALE")
+    assert db.ensure_checkpoints(ts(2026, 5, 20)) == 4
+
+    # Kontrol noktalarından sonra yazılan, ama onlardan önceki günlere düşen hareketler
+    move(db, "late1", a, -3, ts(2026, 1, 20), "SALE")      # ilk noktadan önce
+    move(db, "late2", b, 6, ts(2026, 3, 1, 12), "PURCHASE")  # iki nokta arasında
+    move(db, "late3", a, 2, ts(2026, 4, 30))                # son noktadan önce
+
+    points = [ts(2026, 1, 15), ts(2026, 2, 1), ts(2026, 3, 1), ts(2026, 3, 2),
+              ts(2026, 4, 1), ts(2026, 5, 1), ts(2026, 5, 10)]
+    for at in points:
+        for pid in (a, b):
+            assert db.product_stock_as_of(pid, at) == naive(db, pid, at), (pid, at)
+        snapshot = {row["product_id"]: row["qty"] for row in db.stock_as_of(at)}
+        assert snapshot.get(a, 0) == naive(db, a, at)
+        assert snapshot.get(b, 0) == naive(db, b, at)
+
+
+def test_movements_at_the_instant_are_excluded(db):
+    pid = db.add_product("Su", "500", "Raf", 5.0)
+    at = ts(2026, 6, 1)
+    move(db, "p", pid, 10, at - 1, "PURCHASE")
+    move(db, "s", pid, -4, at, "SALE")
+    db.ensure_checkpoints(ts(2026, 8, 1))
+    assert db.product_stock_as_of(pid, at) == 10
+    assert db.product_stock_as_of(pid, at + 1) == 6
@@ -0,0 +1,54 @@
+"""Sayım: tam sayım farkları ve onayın tekrar güvenliği."""
+
+import os
+
+import pytest
+
+from stock_take import StockTakeSession
+
+
+@pytest.fixture
+def products(db):
+    scanned = db.add_product("Su", "500", "Raf", 5.0)
+    loose = [db.add_product(name, None, "Raf", 1.0) for name in ("Simit", "Poğaça")]
+    for pid, qty in [(scanned, 10), (loose[0], 4), (loose[1], 7)]:
+        db.change_stock(pid, qty, "PURCHASE", 1.0)
+    return scanned, loose
+
+
+@pytest.fixture
+def session(tmp_path):
+    session = StockTakeSession(tmp_path / "stock_take.log")
+    yield session
+    session.finish()
+
+
+def test_full_count_keeps_products_without_barcode_apart(db, products, session):
+    pytest.importorskip("PyQt6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from controllers import StockTakeTab
+
+    app = QApplication.instance() or QApplication([])
+    scanned, loose = products
+    tab = StockTakeTab(db, lambda: None, session)
+    tab.count("500", 8)
+    tab.full_check.setChecked(True)
+    tab.preview()
+
+    assert tab.table.rowCount() == 3
+    diffs = {tab.table.item(r, 1).text(): tab.table.item(r, 4).text()
+             for r in range(tab.table.rowCount())}
+    assert diffs == {"Su": "-2", "Simit": "-4", "Poğaça": "-7"}
+    assert set(tab.rows) == {"500", *loose}
+    tab.deleteLater()
+    app.processEvents()
+
+
+def test_confirming_a_count_twice_writes_once(db, products):
+    scanned, loose = products
+    counts = {"500": 12}
+    assert db.apply_stock_count(counts, "s1", full=True) == 3
+    assert db.apply_stock_count(counts, "s1", full=True) == 0
+    assert db.get_stock_level(scanned) == 12
+    assert [db.get_stock_level(pid) for pid in loose] == [0, 0]
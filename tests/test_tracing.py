@@ -0,0 +1,75 @@
+"""İzleme: yüzdelikler ve tarama → ekran span'inin çizimi kapsaması."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from tracing import StageHistogram, Tracer, percentile, tracer
+
+
+def test_histogram_uses_shared_percentile():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    hist = StageHistogram()
+    for v in values:
+        hist.add(v)
+    for p in (0, 50, 90, 100):
+        assert hist.percentile(p) == percentile(values, p)
+    assert percentile(values, 50) == 3.0 and percentile([], 50) == 0.0
+
+
+def test_format_histogram_reads_counts_under_the_lock():
+    t = Tracer(enabled=True)
+    for ms in (1, 1, 3):
+        t.record("sales.scan", 0, ms * 1_000_000)
+    out = []
+    with t._lock:                       # başka bir iş parçacığı kayıt yazıyor
+        reader = threading.Thread(target=lambda: out.append(t.format_histogram("sales.scan")))
+        reader.start()
+        reader.join(0.2)
+        assert reader.is_alive()
+    reader.join()
+    assert out[0].splitlines()[0] == "sales.scan (ms)" and len(out[0].splitlines()) == 3
+    assert t.format_histogram("yok") == "yok: kayıt yok"
+
+
+def test_scan_to_screen_ends_after_repaint():
+    pytest.importorskip("PyQt6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QEvent, QObject
+    from PyQt6.QtWidgets import QApplication, QLabel
+
+    from barcode_handler import BarcodeHandler
+
+    app = QApplication.instance() or QApplication([])
+    label = QLabel("-")
+    label.show()
+    app.processEvents()
+
+    painted = []
+
+    class PaintWatch(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                painted.append(time.perf_counter_ns())
+            return False
+
+    watch = PaintWatch()
+    label.installEventFilter(watch)
+    handler = BarcodeHandler()
+    handler.barcode_detected.connect(label.setText)
+
+    tracer.reset()
+    tracer.enable()
+    try:
+        handler.buffer = "8690000000001"
+        handler.process_buffer()
+    finally:
+        tracer.disable()
+
+    span = next(e for e in tracer.events if e["name"] == "scan_to_screen")
+    end_ns = tracer._epoch_ns + (span["ts"] + span["dur"]) * 1000
+    assert painted and painted[0] <= end_ns
+    tracer.reset()
+    label.close()
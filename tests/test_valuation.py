@@ -0,0 +1,105 @@
+"""Stok değerleme: FIFO / ortalama maliyet, artımlı işleme ve yeniden kurma."""
+
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import interleave
+
+
+@pytest.fixture
+def product(db):
+    return db.add_product("Kalem", "100", "Raf", 10.0)
+
+
+def snapshot(db):
+    return db.stock_value(), [tuple(r) for r in db.stock_valuation()]
+
+
+def test_fifo_and_average_cost(db, product):
+    db.change_stock(product, 10, "PURCHASE", 5.0)
+    db.change_stock(product, 10, "PURCHASE", 7.0)
+    db.change_stock(product, -12, "SALE")
+
+    # FIFO: 10 × 5 + 2 × 7 tüketildi, 8 × 7 kaldı; ortalama 6
+    assert db.stock_value() == {"fifo": 56.0, "average": 48.0}
+    today = date.today().isoformat()
+    (row,) = db.cogs_report(today, today)
+    assert (row["qty"], row["cogs_fifo"], row["cogs_avg"]) == (12, 64.0, 72.0)
+    assert db.verify_valuation() == []
+
+
+def test_sale_reversal_and_stocktake(db, product):
+    db.change_stock(product, 10, "PURCHASE", 4.0)
+    db.change_stock(product, -3, "SALE")
+    db.change_stock(product, 1, "ADJUST")          # iade
+    db.apply_movements([{"op_key": "stocktake:1:1", "product_id": product,
+                         "change": -2, "reason": "ADJUST"}])   # fire
+    today = date.today().isoformat()
+    (row,) = db.cogs_report(today, today)
+    assert row["qty"] == 4 and row["cogs_fifo"] == pytest.approx(16.0)
+    assert db.stock_value()["fifo"] == pytest.approx(24.0)
+
+
+def test_incremental_sync_matches_rebuild(db, product):
+    other = db.add_product("Silgi", "200", "Raf", 3.0)
+    for i in range(30):
+        db.change_stock(product, 5, "PURCHASE", 4.0 + i % 4)
+        db.change_stock(other, 3, "PURCHASE", 1.0 + i % 3)
+        db.change_stock(product, -4, "SALE")
+        db.change_stock(other, -(i % 5), "SALE")
+        if i % 7 == 0:
+            db.stock_value()        # ara ara artımlı işle
+    incremental = snapshot(db)
+    db.rebuild_valuation()
+    assert snapshot(db) == incremental
+    assert db.verify_valuation() == []
+
+
+def test_concurrent_sync_processes_each_movement_once(open_db, product, db):
+    other = open_db()        # ör. bakım zamanlayıcısının kendi DatabaseManager'ı
+    db.change_stock(product, 6, "PURCHASE", 5.0)
+    db.change_stock(product, -2, "SALE")
+
+    engine = db.valuation
+    read = engine.watermark
+    threads = []
+
+    def watermark():
+        engine.watermark = read
+        value = read()
+        threads.append(interleave(other.valuation.sync))   # diğer bağlantı araya girer
+        return value
+
+    engine.watermark = watermark
+    engine.sync()
+    threads[0].join()
+    assert threads[0].errors == []
+    assert db.verify_valuation() == []
+    assert db.stock_value()["fifo"] == pytest.approx(20.0)
+
+
+def test_archive_keeps_valuation_verifiable(db, product, tmp_path):
+    old = int(time.time()) - 40 * 86400
+    db.apply_movements([
+        {"op_key": "a1", "product_id": product, "change": 10, "reason": "PURCHASE",
+         "purchase_price": 5.0, "ts": old},
+        {"op_key": "a2", "product_id": product, "change": -6, "reason": "SALE", "ts": old + 60},
+        {"op_key": "a3", "product_id": product, "change": 4, "reason": "PURCHASE",
+         "purchase_price": 8.0, "ts": old + 20 * 86400},
+        {"op_key": "a4", "product_id": product, "change": -1, "reason": "SALE",
+         "ts": old + 21 * 86400},
+    ])
+    before = snapshot(db)
+    cutoff = (date.today() - timedelta(days=30)).isoformat()
+    assert db.archive_movements(cutoff, tmp_path / "archive.db") == 1
+
+    assert db.verify_valuation() == []
+    assert snapshot(db) == before
+    db.rebuild_valuation()
+    assert snapshot(db) == before
+    # Arşivden sonraki hareketler açılış durumunun üstüne işlenir
+    db.change_stock(product, -2, "SALE")
+    db.rebuild_valuation()
+    assert db.verify_valuation() == []
@@ -0,0 +1,183 @@
+"""
+tracing.py
+Tarama → ekran yolu için hafif gecikme izleme (tracing).
+
+– `tracer.span("ad")` ile iç içe aşamalar ölçülür,
+– her aşamanın süreleri logaritmik kovalı bir histogramda toplanır,
+– izler Chrome/Perfetto "trace event" JSON biçiminde dosyaya aktarılabilir.
+
+İzleme varsayılan olarak kapalıdır; `STOCK_TRACE=1` ortam değişkeni veya
+`tracer.enable()` ile açılır. Kapalıyken `span()` hiçbir şey ölçmez.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+# Histogram kova sınırları (milisaniye) – 0.05 ms'den 5 sn'ye kadar
+BUCKET_BOUNDS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100,
+                    250, 500, 1000, 2500, 5000]
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """p ∈ [0, 100] için en yakın sıra yüzdeliği (değerlerin sıralı olması gerekmez)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class StageHistogram:
+    """Bir aşamanın süre dağılımı: kova sayaçları + yüzdelik için örnekler."""
+
+    def __init__(self, max_samples: int = 100_000):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.samples: List[float] = []
+        self.max_samples = max_samples
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append(ms)
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float) -> float:
+        """p ∈ [0, 100] için yaklaşık yüzdelik değeri (ms)"""
+        return percentile(self.samples, p)
+
+    def summary(self) -> Dict[str, float]:
+        n = self.count
+        return {
+            "count": n,
+            "mean_ms": self.total_ms / n if n else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+
+class Tracer:
+    """İç içe span'leri kaydeden ve aşama histogramlarını tutan izleyici."""
+
+    def __init__(self, enabled: bool = False, max_events: int = 200_000):
+        self.enabled = enabled
+        self.max_events = max_events
+        self.histograms: Dict[str, StageHistogram] = {}
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+        self._epoch_ns = time.perf_counter_ns()
+
+    # ---------- Aç / kapat --------------------------------------------
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.events.clear()
+
+    # ---------- Kayıt --------------------------------------------------
+    @contextmanager
+    def span(self, name: str, start_ns: Optional[int] = None):
+        """
+        Bir aşamayı ölçer.
+
+        Args:
+            name: Aşama adı (ör. "sales.scan")
+            start_ns: Başlangıç zamanı (perf_counter_ns). Verilirse ölçüm bu
+                andan başlar; örn. okuyucunun son tuş vuruşu.
+        """
+        if not self.enabled:
+            yield
+            return
+        begin = start_ns if start_ns is not None else time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, begin, time.perf_counter_ns())
+
+    def record(self, name: str, start_ns: int, end_ns: int) -> None:
+        """Başlangıç/bitiş zamanı bilinen bir aşamayı kaydeder."""
+        if not self.enabled:
+            return
+        ms = (end_ns - start_ns) / 1_000_000
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = StageHistogram()
+            hist.add(ms)
+            if len(self.events) < self.max_events:
+                self.events.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start_ns - self._epoch_ns) / 1000,   # mikrosaniye
+                    "dur": (end_ns - start_ns) / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                })
+
+    # ---------- Rapor / dışa aktarım ----------------------------------
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: h.summary() for name, h in self.histograms.items()}
+
+    def format_summary(self) -> str:
+        """Aşama başına dağılımı okunabilir bir tablo olarak döndürür."""
+        lines = [f"{'Aşama':<28}{'adet':>8}{'ort':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+        for name, s in sorted(self.summary().items()):
+            lines.append(
+                f"{name:<28}{s['count']:>8}{s['mean_ms']:>9.3f}{s['p50_ms']:>9.3f}"
+                f"{s['p90_ms']:>9.3f}{s['p99_ms']:>9.3f}{s['max_ms']:>9.3f}"
+            )
+        return "\n".join(lines)
+
+    def format_histogram(self, name: str, width: int = 40) -> str:
+        """Tek bir aşamanın kova histogramını metin çubukları ile çizer."""
+        with self._lock:
+            hist = self.histograms.get(name)
+            counts = list(hist.counts) if hist is not None else []
+        if not any(counts):
+            return f"{name}: kayıt yok"
+        peak = max(counts)
+        lines = [f"{name} (ms)"]
+        bounds = [f"≤{b:g}" for b in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]:g}"]
+        for label, cnt in zip(bounds, counts):
+            if cnt:
+                bar = "#" * max(1, round(cnt / peak * width))
+                lines.append(f"  {label:>7} {cnt:>7} {bar}")
+        return "\n".join(lines)
+
+    def export(self, path: str) -> str:
+        """
+        İzleri Chrome trace event biçiminde yazar (chrome://tracing veya
+        ui.perfetto.dev ile açılabilir). Özet histogramlar da dosyaya eklenir.
+        """
+        with self._lock:
+            payload = {
+                "traceEvents": list(self.events),
+                "displayTimeUnit": "ms",
+                "stageSummary": {n: h.summary() for n, h in self.histograms.items()},
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        return path
+
+
+# Süreç genelinde tek izleyici
+tracer = Tracer(enabled=os.environ.get("STOCK_TRACE", "") not in ("", "0"))
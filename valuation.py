@@ -0,0 +1,479 @@
+"""
+valuation.py
+Stok değerleme motoru: FIFO ve ağırlıklı ortalama maliyet, satılan malın
+maliyeti (SMM / COGS).
+
+Her ürün için açık maliyet katmanları (`CostLayer`) ve özet maliyet durumu
+(`ProductCost`) veritabanında tutulur. `sync()` yalnızca son işlenen hareketten
+(`ValuationState.last_movement_id`) sonraki hareketleri işler; böylece stok
+değeri ve dönem SMM'si tüm hareket geçmişini baştan taramadan, ürün sayısıyla
+orantılı işle cevaplanır. Günlük SMM `CogsDaily` tablosunda biriktirilir.
+Hareketler arşivlendiğinde o anki değerleme açılış durumu olarak saklanır
+(`OpeningCost`, `OpeningLayer`, `OpeningCogs`); `rebuild()` ve `verify()`
+silinen hareketleri yeniden oynatmak yerine bu durumdan başlar.
+
+Kurallar:
+    – PURCHASE (+): alış fiyatıyla yeni katman (fiyat yoksa ortalama maliyet)
+    – SALE / ADJUST (−): en eski katmandan tüketilir, SMM'ye yazılır
+    – ADJUST (+): ortalama maliyetle stoğa geri döner, SMM'den düşülür
+      (sepetten çıkarılan ürün satışı geri alır)
+    – PURCHASE (−): tedarikçiye iade; katmandan düşer, SMM'ye yazılmaz
+    – Sayım farkı (op_key `COUNT_KEY_PREFIX` ile başlayan ADJUST): fazla çıkan
+      mal ortalama maliyetle stoğa girer ama SMM'yi azaltmaz; eksik çıkan mal
+      (fire) SMM'ye yazılır
+    – Diğer hareketler (ör. depolar arası transfer) değerlemeyi etkilemez
+"""
+
+import sqlite3
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+VALUED_REASONS = ("SALE", "PURCHASE", "ADJUST")
+COUNT_KEY_PREFIX = "stocktake:"   # Sayım farkı hareketlerinin op_key öneki
+EPSILON = 0.005
+
+
+def begin_write(conn: sqlite3.Connection) -> None:
+    """
+    Açık bir işlem yoksa yazma kilidini hemen alan bir işlem başlatır.
+
+    Filigranlı özetler (değerleme, günlük satış, sıralama) filigranı bu kilit
+    altında okur: aynı dosyayı kullanan başka bir bağlantı (bakım
+    zamanlayıcısı, servis) araya girip aynı hareketleri ikinci kez işleyemez.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def ensure_schema(cur: sqlite3.Cursor) -> None:
+    """Değerleme tablolarını oluşturur (`DatabaseManager._ensure_schema` çağırır)"""
+    cur.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS CostLayer (
+            id            INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id    INTEGER NOT NULL,
+            movement_id   INTEGER,
+            qty_remaining INTEGER NOT NULL,
+            unit_cost     REAL    NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_costlayer_product ON CostLayer(product_id, id);
+
+        CREATE TABLE IF NOT EXISTS ProductCost (
+            product_id INTEGER PRIMARY KEY,
+            qty        INTEGER NOT NULL DEFAULT 0,
+            avg_cost   REAL    NOT NULL DEFAULT 0,
+            fifo_value REAL    NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS CogsDaily (
+            day        TEXT    NOT NULL,
+            product_id INTEGER NOT NULL,
+            qty        INTEGER NOT NULL DEFAULT 0,
+            cogs_fifo  REAL    NOT NULL DEFAULT 0,
+            cogs_avg   REAL    NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, product_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS ValuationState (
+            id               INTEGER PRIMARY KEY CHECK (id = 1),
+            last_movement_id INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO ValuationState(id, last_movement_id) VALUES (1, 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_product_delete_cost
+        AFTER DELETE ON Product BEGIN
+            DELETE FROM CostLayer   WHERE product_id = OLD.id;
+            DELETE FROM ProductCost WHERE product_id = OLD.id;
+            DELETE FROM CogsDaily   WHERE product_id = OLD.id;
+        END;
+
+        -- Arşivleme anındaki değerleme (açılış): arşivlenen hareketler silindiği
+        -- için yeniden kurma ve doğrulama bu durumdan başlar
+        CREATE TABLE IF NOT EXISTS OpeningCost (
+            product_id INTEGER PRIMARY KEY,
+            qty        INTEGER NOT NULL DEFAULT 0,
+            avg_cost   REAL    NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS OpeningLayer (
+            id            INTEGER PRIMARY KEY,
+            product_id    INTEGER NOT NULL,
+            movement_id   INTEGER,
+            qty_remaining INTEGER NOT NULL,
+            unit_cost     REAL    NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS OpeningCogs (
+            day        TEXT    NOT NULL,
+            product_id INTEGER NOT NULL,
+            qty        INTEGER NOT NULL DEFAULT 0,
+            cogs_fifo  REAL    NOT NULL DEFAULT 0,
+            cogs_avg   REAL    NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, product_id)
+        );
+        CREATE TABLE IF NOT EXISTS ValuationOpening (
+            id          INTEGER PRIMARY KEY CHECK (id = 1),
+            movement_id INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO ValuationOpening(id, movement_id) VALUES (1, 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_product_delete_opening
+        AFTER DELETE ON Product BEGIN
+            DELETE FROM OpeningLayer WHERE product_id = OLD.id;
+            DELETE FROM OpeningCost  WHERE product_id = OLD.id;
+            DELETE FROM OpeningCogs  WHERE product_id = OLD.id;
+        END;
+        """
+    )
+
+
+class ProductCostState:
+    """Tek ürünün bellek içi maliyet durumu (katmanlar en eskiden yeniye)"""
+
+    __slots__ = ("qty", "avg_cost", "layers")
+
+    def __init__(self, qty: int = 0, avg_cost: float = 0.0,
+                 layers: Optional[Iterable[Tuple[Optional[int], int, float]]] = None):
+        self.qty = qty
+        self.avg_cost = avg_cost
+        self.layers = deque([list(layer) for layer in layers or ()])  # [movement_id, qty, cost]
+
+    @property
+    def fifo_value(self) -> float:
+        return sum(qty * cost for _, qty, cost in self.layers)
+
+    def apply(self, movement_id: int, change: int, reason: str,
+              purchase_price: Optional[float],
+              op_key: Optional[str] = None) -> Optional[Tuple[int, float, float]]:
+        """
+        Hareketi maliyet durumuna uygular.
+
+        Returns:
+            (adet, fifo_smm, ortalama_smm) — SMM'yi etkilemeyen hareketlerde None
+        """
+        if reason not in VALUED_REASONS or not change:
+            return None
+
+        if change > 0:
+            cost = self.avg_cost
+            if reason == "PURCHASE" and purchase_price is not None:
+                cost = purchase_price
+            # Negatif stok varsa gelen malın bir kısmı açığı kapatır
+            # (o kısım satıldığında ortalama maliyetle giderleştirilmişti)
+            layer_qty = change - max(0, -self.qty)
+            if layer_qty > 0:
+                on_hand = max(self.qty, 0)
+                self.avg_cost = (on_hand * self.avg_cost + layer_qty * cost) / (on_hand + layer_qty)
+                self.layers.append([movement_id, layer_qty, cost])
+            elif self.qty + change <= 0 and reason == "PURCHASE":
+                self.avg_cost = cost
+            self.qty += change
+            if reason == "PURCHASE" or (op_key or "").startswith(COUNT_KEY_PREFIX):
+                return None
+            # Satış geri alındı → SMM ortalama maliyetle azalır
+            return -change, -change * cost, -change * cost
+
+        qty = -change
+        avg_cogs = qty * self.avg_cost
+        fifo_cogs = 0.0
+        remaining = qty
+        while remaining and self.layers:
+            layer = self.layers[0]
+            take = min(remaining, layer[1])
+            fifo_cogs += take * layer[2]
+            layer[1] -= take
+            remaining -= take
+            if not layer[1]:
+                self.layers.popleft()
+        # Katman yetmiyorsa (negatif stok) eksik kısım ortalama maliyetle
+        fifo_cogs += remaining * self.avg_cost
+        self.qty -= qty
+        if reason == "PURCHASE":
+            return None
+        return qty, fifo_cogs, avg_cogs
+
+
+class ValuationEngine:
+    """Hareket günlüğünü artımlı olarak değerleme tablolarına işler."""
+
+    def __init__(self, db, chunk_size: int = 5000):
+        """
+        Args:
+            db: `DatabaseManager` (bağlantı yenilenebildiği için her seferinde
+                `db.conn` kullanılır)
+            chunk_size: Tek seferde okunan hareket sayısı
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.db.conn
+
+    def watermark(self) -> int:
+        row = self.conn.execute(
+            "SELECT last_movement_id FROM ValuationState WHERE id = 1"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def set_watermark(self, movement_id: int) -> None:
+        """Son işlenen hareketi ayarlar (işlem kapatılmaz, çağıran commit eder)"""
+        self.conn.execute(
+            "UPDATE ValuationState SET last_movement_id = ? WHERE id = 1",
+            (movement_id,),
+        )
+
+    # ---------- Artımlı işleme -----------------------------------------
+    def _load_state(self, product_id: int) -> ProductCostState:
+        row = self.conn.execute(
+            "SELECT qty, avg_cost FROM ProductCost WHERE product_id = ?",
+            (product_id,),
+        ).fetchone()
+        if row is None:
+            return ProductCostState()
+        layers = self.conn.execute(
+            "SELECT movement_id, qty_remaining, unit_cost FROM CostLayer"
+            " WHERE product_id = ? ORDER BY id",
+            (product_id,),
+        ).fetchall()
+        return ProductCostState(row[0], row[1], [tuple(layer) for layer in layers])
+
+    def _save_state(self, product_id: int, state: ProductCostState) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO ProductCost(product_id, qty, avg_cost, fifo_value)"
+            " VALUES (?,?,?,?)",
+            (product_id, state.qty, state.avg_cost, state.fifo_value),
+        )
+        self.conn.execute("DELETE FROM CostLayer WHERE product_id = ?", (product_id,))
+        self.conn.executemany(
+            "INSERT INTO CostLayer(product_id, movement_id, qty_remaining, unit_cost)"
+            " VALUES (?,?,?,?)",
+            [(product_id, mid, qty, cost) for mid, qty, cost in state.layers],
+        )
+
+    def sync(self, upto: Optional[int] = None, commit: bool = True) -> int:
+        """
+        Son işlenen hareketten sonraki hareketleri değerlemeye işler.
+
+        Args:
+            upto: En fazla bu hareket numarasına kadar işle
+            commit: False ise işlem açık bırakılır (çağıranın işleminin parçası)
+
+        Returns:
+            int: İşlenen hareket sayısı
+        """
+        processed = 0
+        try:
+            while True:
+                begin_write(self.conn)
+                last_id = self.watermark()
+                params = [last_id]
+                sql = ("SELECT id, product_id, change, reason, purchase_price, op_key,"
+                       " DATE(ts, 'unixepoch', 'localtime') AS day"
+                       " FROM StockMovement WHERE id > ?")
+                if upto is not None:
+                    sql += " AND id <= ?"
+                    params.append(upto)
+                sql += " ORDER BY id LIMIT ?"
+                params.append(self.chunk_size)
+                rows = self.conn.execute(sql, params).fetchall()
+                if not rows:
+                    if commit:
+                        self.conn.commit()   # boş işlem: kilidi bırak
+                    break
+
+                states: Dict[int, ProductCostState] = {}
+                cogs: Dict[Tuple[str, int], List[float]] = {}
+                for row in rows:
+                    pid = row["product_id"]
+                    state = states.get(pid)
+                    if state is None:
+                        state = states[pid] = self._load_state(pid)
+                    result = state.apply(row["id"], row["change"], row["reason"],
+                                         row["purchase_price"], row["op_key"])
+                    if result is not None:
+                        total = cogs.setdefault((row["day"], pid), [0, 0.0, 0.0])
+                        for i, value in enumerate(result):
+                            total[i] += value
+
+                for pid, state in states.items():
+                    self._save_state(pid, state)
+                self.conn.executemany(
+                    """
+                    INSERT INTO CogsDaily(day, product_id, qty, cogs_fifo, cogs_avg)
+                    VALUES (?,?,?,?,?)
+                    ON CONFLICT(day, product_id) DO UPDATE SET
+                        qty       = qty       + excluded.qty,
+                        cogs_fifo = cogs_fifo + excluded.cogs_fifo,
+                        cogs_avg  = cogs_avg  + excluded.cogs_avg
+                    """,
+                    [(day, pid, *total) for (day, pid), total in cogs.items()],
+                )
+                self.set_watermark(rows[-1]["id"])
+                processed += len(rows)
+                if commit:
+                    self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return processed
+
+    # ---------- Sorgular -----------------------------------------------
+    def stock_value(self) -> dict:
+        """Toplam stok değeri (FIFO ve ortalama maliyetle)"""
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(fifo_value), 0),"
+            " COALESCE(SUM(MAX(qty, 0) * avg_cost), 0) FROM ProductCost"
+        ).fetchone()
+        return {"fifo": round(row[0], 2), "average": round(row[1], 2)}
+
+    def product_values(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """
+            SELECT p.id, p.name, pc.qty, pc.avg_cost, pc.fifo_value,
+                   MAX(pc.qty, 0) * pc.avg_cost AS avg_value
+            FROM ProductCost pc JOIN Product p ON p.id = pc.product_id
+            WHERE pc.qty != 0 OR pc.fifo_value != 0
+            ORDER BY pc.fifo_value DESC
+            """
+        ).fetchall()
+
+    def cogs_report(self, start: str, end: str) -> List[sqlite3.Row]:
+        """`start`–`end` (dahil) dönemi için ürün bazında SMM"""
+        return self.conn.execute(
+            """
+            SELECT p.id, p.name, SUM(c.qty) AS qty,
+                   SUM(c.cogs_fifo) AS cogs_fifo, SUM(c.cogs_avg) AS cogs_avg
+            FROM CogsDaily c JOIN Product p ON p.id = c.product_id
+            WHERE c.day BETWEEN DATE(?) AND DATE(?)
+            GROUP BY c.product_id
+            HAVING SUM(c.qty) != 0 OR ABS(SUM(c.cogs_fifo)) > 0.000001
+            ORDER BY cogs_fifo DESC
+            """,
+            (start, end),
+        ).fetchall()
+
+    # ---------- Açılış durumu (arşivleme) -------------------------------
+    def opening_id(self) -> int:
+        """Açılış durumunun kapsadığı son hareket (0 = açılış yok)"""
+        row = self.conn.execute(
+            "SELECT movement_id FROM ValuationOpening WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def save_opening(self) -> None:
+        """
+        Güncel değerlemeyi açılış durumu olarak saklar (işlem kapatılmaz).
+        `archive_movements` hareketleri sildikten sonra çağırır: silinen
+        hareketlerin maliyet katmanları ve SMM'si yeniden kurmada buradan gelir.
+        """
+        for table in ("OpeningLayer", "OpeningCost", "OpeningCogs"):
+            self.conn.execute(f"DELETE FROM {table}")
+        self.conn.execute(
+            "INSERT INTO OpeningCost(product_id, qty, avg_cost)"
+            " SELECT product_id, qty, avg_cost FROM ProductCost")
+        self.conn.execute(
+            "INSERT INTO OpeningLayer(id, product_id, movement_id, qty_remaining, unit_cost)"
+            " SELECT id, product_id, movement_id, qty_remaining, unit_cost FROM CostLayer")
+        self.conn.execute(
+            "INSERT INTO OpeningCogs(day, product_id, qty, cogs_fifo, cogs_avg)"
+            " SELECT day, product_id, qty, cogs_fifo, cogs_avg FROM CogsDaily")
+        self.conn.execute("UPDATE ValuationOpening SET movement_id = ? WHERE id = 1",
+                          (self.watermark(),))
+
+    def _opening_states(self) -> Dict[int, ProductCostState]:
+        layers: Dict[int, list] = {}
+        for row in self.conn.execute(
+                "SELECT product_id, movement_id, qty_remaining, unit_cost"
+                " FROM OpeningLayer ORDER BY id"):
+            layers.setdefault(row[0], []).append(tuple(row)[1:])
+        return {
+            row[0]: ProductCostState(row[1], row[2], layers.get(row[0]))
+            for row in self.conn.execute("SELECT product_id, qty, avg_cost FROM OpeningCost")
+        }
+
+    # ---------- Yeniden kurma ve doğrulama -----------------------------
+    def rebuild(self) -> int:
+        """
+        Değerleme tablolarını boşaltıp hareketleri baştan işler (arşivleme
+        yapıldıysa açılış durumundan ve ondan sonraki hareketlerden)
+        """
+        try:
+            for table in ("CostLayer", "ProductCost", "CogsDaily"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute(
+                "INSERT INTO ProductCost(product_id, qty, avg_cost, fifo_value)"
+                " SELECT o.product_id, o.qty, o.avg_cost,"
+                "        COALESCE(SUM(l.qty_remaining * l.unit_cost), 0)"
+                " FROM OpeningCost o LEFT JOIN OpeningLayer l ON l.product_id = o.product_id"
+                " GROUP BY o.product_id")
+            self.conn.execute(
+                "INSERT INTO CostLayer(product_id, movement_id, qty_remaining, unit_cost)"
+                " SELECT product_id, movement_id, qty_remaining, unit_cost"
+                " FROM OpeningLayer ORDER BY id")
+            self.conn.execute(
+                "INSERT INTO CogsDaily(day, product_id, qty, cogs_fifo, cogs_avg)"
+                " SELECT day, product_id, qty, cogs_fifo, cogs_avg FROM OpeningCogs")
+            self.set_watermark(self.opening_id())
+            return self.sync(commit=True)
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    def verify(self) -> List[str]:
+        """
+        Kayıtlı değerlemeyi, hareketlerin bellekte baştan işlenmesiyle
+        karşılaştırır (tablolar değiştirilmez).
+
+        Returns:
+            List[str]: Bulunan farklar (boş liste = tutarlı)
+        """
+        upto = self.watermark()
+        states = self._opening_states()
+        cogs: Dict[int, List[float]] = {
+            row[0]: [row[1], row[2], row[3]] for row in self.conn.execute(
+                "SELECT product_id, SUM(qty), SUM(cogs_fifo), SUM(cogs_avg)"
+                " FROM OpeningCogs GROUP BY product_id")
+        }
+        cursor = self.conn.execute(
+            "SELECT id, product_id, change, reason, purchase_price, op_key"
+            " FROM StockMovement WHERE id > ? AND id <= ? ORDER BY id",
+            (self.opening_id(), upto),
+        )
+        for row in cursor:
+            state = states.setdefault(row["product_id"], ProductCostState())
+            result = state.apply(row["id"], row["change"], row["reason"],
+                                 row["purchase_price"], row["op_key"])
+            if result is not None:
+                total = cogs.setdefault(row["product_id"], [0, 0.0, 0.0])
+                for i, value in enumerate(result):
+                    total[i] += value
+
+        problems = []
+        stored = {
+            row["product_id"]: row for row in self.conn.execute(
+                "SELECT pc.product_id, pc.qty, pc.avg_cost, pc.fifo_value,"
+                " COALESCE(c.qty, 0) AS cogs_qty, COALESCE(c.fifo, 0) AS cogs_fifo"
+                " FROM ProductCost pc LEFT JOIN ("
+                "   SELECT product_id, SUM(qty) AS qty, SUM(cogs_fifo) AS fifo"
+                "   FROM CogsDaily GROUP BY product_id) c ON c.product_id = pc.product_id"
+            )
+        }
+        for pid in sorted(set(states) | set(stored)):
+            state = states.get(pid, ProductCostState())
+            row = stored.get(pid)
+            if row is None:
+                if state.qty or state.layers:
+                    problems.append(f"Ürün {pid}: değerleme kaydı yok")
+                continue
+            expected_cogs = cogs.get(pid, [0, 0.0, 0.0])
+            if row["qty"] != state.qty:
+                problems.append(f"Ürün {pid}: miktar {row['qty']} ≠ {state.qty}")
+            if abs(row["fifo_value"] - state.fifo_value) > EPSILON:
+                problems.append(
+                    f"Ürün {pid}: FIFO değeri {row['fifo_value']:.2f} ≠ {state.fifo_value:.2f}")
+            if abs(row["avg_cost"] - state.avg_cost) > EPSILON:
+                problems.append(
+                    f"Ürün {pid}: ortalama maliyet {row['avg_cost']:.4f} ≠ {state.avg_cost:.4f}")
+            if (row["cogs_qty"] != expected_cogs[0]
+                    or abs(row["cogs_fifo"] - expected_cogs[1]) > EPSILON):
+                problems.append(
+                    f"Ürün {pid}: SMM {row['cogs_fifo']:.2f} ≠ {expected_cogs[1]:.2f}")
+        return problems